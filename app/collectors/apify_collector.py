@@ -2,29 +2,144 @@
 Apify Collector - Fetches Reddit discussions via Apify Reddit Scraper.
 
 This collector uses the "apify/reddit-scraper" actor which is free and reliable.
+
+Actors are started through the runs API rather than run-sync, so a run can be
+aborted. When the primary scraper is slower than a high percentile of its
+recent runs, the cheerio-scraper fallback is started in parallel (hedged) and
+the first usable result wins; the losing run is aborted.
 """
-import requests
-import hashlib
+import asyncio
+import time
+import httpx
 from datetime import datetime, timezone
 from app.core.config import settings
+from app.core.hedge import LatencyWindow, hedged
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.metrics import RECORDS_PROCESSED, FETCH_FAILURES
 from app.services.key_service import get_apify_key
+from app.services.normalizer_service import canonical_post_hash, reddit_post_id
+
+logger = get_logger(__name__)
+_http = get_client("apify")
+
+# Official Apify Reddit Scraper actor and the cheerio-scraper fallback
+PRIMARY_ACTOR_ID = "oAuCIx3ItNrs2okjQ"
+FALLBACK_ACTOR_ID = "apify~cheerio-scraper"
+
+RUN_TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+# Longest long-poll Apify allows on GET /actor-runs/{id}
+MAX_WAIT_FOR_FINISH = 60
+
+# Recent durations of the primary actor, used to pick the hedge delay
+_primary_latency = LatencyWindow()
+
+
+class ApifyRunError(Exception):
+    """An actor run did not succeed."""
 
 
-def generate_post_hash(title: str, subreddit: str, created_time: str) -> str:
-    """Generate unique hash for post deduplication."""
-    key = f"{title}|{subreddit}|{created_time}".lower().strip()
-    return hashlib.md5(key.encode()).hexdigest()
+def generate_post_hash(title: str, subreddit: str, created_time, post_id: str = None, url: str = None) -> str:
+    """Post identity for deduplication: the t3_ fullname, or a hash when the id is unknown."""
+    return canonical_post_hash(reddit_post_id(post_id, url), title, subreddit, created_time)
 
 
-def _get_apify_api_token() -> str:
+async def _get_apify_api_token() -> str:
     """Get Apify API token (database first, then env fallback)."""
-    api_token = get_apify_key(fallback=settings.APIFY_API_TOKEN)
+    api_token = await get_apify_key(fallback=settings.APIFY_API_TOKEN)
     if not api_token or api_token == "your_apify_api_token_here":
         raise ValueError("APIFY_API_TOKEN not configured. Add it via Admin Portal or get one from https://apify.com/")
     return api_token
 
 
-def fetch_reddit_discussions(
+async def _abort_run(run_id: str, headers: dict):
+    try:
+        resp = await _http.post(
+            f"{settings.APIFY_BASE_URL}/v2/actor-runs/{run_id}/abort",
+            headers=headers,
+            timeout=10,
+            max_retries=1
+        )
+        if resp.status_code != 200:
+            logger.warning(f"Apify abort error for run {run_id}: {resp.status_code}")
+    except httpx.HTTPError as e:
+        logger.warning(f"Error aborting Apify run {run_id}: {e}")
+
+
+async def run_actor(actor_id: str, actor_input: dict, api_token: str, timeout: int = None) -> list:
+    """
+    Start an actor run, wait for it and return its dataset items.
+
+    The run is aborted if waiting for it fails, times out or is cancelled.
+    
+    Args:
+        actor_id: Apify actor ID or "user~name"
+        actor_input: Actor input
+        api_token: Apify API token
+        timeout: Run timeout in seconds (default APIFY_RUN_TIMEOUT)
+        
+    Returns:
+        Dataset items of the run
+    """
+    timeout = timeout or settings.APIFY_RUN_TIMEOUT
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_token}"
+    }
+    
+    resp = await _http.post(
+        f"{settings.APIFY_BASE_URL}/v2/acts/{actor_id}/runs",
+        params={"timeout": timeout},
+        json=actor_input,
+        headers=headers,
+        timeout=30
+    )
+    resp.raise_for_status()
+    run = jsonio.loads(resp.content)["data"]
+    deadline = time.monotonic() + timeout
+    
+    try:
+        while run["status"] not in RUN_TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ApifyRunError(f"Actor {actor_id} run {run['id']} timed out after {timeout}s")
+            wait = max(1, min(MAX_WAIT_FOR_FINISH, int(remaining)))
+            resp = await _http.get(
+                f"{settings.APIFY_BASE_URL}/v2/actor-runs/{run['id']}",
+                params={"waitForFinish": wait},
+                headers=headers,
+                timeout=wait + 30
+            )
+            resp.raise_for_status()
+            run = jsonio.loads(resp.content)["data"]
+    except (asyncio.CancelledError, ApifyRunError, httpx.HTTPError):
+        await _abort_run(run["id"], headers)
+        raise
+    
+    if run["status"] != "SUCCEEDED":
+        raise ApifyRunError(f"Actor {actor_id} run {run['id']} finished with status {run['status']}")
+    
+    resp = await _http.get(
+        f"{settings.APIFY_BASE_URL}/v2/datasets/{run['defaultDatasetId']}/items",
+        params={"clean": "true", "format": "json"},
+        headers=headers,
+        timeout=60
+    )
+    resp.raise_for_status()
+    return jsonio.loads(resp.content)
+
+
+def _hedge_delay() -> float:
+    """Seconds to give the primary actor before hedging with the fallback."""
+    delay = _primary_latency.percentile(settings.APIFY_HEDGE_PERCENTILE)
+    if delay is None:
+        delay = settings.APIFY_HEDGE_DEFAULT_DELAY
+    return max(settings.APIFY_HEDGE_MIN_DELAY, delay)
+
+
+async def fetch_reddit_discussions(
     search_query: str,
     subreddits: list[str] = None,
     max_items: int = 50,
@@ -42,11 +157,7 @@ def fetch_reddit_discussions(
     Returns:
         List of normalized discussion records
     """
-    api_token = _get_apify_api_token()
-    
-    # Use the official Apify Reddit Scraper actor
-    # Actor: apify/reddit-scraper (official and free)
-    actor_id = "oAuCIx3ItNrs2okjQ"  # This is the official Apify Reddit Scraper actor ID
+    api_token = await _get_apify_api_token()
     
     # Default subreddits for tech discussions
     default_subreddits = subreddits or [
@@ -73,48 +184,26 @@ def fetch_reddit_discussions(
         }
     }
     
-    # Use run-sync endpoint for synchronous execution
-    run_url = f"https://api.apify.com/v2/acts/{actor_id}/run-sync-get-dataset-items"
+    async def primary():
+        logger.info(f"Calling Apify Reddit Scraper for query: {search_query}")
+        posts = await run_actor(PRIMARY_ACTOR_ID, actor_input, api_token)
+        logger.info(f"Apify returned {len(posts)} posts")
+        return normalize_posts(posts, search_query)
     
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_token}"
-    }
+    async def fallback():
+        # Alternate approach - search via subreddit URLs
+        return await fetch_from_subreddits(search_query, default_subreddits, max_items)
     
-    try:
-        print(f"Calling Apify Reddit Scraper for query: {search_query}")
-        
-        response = requests.post(
-            run_url,
-            json=actor_input,
-            headers=headers,
-            timeout=300  # 5 minutes max
-        )
-        
-        print(f"Apify response status: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"Apify error: {response.text[:500]}")
-            # Try alternate approach - search via subreddit URLs
-            return fetch_from_subreddits(search_query, default_subreddits, max_items)
-        
-        posts = response.json()
-        print(f"Apify returned {len(posts)} posts")
-        
-        if not posts:
-            # Fallback to subreddit-based fetching
-            return fetch_from_subreddits(search_query, default_subreddits, max_items)
-        
-        normalized_posts = normalize_posts(posts, search_query)
-        return normalized_posts
-        
-    except requests.RequestException as e:
-        print(f"Apify API error: {e}")
-        # Fallback to subreddit-based fetching
-        return fetch_from_subreddits(search_query, subreddits or default_subreddits, max_items)
+    return await hedged(
+        "apify_reddit",
+        primary,
+        fallback,
+        delay=_hedge_delay(),
+        latency=_primary_latency
+    )
 
 
-def fetch_from_subreddits(
+async def fetch_from_subreddits(
     search_query: str,
     subreddits: list[str],
     max_items: int = 50
@@ -123,10 +212,7 @@ def fetch_from_subreddits(
     Fallback: Fetch Reddit posts by scraping subreddit search pages.
     Uses a simpler web scraping approach.
     """
-    print(f"Using fallback subreddit scraping for: {search_query}")
-    
-    # Use cheerio-scraper for simple HTML scraping
-    actor_id = "apify~cheerio-scraper"
+    logger.info(f"Using fallback subreddit scraping for: {search_query}")
     
     # Build URLs to scrape
     start_urls = []
@@ -172,31 +258,16 @@ def fetch_from_subreddits(
         }
     }
     
-    run_url = f"https://api.apify.com/v2/acts/{actor_id}/run-sync-get-dataset-items"
-    
-    api_token = _get_apify_api_token()
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_token}"
-    }
+    api_token = await _get_apify_api_token()
     
     try:
-        response = requests.post(
-            run_url,
-            json=actor_input,
-            headers=headers,
-            timeout=300
-        )
-        
-        if response.status_code != 200:
-            print(f"Fallback scraper error: {response.text[:500]}")
-            return []
-        
-        posts = response.json()
+        # Use cheerio-scraper for simple HTML scraping
+        posts = await run_actor(FALLBACK_ACTOR_ID, actor_input, api_token)
         return normalize_posts(posts, search_query)
         
-    except Exception as e:
-        print(f"Fallback scraper error: {e}")
+    except (ApifyRunError, httpx.HTTPError) as e:
+        logger.error(f"Fallback scraper error: {e}")
+        FETCH_FAILURES.inc(source="apify_reddit")
         return []
 
 
@@ -211,17 +282,19 @@ def normalize_posts(posts: list, search_query: str) -> list[dict]:
             
         subreddit = post.get("communityName") or post.get("subreddit") or post.get("community", {}).get("name", "")
         created_utc = post.get("createdAt") or post.get("created_utc") or post.get("time", "")
+        post_id = post.get("parsedId") or post.get("id") or post.get("postId")
+        post_url = post.get("url") or post.get("postUrl", "")
         
         normalized = {
-            "post_hash": generate_post_hash(title, subreddit, str(created_utc)),
-            "post_id": post.get("id") or post.get("postId", ""),
+            "post_hash": generate_post_hash(title, subreddit, created_utc, post_id, post_url),
+            "post_id": reddit_post_id(post_id, post_url) or "",
             "title": title,
             "body": post.get("body") or post.get("selftext") or post.get("text", ""),
             "subreddit": subreddit,
             "author": post.get("username") or post.get("author") or post.get("authorName", ""),
             "upvotes": int(post.get("upVotes") or post.get("score") or post.get("ups") or 0),
             "comments_count": int(post.get("numberOfComments") or post.get("num_comments") or post.get("comments") or 0),
-            "post_url": post.get("url") or post.get("postUrl", ""),
+            "post_url": post_url,
             "created_utc": created_utc,
             "source": "apify_reddit",
             "search_query": search_query,
@@ -230,10 +303,11 @@ def normalize_posts(posts: list, search_query: str) -> list[dict]:
         }
         normalized_posts.append(normalized)
     
+    RECORDS_PROCESSED.inc(len(normalized_posts), source="apify_reddit", outcome="fetched")
     return normalized_posts
 
 
-def fetch_discussions_batch(
+async def fetch_discussions_batch(
     queries: list[str],
     subreddits: list[str] = None,
     max_per_query: int = 20
@@ -245,14 +319,14 @@ def fetch_discussions_batch(
     seen_hashes = set()
     
     for query in queries:
-        print(f"Fetching Reddit discussions for: {query}")
-        posts = fetch_reddit_discussions(query, subreddits, max_per_query)
+        logger.info(f"Fetching Reddit discussions for: {query}")
+        posts = await fetch_reddit_discussions(query, subreddits, max_per_query)
         
         for post in posts:
             if post["post_hash"] not in seen_hashes:
                 seen_hashes.add(post["post_hash"])
                 all_posts.append(post)
         
-        print(f"  Found {len(posts)} posts, {len(all_posts)} total unique")
+        logger.info(f"Found {len(posts)} posts, {len(all_posts)} total unique")
     
     return all_posts
@@ -4,16 +4,24 @@ Reddit Collector - Fetches Reddit discussions using Reddit's public JSON API.
 This uses Reddit's public API endpoints which don't require authentication
 for basic read operations. Much more reliable than scraping.
 """
-import requests
-import hashlib
 from datetime import datetime, timezone
-import time
+from itertools import islice
+from typing import Iterator
+from app.core.config import settings
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.metrics import RECORDS_PROCESSED, FETCH_FAILURES
+from app.core.rate_limit import UpstreamUnavailable
+from app.services.normalizer_service import canonical_post_hash, reddit_post_id
 
+logger = get_logger(__name__)
+_http = get_client("reddit")
 
-def generate_post_hash(title: str, subreddit: str, created_time: str) -> str:
-    """Generate unique hash for post deduplication."""
-    key = f"{title}|{subreddit}|{created_time}".lower().strip()
-    return hashlib.md5(key.encode()).hexdigest()
+
+def generate_post_hash(title: str, subreddit: str, created_time, post_id: str = None, url: str = None) -> str:
+    """Post identity for deduplication: the t3_ fullname, or a hash when the id is unknown."""
+    return canonical_post_hash(reddit_post_id(post_id, url), title, subreddit, created_time)
 
 
 # Reddit requires a User-Agent header
@@ -22,7 +30,7 @@ HEADERS = {
 }
 
 
-def fetch_reddit_discussions(
+async def fetch_reddit_discussions(
     search_query: str,
     subreddits: list[str] = None,
     max_items: int = 50,
@@ -59,27 +67,41 @@ def fetch_reddit_discussions(
     # Calculate posts per subreddit
     posts_per_subreddit = max(5, max_items // len(default_subreddits))
     
-    for subreddit in default_subreddits:
+    if settings.REDDIT_SEARCH_MODE == "combined":
         try:
-            posts = search_subreddit(subreddit, search_query, posts_per_subreddit, sort)
-            all_posts.extend(posts)
+            all_posts.extend(await search_subreddits_combined(default_subreddits, search_query, posts_per_subreddit, sort))
+        except UpstreamUnavailable as e:
+            logger.error(f"Stopping Reddit fetch for '{search_query}': {e}")
+            FETCH_FAILURES.inc(source="reddit_api")
+        except Exception as e:
+            logger.error(f"Error in combined subreddit search: {e}")
+            FETCH_FAILURES.inc(source="reddit_api")
+    else:
+        # Request pacing follows Reddit's rate-limit headers (see app.core.rate_limit)
+        for subreddit in default_subreddits:
+            try:
+                posts = await search_subreddit(subreddit, search_query, posts_per_subreddit, sort)
+                all_posts.extend(posts)
             
-            if len(all_posts) >= max_items:
-                break
-                
-            # Rate limiting - Reddit allows ~60 requests per minute
-            time.sleep(1)
+                if len(all_posts) >= max_items:
+                    break
             
-        except Exception as e:
-            print(f"Error fetching from r/{subreddit}: {e}")
-            continue
+            except UpstreamUnavailable as e:
+                logger.error(f"Stopping Reddit fetch for '{search_query}': {e}")
+                FETCH_FAILURES.inc(source="reddit_api")
+                break
+            except Exception as e:
+                logger.error(f"Error fetching from r/{subreddit}: {e}")
+                FETCH_FAILURES.inc(source="reddit_api")
+                continue
     
     # Also search Reddit globally
     try:
-        global_posts = search_reddit_global(search_query, min(25, max_items), sort)
+        global_posts = await search_reddit_global(search_query, min(25, max_items), sort)
         all_posts.extend(global_posts)
     except Exception as e:
-        print(f"Error in global search: {e}")
+        logger.error(f"Error in global search: {e}")
+        FETCH_FAILURES.inc(source="reddit_api")
     
     # Deduplicate by post_hash
     seen_hashes = set()
@@ -89,15 +111,17 @@ def fetch_reddit_discussions(
             seen_hashes.add(post["post_hash"])
             unique_posts.append(post)
     
-    print(f"Fetched {len(unique_posts)} unique Reddit posts for query: {search_query}")
-    return unique_posts[:max_items]
+    logger.info(f"Fetched {len(unique_posts)} unique Reddit posts for query: {search_query}")
+    unique_posts = unique_posts[:max_items]
+    RECORDS_PROCESSED.inc(len(unique_posts), source="reddit_api", outcome="fetched")
+    return unique_posts
 
 
-def search_subreddit(subreddit: str, query: str, limit: int = 10, sort: str = "relevance") -> list[dict]:
+async def search_subreddit(subreddit: str, query: str, limit: int = 10, sort: str = "relevance") -> list[dict]:
     """
     Search within a specific subreddit.
     """
-    url = f"https://www.reddit.com/r/{subreddit}/search.json"
+    url = f"{settings.REDDIT_BASE_URL}/r/{subreddit}/search.json"
     params = {
         "q": query,
         "restrict_sr": "on",  # Restrict to this subreddit
@@ -106,23 +130,69 @@ def search_subreddit(subreddit: str, query: str, limit: int = 10, sort: str = "r
         "limit": limit
     }
     
-    response = requests.get(url, params=params, headers=HEADERS, timeout=30)
+    response = await _http.get(url, params=params, headers=HEADERS, timeout=30)
     
-    if response.status_code != 200:
-        print(f"Reddit API error for r/{subreddit}: {response.status_code}")
-        return []
+    # Still throttled or failing after retries: raise rather than return nothing
+    response.raise_for_status()
     
-    data = response.json()
+    data = jsonio.loads(response.content)
     posts = data.get("data", {}).get("children", [])
     
     return [normalize_reddit_post(post["data"], query) for post in posts if post.get("data")]
 
 
-def search_reddit_global(query: str, limit: int = 25, sort: str = "relevance") -> list[dict]:
+async def search_subreddits_combined(
+    subreddits: list[str],
+    query: str,
+    per_subreddit: int = 10,
+    sort: str = "relevance"
+) -> list[dict]:
+    """
+    Search several subreddits with one combined listing (r/a+b+c/search.json).
+    
+    The merged listing is paged until every subreddit has `per_subreddit` posts,
+    the listing ends, or REDDIT_COMBINED_MAX_PAGES requests have been made. Posts
+    are attributed to their own subreddit and capped per subreddit, so one busy
+    subreddit can't crowd out the rest, as with one search per subreddit.
+    """
+    url = f"{settings.REDDIT_BASE_URL}/r/{'+'.join(subreddits)}/search.json"
+    params = {
+        "q": query,
+        "restrict_sr": "on",
+        "sort": sort,
+        "t": "all",
+        "limit": 100  # Reddit's page size maximum
+    }
+    taken = {subreddit.lower(): 0 for subreddit in subreddits}
+    posts = []
+    
+    for _ in range(settings.REDDIT_COMBINED_MAX_PAGES):
+        response = await _http.get(url, params=params, headers=HEADERS, timeout=30)
+        response.raise_for_status()
+        
+        data = jsonio.loads(response.content).get("data", {})
+        for child in data.get("children", []):
+            post_data = child.get("data")
+            subreddit = (post_data or {}).get("subreddit", "").lower()
+            if subreddit in taken and taken[subreddit] < per_subreddit:
+                taken[subreddit] += 1
+                posts.append(normalize_reddit_post(post_data, query))
+        
+        if not data.get("after") or all(count >= per_subreddit for count in taken.values()):
+            break
+        params["after"] = data["after"]
+    
+    short = [subreddit for subreddit, count in taken.items() if count < per_subreddit]
+    if short:
+        logger.debug(f"Combined search for '{query}' under quota in: {', '.join(short)}")
+    return posts
+
+
+async def search_reddit_global(query: str, limit: int = 25, sort: str = "relevance") -> list[dict]:
     """
     Search Reddit globally across all subreddits.
     """
-    url = "https://www.reddit.com/search.json"
+    url = f"{settings.REDDIT_BASE_URL}/search.json"
     params = {
         "q": query,
         "sort": sort,
@@ -131,13 +201,11 @@ def search_reddit_global(query: str, limit: int = 25, sort: str = "relevance") -
         "type": "link"  # Only posts, not comments
     }
     
-    response = requests.get(url, params=params, headers=HEADERS, timeout=30)
+    response = await _http.get(url, params=params, headers=HEADERS, timeout=30)
     
-    if response.status_code != 200:
-        print(f"Reddit global search error: {response.status_code}")
-        return []
+    response.raise_for_status()
     
-    data = response.json()
+    data = jsonio.loads(response.content)
     posts = data.get("data", {}).get("children", [])
     
     return [normalize_reddit_post(post["data"], query) for post in posts if post.get("data")]
@@ -160,8 +228,8 @@ def normalize_reddit_post(post_data: dict, search_query: str) -> dict:
             created_iso = str(created_utc)
     
     return {
-        "post_hash": generate_post_hash(title, subreddit, str(created_utc)),
-        "post_id": post_data.get("id", ""),
+        "post_hash": generate_post_hash(title, subreddit, created_utc, post_data.get("id"), post_data.get("permalink")),
+        "post_id": reddit_post_id(post_data.get("id"), post_data.get("permalink")) or "",
         "title": title,
         "body": post_data.get("selftext", "")[:5000],  # Limit body length
         "subreddit": subreddit,
@@ -176,7 +244,7 @@ def normalize_reddit_post(post_data: dict, search_query: str) -> dict:
     }
 
 
-def fetch_discussions_batch(
+async def fetch_discussions_batch(
     queries: list[str],
     subreddits: list[str] = None,
     max_per_query: int = 20
@@ -188,35 +256,110 @@ def fetch_discussions_batch(
     seen_hashes = set()
     
     for query in queries:
-        print(f"Fetching Reddit discussions for: {query}")
-        posts = fetch_reddit_discussions(query, subreddits, max_per_query)
+        logger.info(f"Fetching Reddit discussions for: {query}")
+        posts = await fetch_reddit_discussions(query, subreddits, max_per_query)
         
         for post in posts:
             if post["post_hash"] not in seen_hashes:
                 seen_hashes.add(post["post_hash"])
                 all_posts.append(post)
         
-        print(f"  Found {len(posts)} posts, {len(all_posts)} total unique")
-        
-        # Rate limiting between queries
-        time.sleep(2)
+        logger.info(f"Found {len(posts)} posts, {len(all_posts)} total unique")
     
     return all_posts
 
 
-def get_subreddit_hot_posts(subreddit: str, limit: int = 25) -> list[dict]:
+async def get_subreddit_hot_posts(subreddit: str, limit: int = 25) -> list[dict]:
     """
     Get hot posts from a specific subreddit (for trending topics).
     """
-    url = f"https://www.reddit.com/r/{subreddit}/hot.json"
+    url = f"{settings.REDDIT_BASE_URL}/r/{subreddit}/hot.json"
     params = {"limit": limit}
     
-    response = requests.get(url, params=params, headers=HEADERS, timeout=30)
+    response = await _http.get(url, params=params, headers=HEADERS, timeout=30)
+    response.raise_for_status()
     
-    if response.status_code != 200:
-        return []
-    
-    data = response.json()
+    data = jsonio.loads(response.content)
     posts = data.get("data", {}).get("children", [])
     
-    return [normalize_reddit_post(post["data"], f"hot:{subreddit}") for post in posts if post.get("data")]
+    hot_posts = [normalize_reddit_post(post["data"], f"hot:{subreddit}") for post in posts if post.get("data")]
+    RECORDS_PROCESSED.inc(len(hot_posts), source="reddit_api", outcome="fetched")
+    return hot_posts
+
+
+def normalize_reddit_comment(comment_data: dict, post_hash: str, depth: int) -> dict:
+    """
+    Normalize a Reddit comment (`t1`) to our standard format.
+    comment_id, the t1_ fullname, is the dedup key.
+    """
+    created_utc = comment_data.get("created_utc", 0)
+    return {
+        "comment_id": comment_data.get("name") or f"t1_{comment_data.get('id', '')}",
+        "post_hash": post_hash,
+        "parent_id": comment_data.get("parent_id", ""),
+        "subreddit": comment_data.get("subreddit", ""),
+        "author": comment_data.get("author", ""),
+        "body": (comment_data.get("body") or "")[:5000],  # Limit body length
+        "upvotes": int(comment_data.get("score", 0)),
+        "depth": depth,
+        "created_utc": datetime.fromtimestamp(created_utc, tz=timezone.utc).isoformat() if created_utc else None,
+        "source": "reddit_api"
+    }
+
+
+def iter_comment_tree(children: list, post_hash: str, max_depth: int) -> Iterator[dict]:
+    """
+    Flatten a comment listing depth-first, parents before replies.
+
+    Uses an explicit stack, so deep threads don't recurse. Replies deeper than
+    max_depth levels, "load more" stubs and deleted comments are skipped.
+    Comments are yielded one at a time, so callers can stop at a size cap
+    without normalizing the rest.
+    """
+    stack = [(child, 0) for child in reversed(children)]
+    while stack:
+        child, depth = stack.pop()
+        if child.get("kind") != "t1":
+            continue
+        data = child.get("data") or {}
+        if data.get("body") not in (None, "", "[deleted]", "[removed]"):
+            yield normalize_reddit_comment(data, post_hash, depth)
+        
+        replies = data.get("replies")
+        if depth + 1 < max_depth and isinstance(replies, dict):
+            stack.extend((reply, depth + 1) for reply in reversed(replies.get("data", {}).get("children", [])))
+
+
+async def fetch_post_comments(post: dict, max_comments: int = None, max_depth: int = None) -> list[dict]:
+    """
+    Fetch and flatten the top comments of a post.
+    
+    Args:
+        post: Normalized post with post_id and post_hash
+        max_comments: Most comments kept (default REDDIT_COMMENTS_PER_POST)
+        max_depth: Reply levels kept, 1 = top-level only (default REDDIT_COMMENTS_MAX_DEPTH)
+        
+    Returns:
+        Normalized comments, parents before replies
+    """
+    max_comments = max_comments or settings.REDDIT_COMMENTS_PER_POST
+    max_depth = max_depth or settings.REDDIT_COMMENTS_MAX_DEPTH
+    
+    url = f"{settings.REDDIT_BASE_URL}/comments/{post['post_id']}.json"
+    params = {
+        "sort": "top",
+        "limit": max_comments,
+        "depth": max_depth,  # Reddit trims the tree before sending it
+        "raw_json": 1
+    }
+    
+    response = await _http.get(url, params=params, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    
+    # [post listing, comment listing]
+    listings = jsonio.loads(response.content)
+    children = listings[1].get("data", {}).get("children", []) if len(listings) > 1 else []
+    
+    comments = list(islice(iter_comment_tree(children, post["post_hash"], max_depth), max_comments))
+    RECORDS_PROCESSED.inc(len(comments), source="reddit_comments", outcome="fetched")
+    return comments
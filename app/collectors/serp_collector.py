@@ -1,11 +1,31 @@
 """
 SERP Collector - Fetches job listings from Google Jobs via SerpAPI.
 """
-import requests
+import httpx
 import hashlib
 from datetime import datetime, timezone
+from typing import Optional
 from app.core.config import settings
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.metrics import RECORDS_PROCESSED, FETCH_FAILURES
+from app.core.rate_limit import UpstreamUnavailable
 from app.services.key_service import get_serp_key
+from app.services.job_fields_service import extract_job_fields
+
+logger = get_logger(__name__)
+_http = get_client("serpapi")
+
+
+class SerpAPIError(httpx.HTTPError):
+    """A SerpAPI search failed. Carries the query and status, not the request URL (it holds api_key)."""
+
+    def __init__(self, query: str, status_code: Optional[int] = None):
+        self.query = query
+        self.status_code = status_code
+        reason = f"status {status_code}" if status_code is not None else "request error"
+        super().__init__(f"SerpAPI search for {query!r} failed ({reason})")
 
 
 def generate_job_hash(title: str, company: str, location: str) -> str:
@@ -14,15 +34,15 @@ def generate_job_hash(title: str, company: str, location: str) -> str:
     return hashlib.md5(key.encode()).hexdigest()
 
 
-def _get_serp_api_key() -> str:
+async def _get_serp_api_key() -> str:
     """Get SERP API key (database first, then env fallback)."""
-    api_key = get_serp_key(fallback=settings.SERP_API_KEY)
+    api_key = await get_serp_key(fallback=settings.SERP_API_KEY)
     if not api_key or api_key == "your_serp_api_key_here":
         raise ValueError("SERP_API_KEY not configured. Add it via Admin Portal or get one from https://serpapi.com/")
     return api_key
 
 
-def fetch_jobs_from_serp(
+async def fetch_jobs_from_serp(
     query: str,
     location: str = "United States",
     num_results: int = 20
@@ -38,9 +58,9 @@ def fetch_jobs_from_serp(
     Returns:
         List of normalized job records
     """
-    api_key = _get_serp_api_key()
+    api_key = await _get_serp_api_key()
     
-    url = "https://serpapi.com/search.json"
+    url = f"{settings.SERP_API_BASE_URL}/search.json"
     params = {
         "engine": "google_jobs",
         "q": query,
@@ -52,9 +72,9 @@ def fetch_jobs_from_serp(
     }
     
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = await _http.get(url, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        data = jsonio.loads(response.content)
         
         jobs = data.get("jobs_results", [])
         normalized_jobs = []
@@ -78,22 +98,36 @@ def fetch_jobs_from_serp(
                 "source_job_id": job.get("job_id", ""),
                 "work_type": job.get("detected_extensions", {}).get("work_from_home", "onsite"),
                 "experience_level": "",  # Not always available
+                "search_query": query,
                 "raw_data": job,
                 "fetched_at": datetime.now(timezone.utc).isoformat()
             }
             normalized_jobs.append(normalized)
         
+        # Typed salary / posted_at / work_mode columns, parsed once per page
+        extract_job_fields(normalized_jobs)
+        
+        RECORDS_PROCESSED.inc(len(normalized_jobs), source="serp_google_jobs", outcome="fetched")
         return normalized_jobs
         
-    except requests.RequestException as e:
-        print(f"SERP API error: {e}")
-        return []
+    except UpstreamUnavailable:
+        FETCH_FAILURES.inc(source="serp_google_jobs")
+        raise
+    except httpx.HTTPError as e:
+        # Raised after retries are exhausted, so callers can tell a failed
+        # query apart from one with no results. httpx puts the request URL,
+        # api_key included, in its messages, so neither is logged nor re-raised.
+        status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+        logger.error(f"SERP API error for {query!r}: {status_code or type(e).__name__}")
+        FETCH_FAILURES.inc(source="serp_google_jobs")
+        raise SerpAPIError(query, status_code) from None
 
 
-def fetch_jobs_batch(
+async def fetch_jobs_batch(
     queries: list[str],
     location: str = "United States",
-    num_per_query: int = 10
+    num_per_query: int = 10,
+    query_stats: Optional[dict] = None
 ) -> list[dict]:
     """
     Fetch jobs for multiple queries in batch.
@@ -102,6 +136,8 @@ def fetch_jobs_batch(
         queries: List of job role keywords
         location: Location to search
         num_per_query: Results per query
+        query_stats: If given, filled with results returned per query searched
+            (0 for a failed search)
         
     Returns:
         Combined list of all job results
@@ -109,15 +145,25 @@ def fetch_jobs_batch(
     all_jobs = []
     seen_hashes = set()
     
-    for query in queries:
-        print(f"Fetching jobs for: {query}")
-        jobs = fetch_jobs_from_serp(query, location, num_per_query)
+    for i, query in enumerate(queries):
+        logger.info(f"Fetching jobs for: {query}")
+        try:
+            jobs = await fetch_jobs_from_serp(query, location, num_per_query)
+        except UpstreamUnavailable:
+            logger.error(f"SerpAPI unavailable, skipping remaining {len(queries) - i} queries")
+            break
+        except httpx.HTTPError:
+            if query_stats is not None:
+                query_stats[query] = 0
+            continue
+        if query_stats is not None:
+            query_stats[query] = len(jobs)
         
         for job in jobs:
             if job["job_hash"] not in seen_hashes:
                 seen_hashes.add(job["job_hash"])
                 all_jobs.append(job)
         
-        print(f"  Found {len(jobs)} jobs, {len(all_jobs)} total unique")
+        logger.info(f"Found {len(jobs)} jobs, {len(all_jobs)} total unique")
     
     return all_jobs
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -16,6 +17,78 @@ class Settings(BaseSettings):
     
     # Service Config
     HOST_URL: str = "http://localhost:8002"
+    LOG_LEVEL: str = "INFO"
+    
+    # Upstream base URLs (overridable for offline benchmarks)
+    SERP_API_BASE_URL: str = "https://serpapi.com"
+    REDDIT_BASE_URL: str = "https://www.reddit.com"
+    APIFY_BASE_URL: str = "https://api.apify.com"
+    
+    # Upstream rate control (retries, backoff, circuit breaker)
+    UPSTREAM_MAX_RETRIES: int = 3
+    UPSTREAM_BACKOFF_BASE: float = 0.5
+    UPSTREAM_BACKOFF_MAX: float = 60.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+    REDDIT_MIN_INTERVAL: float = 1.0
+    
+    # Reddit search: "per_subreddit" (one request per subreddit) or "combined"
+    # (one paginated r/a+b+c search, at most REDDIT_COMBINED_MAX_PAGES requests)
+    REDDIT_SEARCH_MODE: Literal["per_subreddit", "combined"] = "per_subreddit"
+    REDDIT_COMBINED_MAX_PAGES: int = 3
+    
+    # Comment ingestion for high-engagement posts (run-discussions): posts need both
+    # thresholds; up to REDDIT_COMMENTS_MAX_POSTS per run, REDDIT_COMMENTS_CONCURRENCY
+    # comment requests in flight, and per post at most REDDIT_COMMENTS_PER_POST comments
+    # no deeper than REDDIT_COMMENTS_MAX_DEPTH levels
+    REDDIT_COMMENTS_ENABLED: bool = False
+    REDDIT_COMMENTS_MIN_COMMENTS: int = 20
+    REDDIT_COMMENTS_MIN_UPVOTES: int = 10
+    REDDIT_COMMENTS_MAX_POSTS: int = 25
+    REDDIT_COMMENTS_CONCURRENCY: int = 4
+    REDDIT_COMMENTS_PER_POST: int = 200
+    REDDIT_COMMENTS_MAX_DEPTH: int = 3
+    
+    # Gzip request bodies sent to Supabase (only if the gateway accepts Content-Encoding: gzip)
+    SUPABASE_GZIP_REQUESTS: bool = False
+    
+    # Apify actor runs (fallback is hedged in after the primary's latency percentile)
+    APIFY_RUN_TIMEOUT: int = 300
+    APIFY_HEDGE_PERCENTILE: float = 0.9
+    APIFY_HEDGE_DEFAULT_DELAY: float = 60.0
+    APIFY_HEDGE_MIN_DELAY: float = 5.0
+    
+    # Exports and incremental syncs skip rows inserted less than this many seconds ago,
+    # so a cursor never passes an insert that hasn't committed yet
+    EXPORT_SETTLE_SECONDS: float = 30.0
+    
+    # Local Parquet copy of jobs/discussions/trends for aggregation (empty = disabled)
+    COLUMNAR_STORE_DIR: str = ""
+    
+    # Local skill -> jobs inverted index for /api/jobs/search (empty = disabled)
+    SKILL_INDEX_DIR: str = ""
+    
+    # Where aggregate-trends counts skills: "python" (download texts, or the columnar
+    # store when set) or "database" (per-record skill rows grouped by an RPC)
+    SKILL_AGGREGATION_MODE: Literal["python", "database"] = "python"
+    
+    # Job collection query scheduling: SerpAPI searches per run, share of them spent
+    # exploring lower-yield queries, and weight of the latest run in each yield estimate
+    SERP_QUERY_BUDGET: int = 15
+    QUERY_EXPLORATION_RATE: float = 0.2
+    QUERY_YIELD_ALPHA: float = 0.3
+    
+    # Seconds GET /api/trends trusts its cached snapshot version before re-checking trend_snapshots
+    TRENDS_CACHE_TTL: float = 60.0
+    
+    # Skill pairs must share at least this many documents to be stored
+    COOCCURRENCE_MIN_COUNT: int = 3
+    
+    # Profiling (opt-in; requests send "X-Profile: 1" or match PROFILE_PATHS)
+    PROFILING_ENABLED: bool = False
+    PROFILE_PATHS: str = ""
+    PROFILE_DIR: str = "/tmp/profiles"
+    PROFILE_SAMPLE_INTERVAL: float = 0.005
     
     # Default search config
     DEFAULT_REGION: str = "us"
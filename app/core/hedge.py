@@ -0,0 +1,141 @@
+"""
+Hedge - Hedged execution of a slow primary call with a fallback.
+
+The primary starts alone. If it hasn't finished after `delay` (usually a
+high percentile of its recent latency), the fallback is started alongside
+it and the first usable result wins. The other task is cancelled in the
+background, so callers that clean up on cancellation (e.g. aborting an
+Apify run) do so without holding up the winner.
+
+Hedge rate and winners are counted in `hedged_calls_total` and
+`hedge_wins_total`.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+from app.core.logger import get_logger
+from app.core.metrics import HEDGED_CALLS, HEDGE_WINS
+
+logger = get_logger(__name__)
+
+# Tasks cancelled after losing a hedge, kept referenced until they finish cleaning up
+_background: set = set()
+
+
+class LatencyWindow:
+    """Sliding window of recent call durations."""
+
+    def __init__(self, size: int = 100, min_samples: int = 10):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """
+        Get the q-th quantile (0-1) of the window.
+
+        Returns:
+            Duration in seconds, or None until min_samples have been observed
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _cancel_in_background(task: asyncio.Task):
+    task.cancel()
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def _outcome(task: asyncio.Task, name: str, operation: str):
+    """Return (result, error) of a finished task, logging failures."""
+    if task.cancelled():
+        return None, asyncio.CancelledError()
+    error = task.exception()
+    if error is not None:
+        logger.warning(f"{operation} {name} failed: {error}")
+        return None, error
+    return task.result(), None
+
+
+async def hedged(
+    operation: str,
+    primary: Callable[[], Awaitable],
+    fallback: Callable[[], Awaitable],
+    delay: float,
+    latency: LatencyWindow = None,
+    usable: Callable[[object], bool] = bool
+):
+    """
+    Run `primary`, hedging with `fallback` if it is slower than `delay`.
+
+    Args:
+        operation: Name used in logs and metrics
+        primary: Factory for the primary coroutine
+        fallback: Factory for the fallback coroutine
+        delay: Seconds to wait for the primary before starting the fallback
+        latency: Window to record primary durations in (cancelled primaries
+            are recorded with their elapsed time, a lower bound)
+        usable: Predicate for a result worth returning
+
+    Returns:
+        The first usable result. If neither is usable, the fallback's result
+        (or its exception is raised).
+    """
+    started = time.monotonic()
+    primary_task = asyncio.ensure_future(primary())
+
+    def record_primary(task: asyncio.Task):
+        if latency is not None and (task.cancelled() or task.exception() is None):
+            latency.observe(time.monotonic() - started)
+
+    primary_task.add_done_callback(record_primary)
+
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+    except asyncio.CancelledError:
+        _cancel_in_background(primary_task)
+        raise
+
+    if done:
+        result, _ = _outcome(primary_task, "primary", operation)
+        if usable(result):
+            HEDGED_CALLS.inc(operation=operation, path="primary")
+            return result
+        HEDGED_CALLS.inc(operation=operation, path="fallback_after_failure")
+        return await fallback()
+
+    logger.info(f"{operation} primary slower than {delay:.1f}s, starting fallback")
+    HEDGED_CALLS.inc(operation=operation, path="hedged")
+    fallback_task = asyncio.ensure_future(fallback())
+    tasks = {primary_task: "primary", fallback_task: "fallback"}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer the primary if both finished in the same tick
+            for task in sorted(done, key=lambda t: t is not primary_task):
+                result, _ = _outcome(task, tasks[task], operation)
+                if usable(result):
+                    HEDGE_WINS.inc(operation=operation, winner=tasks[task])
+                    for other in pending:
+                        _cancel_in_background(other)
+                    pending = set()
+                    return result
+    except asyncio.CancelledError:
+        for task in pending:
+            _cancel_in_background(task)
+        raise
+
+    HEDGE_WINS.inc(operation=operation, winner="none")
+    return fallback_task.result()
@@ -0,0 +1,171 @@
+"""
+HTTP - Shared, instrumented async clients for upstream services.
+
+Every outbound call goes through a per-upstream client, which reuses
+connections and records request counts by status code and latency in the
+metrics registry. The underlying httpx.AsyncClient is created per event
+loop, so the same module-level client works under uvicorn, Mangum and
+test clients that each run their own loop.
+
+Requests are paced, retried and circuit-broken by the upstream's
+RateController (see `app.core.rate_limit`). A response that is still
+throttled after the last retry is returned as-is, so callers decide how to
+surface it.
+
+`json=` bodies are encoded with the fast codec in `app.core.jsonio`, and
+for upstreams created with gzip_requests, bodies over GZIP_MIN_BYTES are
+sent gzip-compressed. Responses are requested with Accept-Encoding
+gzip and decompressed by httpx.
+"""
+import asyncio
+import gzip
+import time
+import weakref
+
+import httpx
+
+from app.core.config import settings
+from app.core import jsonio
+from app.core.metrics import UPSTREAM_REQUESTS, UPSTREAM_LATENCY, UPSTREAM_RETRIES, UPSTREAM_BYTES
+from app.core.rate_limit import (
+    UpstreamUnavailable,
+    backoff_delay,
+    get_controller,
+    is_retryable_error,
+    is_retryable_status,
+)
+
+
+# Request bodies smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 16 * 1024
+
+# event loop -> {upstream: httpx.AsyncClient}
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+class UpstreamClient:
+    """Async HTTP client for one upstream (serpapi, reddit, apify, supabase)."""
+
+    def __init__(self, upstream: str, gzip_requests: bool = False):
+        self.upstream = upstream
+        self.gzip_requests = gzip_requests
+        self.rate = get_controller(upstream)
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        clients = _loop_clients.setdefault(loop, {})
+        client = clients.get(self.upstream)
+        if client is None or client.is_closed:
+            client = clients[self.upstream] = httpx.AsyncClient(follow_redirects=True)
+        return client
+
+    def _encode_body(self, kwargs: dict):
+        """Replace a `json=` argument with a pre-encoded (and maybe gzipped) body."""
+        if "json" not in kwargs:
+            return
+        body = jsonio.dumps(kwargs.pop("json"))
+        headers = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        if self.gzip_requests and len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        kwargs["content"] = body
+        kwargs["headers"] = headers
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        try:
+            await self.rate.acquire()
+        except UpstreamUnavailable:
+            UPSTREAM_REQUESTS.inc(upstream=self.upstream, status="circuit_open")
+            raise
+
+        started = time.perf_counter()
+        try:
+            response = await self._client().request(method, url, **kwargs)
+        except httpx.HTTPError:
+            UPSTREAM_REQUESTS.inc(upstream=self.upstream, status="error")
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream=self.upstream)
+
+        UPSTREAM_REQUESTS.inc(upstream=self.upstream, status=str(response.status_code))
+        UPSTREAM_BYTES.inc(len(kwargs.get("content") or b""), upstream=self.upstream, direction="sent")
+        UPSTREAM_BYTES.inc(response.num_bytes_downloaded, upstream=self.upstream, direction="received")
+        return response
+
+    async def request(self, method: str, url: str, max_retries: int = None, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying throttling, gateway errors and transport errors.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            max_retries: Override UPSTREAM_MAX_RETRIES for this call
+            **kwargs: Passed to httpx.AsyncClient.request
+
+        Returns:
+            The final response, which may still be an error status
+        """
+        method = method.upper()
+        retries = settings.UPSTREAM_MAX_RETRIES if max_retries is None else max_retries
+        self._encode_body(kwargs)
+
+        for attempt in range(retries + 1):
+            try:
+                response = await self._send(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                if attempt == retries or self.rate.probing or not is_retryable_error(method, e):
+                    # One breaker failure per logical request, not per attempt
+                    self.rate.record_failure()
+                    raise
+                UPSTREAM_RETRIES.inc(upstream=self.upstream, reason=type(e).__name__)
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            retry_after = self.rate.record_response(response)
+            # A Retry-After longer than we are willing to hold a request open
+            too_long = retry_after is not None and retry_after > settings.UPSTREAM_BACKOFF_MAX
+            if attempt == retries or self.rate.probing or too_long or not is_retryable_status(method, response.status_code):
+                if response.status_code >= 500:
+                    self.rate.record_failure()
+                return response
+
+            UPSTREAM_RETRIES.inc(upstream=self.upstream, reason=str(response.status_code))
+            if retry_after is None:
+                await asyncio.sleep(backoff_delay(attempt))
+            # With Retry-After the controller pauses the upstream and the next
+            # acquire() waits it out
+
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+_clients: dict = {}
+
+
+def get_client(upstream: str) -> UpstreamClient:
+    """Get the shared client for an upstream."""
+    client = _clients.get(upstream)
+    if client is None:
+        client = _clients[upstream] = UpstreamClient(
+            upstream,
+            gzip_requests=upstream == "supabase" and settings.SUPABASE_GZIP_REQUESTS
+        )
+    return client
+
+
+async def close_clients():
+    """Close the clients bound to the running event loop."""
+    clients = _loop_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
@@ -0,0 +1,45 @@
+"""
+JSON IO - Fast JSON encoding/decoding with an optional orjson backend.
+
+orjson is used when installed and is several times faster than the stdlib
+on the large payloads this service moves (SerpAPI results with full
+descriptions, whole-table PostgREST reads). Without it everything falls back
+to the stdlib `json` module with the same interface.
+
+Also provides FastJSONResponse, the app's default response class.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+FAST_JSON = orjson is not None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def loads(data: Any) -> Any:
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast codec."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,63 @@
+"""
+Logging - Structured JSON logs written off the request thread.
+
+Records are put on an in-memory queue by a QueueHandler and formatted and
+written by a background QueueListener, so logging from the collection and
+write loops never blocks on stderr.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level: str = "INFO"):
+    """Route the `app` logger hierarchy through a non-blocking queue handler."""
+    global _listener
+    if _listener:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger("app")
+    root.setLevel(level.upper())
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger under the `app` hierarchy."""
+    return logging.getLogger(name)
@@ -0,0 +1,176 @@
+"""
+Metrics - In-process counters and histograms in Prometheus text format.
+
+Metrics are registered at import time and rendered by the `/metrics`
+endpoint. Updates take a single lock and touch a dict entry, so they are
+cheap enough for per-record and per-request instrumentation.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_registry: list = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        return self._values.get(key, 0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            labels = _format_labels(self.label_names, key)
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Requests made to upstream services by status code",
+    labels=("upstream", "status")
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Upstream request latency",
+    labels=("upstream",)
+)
+UPSTREAM_BYTES = Counter(
+    "upstream_bytes_total",
+    "Bytes sent to and received from upstream services (as sent on the wire)",
+    labels=("upstream", "direction")
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries_total",
+    "Upstream requests retried, by the status or error that caused the retry",
+    labels=("upstream", "reason")
+)
+CIRCUIT_OPENED = Counter(
+    "upstream_circuit_opened_total",
+    "Times an upstream circuit breaker opened",
+    labels=("upstream",)
+)
+FETCH_FAILURES = Counter(
+    "collector_fetch_failures_total",
+    "Collector fetches (one query or subreddit) that failed after retries",
+    labels=("source",)
+)
+RECORDS_PROCESSED = Counter(
+    "records_processed_total",
+    "Records fetched, inserted, skipped or failed per source",
+    labels=("source", "outcome")
+)
+SKILL_EXTRACTION_SECONDS = Histogram(
+    "skill_extraction_seconds",
+    "Skill extraction time per document",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+CRON_STAGE_SECONDS = Histogram(
+    "cron_stage_duration_seconds",
+    "Duration of cron pipeline stages",
+    labels=("stage",)
+)
+COALESCED_CALLS = Counter(
+    "coalesced_calls_total",
+    "Calls that joined an identical in-flight execution",
+    labels=("namespace",)
+)
+HEDGED_CALLS = Counter(
+    "hedged_calls_total",
+    "Hedged operations by path: primary only, hedged, or fallback after primary failure",
+    labels=("operation", "path")
+)
+HEDGE_WINS = Counter(
+    "hedge_wins_total",
+    "Winner of hedged operations where both primary and fallback ran",
+    labels=("operation", "winner")
+)
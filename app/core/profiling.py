@@ -0,0 +1,322 @@
+"""
+Profiling - Opt-in sampling CPU profiler and tracemalloc for requests.
+
+The middleware is only installed when PROFILING_ENABLED is set, so there is
+no overhead otherwise. When installed, a request is profiled if it sends
+`X-Profile: 1` or its path starts with one of PROFILE_PATHS (for cron
+triggers that can't set headers). One request is profiled at a time.
+
+A background thread samples every thread's Python stack, keeping samples
+that pass through service code. For the event loop thread it also samples
+the suspended tasks' coroutine stacks, so time spent awaiting the network
+or sleeping is charged to the awaited call rather than lost in the loop's
+select(). tracemalloc tracks peak memory and allocation sites. The summary
+is saved as JSON under PROFILE_DIR together with folded stacks for flame
+graphs, and the response carries an `X-Profile-Id` header for
+`/api/debug/profiles/{id}`.
+"""
+import asyncio
+import json
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_HEADER = b"x-profile"
+TOP_N = 20
+
+# Leaf-frame file fragments used to bucket where sampled time goes
+_CATEGORY_PATTERNS = [
+    ("network", ("socket.py", "ssl.py", "selectors.py", "urllib3", "http/client.py", "httpx", "httpcore")),
+    ("regex", ("/re/", "sre_")),
+    ("json", ("/json/", "orjson")),
+    ("threadpool", ("starlette/concurrency.py", "concurrent/futures")),
+]
+
+# Await machinery skipped when looking for the call a suspended task is waiting on
+_AWAIT_PLUMBING = ("asyncio", "anyio")
+
+_profile_lock = threading.Lock()
+
+
+def _categorize(frame) -> str:
+    filename = frame.f_code.co_filename
+    for category, patterns in _CATEGORY_PATTERNS:
+        if any(p in filename for p in patterns):
+            return category
+    if frame.f_lineno and "sleep(" in linecache.getline(filename, frame.f_lineno):
+        return "sleeping"
+    return "python"
+
+
+def _categorize_await(stack) -> str:
+    """Bucket a suspended task by the innermost awaited call outside asyncio/anyio."""
+    for frame in reversed(stack):
+        code = frame.f_code
+        if code.co_name == "sleep" and "asyncio" in code.co_filename:
+            return "sleeping"
+        if not any(p in code.co_filename for p in _AWAIT_PLUMBING):
+            category = _categorize(frame)
+            # Service code blocked on a lock, semaphore or queue
+            return "waiting" if category == "python" else category
+    return "waiting"
+
+
+def _in_app(stack: list) -> bool:
+    # This middleware's own frame wraps every request and the lifespan task
+    return any(f.f_code.co_filename.startswith(APP_ROOT) and f.f_code.co_filename != __file__ for f in stack)
+
+
+def _await_stack(coro) -> list:
+    """Follow a coroutine's cr_await chain, outermost frame first."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return stack
+
+
+def _is_running(coro) -> bool:
+    return bool(getattr(coro, "cr_running", False) or getattr(coro, "gi_running", False))
+
+
+def _describe(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Periodically samples Python stacks of all threads running service code.
+
+    Args:
+        interval: Seconds between samples
+        loop: Event loop whose suspended tasks are sampled as well
+        loop_ident: Thread ident of the thread running that loop
+    """
+
+    def __init__(self, interval: float, loop: asyncio.AbstractEventLoop = None, loop_ident: int = None):
+        self.interval = interval
+        self.loop = loop
+        self.loop_ident = loop_ident
+        self.samples = 0
+        self.self_counts = Counter()
+        self.cumulative_counts = Counter()
+        self.categories = Counter()
+        self.folded = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == self.loop_ident:
+                    self._record_tasks()
+                if ident != own_ident:
+                    self._record_thread(frame)
+
+    def _record_thread(self, leaf):
+        stack = []
+        frame = leaf
+        while frame is not None:
+            stack.append(frame)
+            frame = frame.f_back
+        stack.reverse()
+        if _in_app(stack):
+            self._record(stack, _categorize(leaf))
+
+    def _record_tasks(self):
+        """Sample every suspended task on the loop by the call it is awaiting.
+
+        The task the loop is currently stepping shows up in the loop thread's
+        own stack, so it is skipped here. So are tasks waiting on another
+        task, or on a bare future awaited straight from service code (gather,
+        shield, run_in_executor): that work is sampled where it runs.
+        """
+        try:
+            tasks = asyncio.all_tasks(self.loop)
+        except RuntimeError:
+            # The task set changed while it was being copied; skip this tick
+            return
+        for task in tasks:
+            coro = task.get_coro()
+            if coro is None or _is_running(coro):
+                continue
+            stack = _await_stack(coro)
+            # The future the task is blocked on; cr_await only exposes its iterator
+            waiter = getattr(task, "_fut_waiter", None)
+            if isinstance(waiter, asyncio.Task) or (waiter is not None and _in_app(stack[-1:])) or not _in_app(stack):
+                continue
+            category = _categorize_await(stack)
+            # Charge the sample to the awaited call, not to asyncio/anyio internals
+            while any(p in stack[-1].f_code.co_filename for p in _AWAIT_PLUMBING):
+                stack.pop()
+            self._record(stack, category)
+
+    def _record(self, stack: list, category: str):
+        names = [_describe(f) for f in stack]
+        self.samples += 1
+        self.self_counts[names[-1]] += 1
+        self.cumulative_counts.update(set(names))
+        self.categories[category] += 1
+        self.folded[";".join(names)] += 1
+
+
+
+def should_profile(path: str, headers: list) -> bool:
+    """Check the opt-in header and the always-profile path prefixes."""
+    for key, value in headers:
+        if key == PROFILE_HEADER and value.strip() in (b"1", b"true"):
+            return True
+    prefixes = [p.strip() for p in settings.PROFILE_PATHS.split(",") if p.strip()]
+    return any(path.startswith(prefix) for prefix in prefixes)
+
+
+def _build_summary(profile_id: str, method: str, path: str, started: float, profiler: SamplingProfiler, snapshot, peak: int) -> dict:
+    samples = profiler.samples or 1
+    allocations = [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count
+        }
+        for stat in snapshot.statistics("lineno")[:TOP_N]
+    ] if snapshot else []
+
+    return {
+        "id": profile_id,
+        "method": method,
+        "path": path,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "duration_s": round(time.perf_counter() - started, 3),
+        "sample_interval_s": profiler.interval,
+        "samples": profiler.samples,
+        "time_by_category": {
+            name: round(count / samples, 3) for name, count in profiler.categories.most_common()
+        },
+        "top_self": [
+            {"function": name, "share": round(count / samples, 3)}
+            for name, count in profiler.self_counts.most_common(TOP_N)
+        ],
+        "top_cumulative": [
+            {"function": name, "share": round(count / samples, 3)}
+            for name, count in profiler.cumulative_counts.most_common(TOP_N)
+        ],
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+        "allocation_hotspots": allocations
+    }
+
+
+def _save(summary: dict, folded: Counter):
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILE_DIR, summary["id"])
+    with open(f"{base}.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    with open(f"{base}.folded", "w") as f:
+        for stack, count in folded.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def load_profile(profile_id: str) -> dict:
+    """Load a stored profile summary, or None if it doesn't exist."""
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def list_profiles() -> list[dict]:
+    """List stored profiles, newest first."""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(settings.PROFILE_DIR):
+        if name.endswith(".json"):
+            summary = load_profile(name[:-5])
+            if summary:
+                profiles.append({k: summary[k] for k in ("id", "method", "path", "created_at", "duration_s")})
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles opted-in requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope["path"], scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            logger.info(f"Profile skipped, another request is being profiled: {scope['path']}")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        started = time.perf_counter()
+        profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL, asyncio.get_running_loop(), threading.get_ident())
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler.start()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, linecache.__file__),
+                tracemalloc.Filter(False, __file__)
+            ])
+            if started_tracing:
+                tracemalloc.stop()
+            _profile_lock.release()
+
+            summary = _build_summary(profile_id, scope["method"], scope["path"], started, profiler, snapshot, peak)
+            try:
+                _save(summary, profiler.folded)
+            except OSError as e:
+                logger.error(f"Error saving profile {profile_id}: {e}")
+            logger.info(
+                f"Profiled {scope['method']} {scope['path']}",
+                extra={"profile_id": profile_id, "duration_s": summary["duration_s"], "peak_memory_mb": summary["peak_memory_mb"]}
+            )
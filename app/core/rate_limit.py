@@ -0,0 +1,208 @@
+"""
+Rate Limit - Adaptive pacing, retry backoff and circuit breaking per upstream.
+
+Every request made through `app.core.http` takes a slot from its upstream's
+RateController first. Slots are spaced by an interval that adapts to what
+the upstream reports:
+
+- `X-Ratelimit-Remaining` / `X-Ratelimit-Reset` (Reddit) spread the remaining
+  budget evenly over the rest of the window, so throughput stays at the
+  allowed ceiling without running into 429s.
+- `Retry-After` on a 429/503 pauses the whole upstream, not just the caller
+  that was throttled.
+- Without headers, a 429 doubles the interval and successes decay it back
+  towards the configured minimum.
+
+Consecutive 5xx responses or transport errors open a circuit breaker. While
+it is open, calls fail fast with UpstreamUnavailable. After
+CIRCUIT_RESET_SECONDS a single probe is let through to close it again.
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import CIRCUIT_OPENED
+
+logger = get_logger(__name__)
+
+# Statuses worth retrying; 429/503 mean the request was not processed
+RETRY_STATUSES = {429, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+
+# Errors raised before the request reached the upstream, safe to retry for any method
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Ceiling for the header-less adaptive interval (seconds)
+MAX_INTERVAL = 30.0
+
+
+class UpstreamUnavailable(httpx.HTTPError):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+
+def _header_float(headers: httpx.Headers, name: str) -> float:
+    try:
+        return float(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_retry_after(headers: httpx.Headers) -> float:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for a retry attempt (0-based)."""
+    ceiling = min(settings.UPSTREAM_BACKOFF_MAX, settings.UPSTREAM_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def is_retryable_error(method: str, error: httpx.HTTPError) -> bool:
+    """Transport errors are retried for idempotent methods, or if the request was never sent."""
+    if isinstance(error, UpstreamUnavailable) or not isinstance(error, httpx.TransportError):
+        return False
+    return method in IDEMPOTENT_METHODS or isinstance(error, _UNSENT_ERRORS)
+
+
+def is_retryable_status(method: str, status: int) -> bool:
+    """Throttling is always retried; gateway errors only for idempotent methods."""
+    if status in THROTTLE_STATUSES:
+        return True
+    return status in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+
+
+class RateController:
+    """Pacing and circuit state for one upstream."""
+
+    def __init__(self, upstream: str, min_interval: float = 0.0):
+        self.upstream = upstream
+        self.min_interval = min_interval
+        self.interval = min_interval
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    @property
+    def circuit_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def probing(self) -> bool:
+        """True while a half-open probe is in flight; it gets no retries."""
+        return self._probe_started is not None
+
+    def _check_circuit(self):
+        if self._opened_at is None:
+            return
+        now = time.monotonic()
+        reset_after = settings.CIRCUIT_RESET_SECONDS
+        if now - self._opened_at < reset_after:
+            raise UpstreamUnavailable(f"{self.upstream} circuit open after repeated failures")
+        # Half-open: one probe at a time (a stale probe is replaced)
+        if self._probe_started is not None and now - self._probe_started < reset_after:
+            raise UpstreamUnavailable(f"{self.upstream} circuit half-open, probe in progress")
+        self._probe_started = now
+
+    async def acquire(self):
+        """Wait for the next request slot. Raises UpstreamUnavailable if the circuit is open."""
+        while True:
+            self._check_circuit()
+            now = time.monotonic()
+            wait = max(self._next_slot, self._paused_until) - now
+            if wait <= 0:
+                self._next_slot = now + self.interval
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every caller of this upstream for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record_response(self, response: httpx.Response) -> float:
+        """
+        Adapt pacing and circuit state to a response.
+
+        Returns:
+            The Retry-After delay the upstream asked for, or None
+        """
+        headers = response.headers
+        remaining = _header_float(headers, "x-ratelimit-remaining")
+        reset = _header_float(headers, "x-ratelimit-reset")
+        retry_after = parse_retry_after(headers) if response.status_code in THROTTLE_STATUSES else None
+
+        if remaining is not None and reset is not None:
+            if remaining < 1:
+                self.pause(reset)
+            # Spread what's left of the budget over the rest of the window
+            self.interval = max(self.min_interval, reset / max(remaining, 1.0))
+        elif response.status_code == 429:
+            self.interval = min(MAX_INTERVAL, max(self.interval * 2, 0.1))
+        elif response.status_code < 400:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+
+        if retry_after is not None:
+            self.pause(retry_after)
+
+        # 5xx failures are recorded by the caller once its retries are spent
+        if response.status_code < 500:
+            self.record_success()
+
+        return retry_after
+
+    def record_success(self):
+        if self._opened_at is not None:
+            logger.info(f"Circuit closed for {self.upstream}")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._probe_started is not None or self._failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            if self._opened_at is None or self._probe_started is not None:
+                logger.warning(f"Circuit opened for {self.upstream} after {self._failures} consecutive failures")
+                CIRCUIT_OPENED.inc(upstream=self.upstream)
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+
+# Minimum spacing (seconds) before any rate-limit headers have been seen
+DEFAULT_MIN_INTERVALS = {
+    "reddit": settings.REDDIT_MIN_INTERVAL,
+}
+
+_controllers: dict = {}
+
+
+def get_controller(upstream: str) -> RateController:
+    """Get the shared rate controller for an upstream."""
+    controller = _controllers.get(upstream)
+    if controller is None:
+        controller = _controllers[upstream] = RateController(
+            upstream, DEFAULT_MIN_INTERVALS.get(upstream, 0.0)
+        )
+    return controller
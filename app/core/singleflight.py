@@ -0,0 +1,80 @@
+"""
+Single-flight - Coalesces identical concurrent calls into one execution.
+
+Calls are keyed by a namespace plus normalized parameters. While a call is
+in flight, identical calls attach to it and receive its result (or its
+exception) instead of starting another SerpAPI/Reddit/Apify run. The
+shared execution is shielded, so a caller that disconnects doesn't cancel
+it for the others.
+
+Coalescing is per process: separate Lambda containers don't share state.
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable
+
+from app.core.logger import get_logger
+from app.core.metrics import COALESCED_CALLS
+
+logger = get_logger(__name__)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize(v) for v in value)
+    return value
+
+
+def make_key(namespace: str, params: dict = None) -> str:
+    """Build a coalescing key from a namespace and request parameters."""
+    return f"{namespace}:{json.dumps(_normalize(params or {}), sort_keys=True, default=str)}"
+
+
+class SingleFlight:
+    """Tracks in-flight executions by key."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]) -> tuple[object, bool]:
+        """
+        Run `fn` once per key at a time.
+
+        Returns:
+            (result, shared) where shared is True if this call joined an
+            execution started by another caller
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+
+        if not shared:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight execution: {key[:120]}")
+
+        return await asyncio.shield(task), shared
+
+
+_group = SingleFlight()
+
+
+async def coalesce(namespace: str, params: dict, fn: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    Run a route handler through the shared single-flight group.
+
+    The result dict is returned with a `coalesced` flag telling the caller
+    whether it joined an execution that was already running.
+    """
+    result, shared = await _group.do(make_key(namespace, params), fn)
+    if shared:
+        COALESCED_CALLS.inc(namespace=namespace)
+    return {**result, "coalesced": shared}
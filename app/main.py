@@ -9,14 +9,24 @@ It does NOT perform AI analysis - that's for a separate consumer service.
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 from mangum import Mangum
 
-from app.routers import jobs, discussions, cron
+from app.core.config import settings
+from app.core.jsonio import FastJSONResponse
+from app.core.logger import setup_logging
+from app.core.metrics import render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.routers import jobs, discussions, cron, debug, export, trends
+
+setup_logging(settings.LOG_LEVEL)
 
 app = FastAPI(
     title="Trend & Skill Data Collection Service",
     description="Collects job listings and skill discussions for trend analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS
@@ -28,10 +38,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=16 * 1024)
+
+# Profiling is opt-in: nothing is installed unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 app.include_router(discussions.router, prefix="/api/discussions", tags=["Discussions"])
 app.include_router(cron.router, prefix="/api/cron", tags=["Cron"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
+app.include_router(trends.router, prefix="/api/trends", tags=["Trends"])
+if settings.PROFILING_ENABLED:
+    app.include_router(debug.router, prefix="/api/debug", tags=["Debug"])
 
 
 @app.get("/")
@@ -43,7 +64,10 @@ def root():
         "endpoints": {
             "jobs": "/api/jobs",
             "discussions": "/api/discussions",
-            "cron": "/api/cron"
+            "cron": "/api/cron",
+            "export": "/api/export",
+            "trends": "/api/trends",
+            "metrics": "/metrics"
         }
     }
 
@@ -53,5 +77,11 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of upstream, record, extraction and cron metrics."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Lambda handler
 handler = Mangum(app)
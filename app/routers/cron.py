@@ -1,17 +1,46 @@
 """
 Cron Router - Scheduled job endpoints for weekly data collection.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from collections import Counter
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timezone
 from app.collectors.serp_collector import fetch_jobs_batch
 from app.collectors.reddit_collector import fetch_discussions_batch
-from app.services.persistence_service import store_jobs, store_discussions, update_skill_trends
-from app.services.normalizer_service import extract_skills_from_text
-import requests
+from app.services.persistence_service import (
+    store_jobs,
+    store_discussions,
+    update_skill_trends,
+    store_leaderboards,
+    get_skill_mention_counts,
+    store_record_skills,
+)
+from app.services.cooccurrence_service import (
+    compute_cooccurrence,
+    fetch_cooccurrence_counts,
+    skill_counts,
+    skill_matrix_from_texts,
+    store_cooccurrence,
+)
+from app.services.trend_service import apply_trend_momentum, compute_leaderboards
+from app.services.cube_service import CUBE_DIMENSIONS, compute_cube, fetch_cube_counts, store_cube
+from app.services import columnar_store, skill_index
+from app.services.trend_read_service import publish_snapshot
+from app.services.comment_service import ingest_comments
+from app.services.dedup_service import backfill_signatures
+from app.services.query_scheduler_service import get_yield_report, load_queries, plan_queries, record_run
+from app.services.export_service import build_filters, iter_pages
 from app.core.config import settings
-from collections import Counter
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.metrics import CRON_STAGE_SECONDS
+from app.core.singleflight import coalesce
 
 router = APIRouter()
+logger = get_logger(__name__)
+_http = get_client("supabase")
 
 SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
 HEADERS = {
@@ -21,7 +50,7 @@ HEADERS = {
 }
 
 
-# Default job role queries
+# Job role queries used when collection_queries has no job rows (migration 008 seeds these)
 DEFAULT_JOB_QUERIES = [
     "Software Developer",
     "Backend Developer",
@@ -40,7 +69,7 @@ DEFAULT_JOB_QUERIES = [
     "Node.js Developer"
 ]
 
-# Default skill trend queries for Reddit
+# Skill trend queries for Reddit used when collection_queries has no discussion rows (also seeded)
 DEFAULT_SKILL_QUERIES = [
     "programming skills 2026",
     "software developer skills",
@@ -56,25 +85,42 @@ DEFAULT_SKILL_QUERIES = [
 
 
 @router.post("/run-jobs")
-def run_jobs_collection():
+async def run_jobs_collection():
     """
     Run weekly job collection cron.
-    Fetches jobs for all default queries and stores them.
+    Spends SERP_QUERY_BUDGET searches on the configured queries that find
+    the most new jobs (plus some exploration), stores the jobs and records
+    each query's yield.
+    A trigger that arrives while a run is in progress joins that run.
     """
+    return await coalesce("cron:run-jobs", {}, _collect_jobs)
+
+
+async def _collect_jobs() -> dict:
     try:
-        print(f"Starting job collection at {datetime.now(timezone.utc)}")
+        logger.info(f"Starting job collection at {datetime.now(timezone.utc)}")
+        
+        plan = plan_queries(await load_queries("jobs", DEFAULT_JOB_QUERIES))
+        results_by_query = {}
         
-        jobs = fetch_jobs_batch(
-            queries=DEFAULT_JOB_QUERIES,
-            location="United States",
-            num_per_query=10
-        )
+        with CRON_STAGE_SECONDS.time(stage="jobs_fetch"):
+            jobs = await fetch_jobs_batch(
+                queries=[item["query"] for item in plan],
+                location="United States",
+                num_per_query=10,
+                query_stats=results_by_query
+            )
         
-        result = store_jobs(jobs)
+        with CRON_STAGE_SECONDS.time(stage="jobs_store"):
+            result = await store_jobs(jobs)
+        
+        yield_recorded = await record_run("jobs", plan, results_by_query, Counter(result["new_by_query"]))
         
         return {
             "status": "completed",
-            "queries_processed": len(DEFAULT_JOB_QUERIES),
+            "queries_processed": len(results_by_query),
+            "query_plan": plan,
+            "yield_recorded": yield_recorded,
             "jobs_fetched": len(jobs),
             "storage_result": result
         }
@@ -84,26 +130,41 @@ def run_jobs_collection():
 
 
 @router.post("/run-discussions")
-def run_discussions_collection():
+async def run_discussions_collection():
     """
     Run weekly discussion collection cron.
     Fetches Reddit posts for skill trend queries.
+    A trigger that arrives while a run is in progress joins that run.
     """
+    return await coalesce("cron:run-discussions", {}, _collect_discussions)
+
+
+async def _collect_discussions() -> dict:
     try:
-        print(f"Starting discussion collection at {datetime.now(timezone.utc)}")
+        logger.info(f"Starting discussion collection at {datetime.now(timezone.utc)}")
+        
+        queries = [row["query"] for row in await load_queries("discussions", DEFAULT_SKILL_QUERIES)]
+        
+        with CRON_STAGE_SECONDS.time(stage="discussions_fetch"):
+            discussions = await fetch_discussions_batch(
+                queries=queries,
+                max_per_query=15
+            )
         
-        discussions = fetch_discussions_batch(
-            queries=DEFAULT_SKILL_QUERIES,
-            max_per_query=15
-        )
+        with CRON_STAGE_SECONDS.time(stage="discussions_store"):
+            result = await store_discussions(discussions)
         
-        result = store_discussions(discussions)
+        comments_result = None
+        if settings.REDDIT_COMMENTS_ENABLED:
+            with CRON_STAGE_SECONDS.time(stage="discussions_comments"):
+                comments_result = await ingest_comments(discussions)
         
         return {
             "status": "completed",
-            "queries_processed": len(DEFAULT_SKILL_QUERIES),
+            "queries_processed": len(queries),
             "discussions_fetched": len(discussions),
-            "storage_result": result
+            "storage_result": result,
+            "comments_result": comments_result
         }
         
     except Exception as e:
@@ -111,54 +172,83 @@ def run_discussions_collection():
 
 
 @router.post("/run-full")
-def run_full_collection():
+async def run_full_collection():
     """
     Run complete weekly collection: jobs + discussions.
+    Each stage joins a matching run that is already in progress.
     """
-    jobs_result = run_jobs_collection()
-    discussions_result = run_discussions_collection()
-    
-    return {
-        "status": "completed",
-        "jobs": jobs_result,
-        "discussions": discussions_result
-    }
+    async def run():
+        jobs_result = await run_jobs_collection()
+        discussions_result = await run_discussions_collection()
+        
+        return {
+            "status": "completed",
+            "jobs": jobs_result,
+            "discussions": discussions_result
+        }
+
+    return await coalesce("cron:run-full", {}, run)
+
+
+def build_skill_matrices(jobs: list[dict], discussions: list[dict]):
+    """Extract skills from job descriptions and discussions into documents x skills matrices."""
+    job_matrix = skill_matrix_from_texts(job.get("description", "") for job in jobs)
+    discussion_matrix = skill_matrix_from_texts(
+        f"{disc.get('title', '')} {disc.get('body', '')}" for disc in discussions
+    )
+    return job_matrix, discussion_matrix
+
+
+def _dimension_columns(scope: str, records: list[dict]) -> dict[str, list]:
+    """Trend cube dimension values, one per record (matrix row)."""
+    return {column: [record.get(column) for record in records] for column in CUBE_DIMENSIONS[scope]}
 
 
 @router.post("/aggregate-trends")
-def aggregate_skill_trends():
+async def aggregate_skill_trends():
     """
     Aggregate skill mentions from jobs and discussions for trend analysis.
     Creates a snapshot of skill popularity.
+    A trigger that arrives while aggregation is running joins that run.
     """
+    return await coalesce("cron:aggregate-trends", {}, _aggregate_trends)
+
+
+async def _aggregate_trends() -> dict:
     today = datetime.now(timezone.utc).date().isoformat()
     
-    # Get all jobs
-    jobs_url = f"{SUPABASE_REST_URL}/fetched_jobs?select=description"
-    jobs_resp = requests.get(jobs_url, headers=HEADERS, timeout=30)
-    jobs = jobs_resp.json() if jobs_resp.status_code == 200 else []
-    
-    # Get all discussions
-    disc_url = f"{SUPABASE_REST_URL}/fetched_discussions?select=title,body"
-    disc_resp = requests.get(disc_url, headers=HEADERS, timeout=30)
-    discussions = disc_resp.json() if disc_resp.status_code == 200 else []
-    
-    # Count skill mentions
-    job_skill_counts = Counter()
-    discussion_skill_counts = Counter()
-    
-    # Extract from jobs
-    for job in jobs:
-        skills = extract_skills_from_text(job.get("description", ""))
-        for skill in skills:
-            job_skill_counts[skill["skill_name_normalized"]] += skill["mention_count"]
-    
-    # Extract from discussions
-    for disc in discussions:
-        text = f"{disc.get('title', '')} {disc.get('body', '')}"
-        skills = extract_skills_from_text(text)
-        for skill in skills:
-            discussion_skill_counts[skill["skill_name_normalized"]] += skill["mention_count"]
+    if settings.SKILL_AGGREGATION_MODE == "database":
+        # Postgres groups the per-record skill rows; only counts cross the network
+        with CRON_STAGE_SECONDS.time(stage="trends_rpc"):
+            job_skill_counts, discussion_skill_counts = await get_skill_mention_counts()
+        
+        async def cooccurrence_pairs(scope: str) -> list[dict]:
+            return await fetch_cooccurrence_counts(scope)
+        
+        async def cube_cells() -> list[dict]:
+            return await fetch_cube_counts()
+    else:
+        if columnar_store.enabled():
+            matrices, dimensions = await _skill_matrices_from_columnar_store()
+        else:
+            matrices, dimensions = await _skill_matrices_from_database()
+        
+        job_skill_counts = skill_counts(matrices["jobs"])
+        discussion_skill_counts = skill_counts(matrices["discussions"])
+        
+        async def cooccurrence_pairs(scope: str) -> list[dict]:
+            return await run_in_threadpool(compute_cooccurrence, matrices[scope])
+        
+        # Breakdowns by query/role/location/subreddit/source reuse the extracted matrices
+        def build_cube() -> list[dict]:
+            return [
+                cell
+                for scope in ("jobs", "discussions")
+                for cell in compute_cube(scope, matrices[scope], dimensions[scope])
+            ]
+        
+        async def cube_cells() -> list[dict]:
+            return await run_in_threadpool(build_cube)
     
     # Combine and prepare trend data
     all_skills = set(job_skill_counts.keys()) | set(discussion_skill_counts.keys())
@@ -168,28 +258,204 @@ def aggregate_skill_trends():
         skill_data.append({
             "skill_name": skill,
             "job_count": job_skill_counts.get(skill, 0),
-            "discussion_count": discussion_skill_counts.get(skill, 0),
-            "trend_direction": "stable"
+            "discussion_count": discussion_skill_counts.get(skill, 0)
         })
     
+    # Trend direction and momentum from snapshot history
+    with CRON_STAGE_SECONDS.time(stage="trends_momentum"):
+        skill_data = await apply_trend_momentum(today, skill_data)
+    
     # Update trends in database
-    result = update_skill_trends(today, skill_data)
+    with CRON_STAGE_SECONDS.time(stage="trends_store"):
+        result = await update_skill_trends(today, skill_data)
+    
+    # Top-K boards for /api/trends/top, ranked once per snapshot
+    with CRON_STAGE_SECONDS.time(stage="trends_leaderboards"):
+        leaderboard_result = await store_leaderboards(today, compute_leaderboards(skill_data))
+        # New ETag/Last-Modified for /api/trends; drops this process's cached responses
+        await publish_snapshot(today)
+    
+    # Skill pairs from the same extraction results
+    with CRON_STAGE_SECONDS.time(stage="trends_cooccurrence"):
+        cooccurrence_result = {}
+        for scope in ("jobs", "discussions"):
+            pairs = await cooccurrence_pairs(scope)
+            cooccurrence_result[scope] = await store_cooccurrence(today, scope, pairs)
+    
+    with CRON_STAGE_SECONDS.time(stage="trends_cube"):
+        cube_result = await store_cube(today, await cube_cells())
     
     return {
         "status": "completed",
         "snapshot_date": today,
         "unique_skills": len(all_skills),
-        "update_result": result
+        "update_result": result,
+        "leaderboard_result": leaderboard_result,
+        "cooccurrence_result": cooccurrence_result,
+        "cube_result": cube_result
+    }
+
+
+async def _skill_matrices_from_database():
+    with CRON_STAGE_SECONDS.time(stage="trends_load"):
+        # Get all canonical jobs (near-duplicates are linked, not counted twice)
+        job_columns = ",".join(["description", *CUBE_DIMENSIONS["jobs"]])
+        jobs_url = f"{SUPABASE_REST_URL}/fetched_jobs?select={job_columns}&canonical_job_id=is.null"
+        jobs_resp = await _http.get(jobs_url, headers=HEADERS, timeout=30)
+        jobs = jsonio.loads(jobs_resp.content) if jobs_resp.status_code == 200 else []
+        
+        # Get all discussions
+        disc_columns = ",".join(["title", "body", *CUBE_DIMENSIONS["discussions"]])
+        disc_url = f"{SUPABASE_REST_URL}/fetched_discussions?select={disc_columns}"
+        disc_resp = await _http.get(disc_url, headers=HEADERS, timeout=30)
+        discussions = jsonio.loads(disc_resp.content) if disc_resp.status_code == 200 else []
+    
+    # Regex extraction is CPU-bound, keep it off the event loop
+    with CRON_STAGE_SECONDS.time(stage="trends_extract"):
+        job_matrix, discussion_matrix = await run_in_threadpool(build_skill_matrices, jobs, discussions)
+    
+    matrices = {"jobs": job_matrix, "discussions": discussion_matrix}
+    dimensions = {"jobs": _dimension_columns("jobs", jobs), "discussions": _dimension_columns("discussions", discussions)}
+    return matrices, dimensions
+
+
+async def _skill_matrices_from_columnar_store():
+    # Only rows stored since the last run cross the network
+    with CRON_STAGE_SECONDS.time(stage="trends_sync"):
+        await columnar_store.sync("jobs")
+        await columnar_store.sync("discussions")
+    
+    def extract():
+        job_texts, discussion_texts = columnar_store.load_skill_texts()
+        matrices = {
+            "jobs": columnar_store.skill_matrix(job_texts),
+            "discussions": columnar_store.skill_matrix(discussion_texts)
+        }
+        return matrices, columnar_store.load_cube_dimensions(CUBE_DIMENSIONS)
+    
+    # Vectorized over whole columns, but still CPU-bound
+    with CRON_STAGE_SECONDS.time(stage="trends_extract"):
+        return await run_in_threadpool(extract)
+
+
+@router.post("/sync-columnar-store")
+async def sync_columnar_store():
+    """
+    Pull rows stored since the last sync into the local columnar store.
+    aggregate-trends also syncs before counting; this warms the store ahead of it.
+    """
+    if not columnar_store.enabled():
+        raise HTTPException(status_code=400, detail="Columnar store is disabled (set COLUMNAR_STORE_DIR, needs pyarrow)")
+    
+    results = [await columnar_store.sync(dataset) for dataset in ("jobs", "discussions", "skill_trends")]
+    return {"status": "completed", "results": results, "store": columnar_store.status()}
+
+
+@router.post("/sync-skill-index")
+async def sync_skill_index():
+    """
+    Index canonical jobs stored since the last sync in the skill inverted index.
+    store_jobs syncs the storing process's index itself; this builds the index
+    the first time and brings other processes up to date.
+    """
+    if not skill_index.enabled():
+        raise HTTPException(status_code=400, detail="Skill index is disabled (set SKILL_INDEX_DIR)")
+    
+    result = await skill_index.sync()
+    return {"status": "completed", "result": result, "index": skill_index.status()}
+
+
+@router.post("/backfill-job-signatures")
+async def backfill_job_signatures(
+    since: Optional[str] = Query(None, description="next_cursor from the previous call"),
+    limit: int = Query(2000, ge=1, le=20000)
+):
+    """
+    Store MinHash signatures of canonical jobs saved before near-duplicate detection,
+    so re-posts of them are detected. Processes up to `limit` jobs in insert order;
+    call again with `next_cursor` until `done`.
+    """
+    try:
+        pages = iter_pages("jobs", ["id", "job_hash", "description", "canonical_job_id"], build_filters(since=since), limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    processed = 0
+    signatures = 0
+    cursor = since
+    try:
+        async for rows, cursor in pages:
+            processed += len(rows)
+            signatures += await backfill_signatures([row for row in rows if not row["canonical_job_id"]])
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    return {
+        "jobs_processed": processed,
+        "signatures_stored": signatures,
+        "next_cursor": cursor,
+        "done": processed < limit
+    }
+
+
+@router.post("/backfill-skill-rows")
+async def backfill_skill_rows(
+    dataset: str = Query(..., pattern="^(jobs|discussions)$"),
+    since: Optional[str] = Query(None, description="next_cursor from the previous call"),
+    limit: int = Query(2000, ge=1, le=20000)
+):
+    """
+    Extract per-record skill rows for records stored before SKILL_AGGREGATION_MODE=database.
+    Processes up to `limit` records in insert order; call again with `next_cursor` until `done`.
+    """
+    try:
+        fields = ["id", "description", "canonical_job_id"] if dataset == "jobs" else ["id", "title", "body"]
+        pages = iter_pages(dataset, fields, build_filters(since=since), limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    processed = 0
+    skill_rows = 0
+    cursor = since
+    async for rows, cursor in pages:
+        processed += len(rows)
+        if dataset == "jobs":
+            records = [(row["id"], row["description"]) for row in rows if not row["canonical_job_id"]]
+        else:
+            records = [(row["id"], f"{row['title']} {row['body']}") for row in rows]
+        skill_rows += await store_record_skills(dataset, records)
+    
+    return {
+        "dataset": dataset,
+        "records_processed": processed,
+        "skill_rows_stored": skill_rows,
+        "next_cursor": cursor,
+        "done": processed < limit
     }
 
 
+@router.get("/query-yield")
+async def query_yield(kind: str = Query("jobs", pattern="^(jobs|discussions)$")):
+    """
+    Get new records found per search for each collection query, best first.
+    """
+    try:
+        return await get_yield_report(kind)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
 @router.get("/config")
-def get_cron_config():
+async def get_cron_config():
     """
     Get current cron configuration.
     """
+    job_queries = await load_queries("jobs", DEFAULT_JOB_QUERIES)
+    skill_queries = await load_queries("discussions", DEFAULT_SKILL_QUERIES)
     return {
-        "job_queries": DEFAULT_JOB_QUERIES,
-        "skill_queries": DEFAULT_SKILL_QUERIES,
+        "job_queries": [row["query"] for row in job_queries],
+        "skill_queries": [row["query"] for row in skill_queries],
+        "serp_query_budget": settings.SERP_QUERY_BUDGET,
+        "query_exploration_rate": settings.QUERY_EXPLORATION_RATE,
         "schedule": "weekly"
     }
@@ -0,0 +1,30 @@
+"""
+Debug Router - Access to stored request profiles.
+
+Only mounted when PROFILING_ENABLED is set.
+"""
+from fastapi import APIRouter, HTTPException
+from app.core.profiling import load_profile, list_profiles
+
+router = APIRouter()
+
+
+@router.get("/profiles")
+def get_profiles():
+    """
+    List stored profiles, newest first.
+    """
+    return {
+        "profiles": list_profiles()
+    }
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """
+    Get a profile summary: top functions, time by category, peak memory and allocation hotspots.
+    """
+    profile = load_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from typing import Optional
 from app.collectors.reddit_collector import fetch_reddit_discussions, fetch_discussions_batch, get_subreddit_hot_posts
 from app.services.persistence_service import store_discussions, get_discussion_stats
+from app.core.singleflight import coalesce
 
 router = APIRouter()
 
@@ -43,15 +44,15 @@ DEFAULT_SUBREDDITS = [
 
 
 @router.post("/fetch")
-def fetch_discussions(request: DiscussionFetchRequest):
+async def fetch_discussions(request: DiscussionFetchRequest):
     """
     Fetch Reddit discussions for a single query.
     Uses Reddit's public JSON API.
     """
-    try:
-        subreddits = request.subreddits or DEFAULT_SUBREDDITS
-        
-        discussions = fetch_reddit_discussions(
+    subreddits = request.subreddits or DEFAULT_SUBREDDITS
+
+    async def run():
+        discussions = await fetch_reddit_discussions(
             search_query=request.query,
             subreddits=subreddits,
             max_items=request.max_items,
@@ -59,7 +60,7 @@ def fetch_discussions(request: DiscussionFetchRequest):
         )
         
         # Store in database
-        result = store_discussions(discussions)
+        result = await store_discussions(discussions)
         
         return {
             "status": "success",
@@ -68,6 +69,10 @@ def fetch_discussions(request: DiscussionFetchRequest):
             "discussions_fetched": len(discussions),
             "storage_result": result
         }
+
+    try:
+        # Identical concurrent calls share one round of Reddit requests
+        return await coalesce("discussions:fetch", {**request.model_dump(), "subreddits": subreddits}, run)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -76,21 +81,21 @@ def fetch_discussions(request: DiscussionFetchRequest):
 
 
 @router.post("/fetch-batch")
-def fetch_discussions_batch_endpoint(request: BatchDiscussionFetchRequest):
+async def fetch_discussions_batch_endpoint(request: BatchDiscussionFetchRequest):
     """
     Fetch discussions for multiple queries in batch.
     """
-    try:
-        subreddits = request.subreddits or DEFAULT_SUBREDDITS
-        
-        discussions = fetch_discussions_batch(
+    subreddits = request.subreddits or DEFAULT_SUBREDDITS
+
+    async def run():
+        discussions = await fetch_discussions_batch(
             queries=request.queries,
             subreddits=subreddits,
             max_per_query=request.max_per_query
         )
         
         # Store in database
-        result = store_discussions(discussions)
+        result = await store_discussions(discussions)
         
         return {
             "status": "success",
@@ -98,6 +103,9 @@ def fetch_discussions_batch_endpoint(request: BatchDiscussionFetchRequest):
             "discussions_fetched": len(discussions),
             "storage_result": result
         }
+
+    try:
+        return await coalesce("discussions:fetch-batch", {**request.model_dump(), "subreddits": subreddits}, run)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -106,16 +114,16 @@ def fetch_discussions_batch_endpoint(request: BatchDiscussionFetchRequest):
 
 
 @router.post("/fetch-hot/{subreddit}")
-def fetch_hot_discussions(subreddit: str, limit: int = 25):
+async def fetch_hot_discussions(subreddit: str, limit: int = 25):
     """
     Fetch hot/trending posts from a specific subreddit.
     Good for finding current trending discussions.
     """
-    try:
-        discussions = get_subreddit_hot_posts(subreddit, limit)
+    async def run():
+        discussions = await get_subreddit_hot_posts(subreddit, limit)
         
         # Store in database
-        result = store_discussions(discussions)
+        result = await store_discussions(discussions)
         
         return {
             "status": "success",
@@ -123,17 +131,20 @@ def fetch_hot_discussions(subreddit: str, limit: int = 25):
             "discussions_fetched": len(discussions),
             "storage_result": result
         }
+
+    try:
+        return await coalesce("discussions:fetch-hot", {"subreddit": subreddit, "limit": limit}, run)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch hot discussions: {str(e)}")
 
 
 @router.get("/stats")
-def get_stats():
+async def get_stats():
     """
     Get statistics about stored discussions.
     """
-    return get_discussion_stats()
+    return await get_discussion_stats()
 
 
 @router.get("/subreddits")
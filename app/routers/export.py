@@ -0,0 +1,119 @@
+"""
+Export Router - Incremental NDJSON/Parquet exports for downstream consumers.
+
+Consumers pull only rows stored since their last export by passing back
+the `next_cursor` they received, instead of re-reading whole tables.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.export_service import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_filters,
+    iter_pages,
+    job_field_conditions,
+    parquet_available,
+    resolve_fields,
+    stream_ndjson,
+    stream_parquet,
+)
+
+router = APIRouter()
+
+
+def _parse_datetime(name: str, value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date/time query parameter (UTC unless it has an offset), or answer 422."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be an ISO date/time (URL-encode '+' offsets)")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _export(
+    dataset: str,
+    since: Optional[str],
+    fields: Optional[str],
+    source: Optional[str],
+    subreddits: Optional[list[str]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: Optional[int],
+    page_size: int,
+    format: str,
+    conditions: Optional[list[str]] = None
+) -> StreamingResponse:
+    start = _parse_datetime("start_date", start_date)
+    end = _parse_datetime("end_date", end_date)
+    try:
+        columns = resolve_fields(dataset, fields)
+        filters = build_filters(since, source, subreddits, start, end, conditions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    pages = iter_pages(dataset, columns, filters, page_size, limit)
+
+    if format == "parquet":
+        if not parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+        return StreamingResponse(
+            stream_parquet(dataset, columns, pages, since),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": f'attachment; filename="{dataset}.parquet"'}
+        )
+
+    return StreamingResponse(stream_ndjson(pages, since), media_type="application/x-ndjson")
+
+
+@router.get("/jobs")
+async def export_jobs(
+    since: Optional[str] = Query(None, description="Cursor from a previous export"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns (default: all but raw_data)"),
+    source: Optional[str] = None,
+    start_date: Optional[str] = Query(None, description="fetched_at >= this ISO date/time"),
+    end_date: Optional[str] = Query(None, description="fetched_at < this ISO date/time"),
+    posted_after: Optional[str] = Query(None, description="posted_at >= this ISO date/time"),
+    posted_before: Optional[str] = Query(None, description="posted_at < this ISO date/time"),
+    work_mode: Optional[str] = Query(None, pattern="^(remote|hybrid|onsite)$"),
+    salary_period: Optional[str] = Query(None, pattern="^(hour|day|week|month|year)$"),
+    min_salary: Optional[float] = Query(None, ge=0, description="Salary range reaches at least this"),
+    max_salary: Optional[float] = Query(None, ge=0, description="Salary range starts at or below this"),
+    limit: Optional[int] = Query(None, ge=1),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("ndjson", pattern="^(ndjson|parquet)$")
+):
+    """
+    Stream stored jobs in insert order.
+    NDJSON ends with a `{"next_cursor": ...}` line; Parquet stores it in the file metadata.
+    """
+    conditions = job_field_conditions(
+        _parse_datetime("posted_after", posted_after),
+        _parse_datetime("posted_before", posted_before),
+        work_mode, salary_period, min_salary, max_salary
+    )
+    return _export("jobs", since, fields, source, None, start_date, end_date, limit, page_size, format, conditions)
+
+
+@router.get("/discussions")
+async def export_discussions(
+    since: Optional[str] = Query(None, description="Cursor from a previous export"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns (default: all but raw_data)"),
+    source: Optional[str] = None,
+    subreddit: Optional[list[str]] = Query(None, description="Repeat to export several subreddits"),
+    start_date: Optional[str] = Query(None, description="fetched_at >= this ISO date/time"),
+    end_date: Optional[str] = Query(None, description="fetched_at < this ISO date/time"),
+    limit: Optional[int] = Query(None, ge=1),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    format: str = Query("ndjson", pattern="^(ndjson|parquet)$")
+):
+    """
+    Stream stored discussions in insert order.
+    NDJSON ends with a `{"next_cursor": ...}` line; Parquet stores it in the file metadata.
+    """
+    return _export("discussions", since, fields, source, subreddit, start_date, end_date, limit, page_size, format)
@@ -1,13 +1,18 @@
 """
 Jobs Router - Endpoints for job data collection.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
-from app.collectors.serp_collector import fetch_jobs_from_serp, fetch_jobs_batch
-from app.services.persistence_service import store_jobs, get_job_stats
+from app.collectors.serp_collector import fetch_jobs_from_serp, fetch_jobs_batch, SerpAPIError
+from app.services.persistence_service import store_jobs, get_job_stats, get_job, store_job_skills, get_role_counts
 from app.services.normalizer_service import extract_skills_from_text
+from app.services import skill_index
+from app.core.singleflight import coalesce
+from app.core.logger import get_logger
+from app.core.rate_limit import UpstreamUnavailable
 
+logger = get_logger(__name__)
 router = APIRouter()
 
 
@@ -24,19 +29,19 @@ class BatchJobFetchRequest(BaseModel):
 
 
 @router.post("/fetch")
-def fetch_jobs(request: JobFetchRequest):
+async def fetch_jobs(request: JobFetchRequest):
     """
     Fetch job listings for a single query.
     """
-    try:
-        jobs = fetch_jobs_from_serp(
+    async def run():
+        jobs = await fetch_jobs_from_serp(
             query=request.query,
             location=request.location,
             num_results=request.num_results
         )
         
         # Store in database
-        result = store_jobs(jobs)
+        result = await store_jobs(jobs)
         
         return {
             "status": "success",
@@ -44,27 +49,37 @@ def fetch_jobs(request: JobFetchRequest):
             "jobs_fetched": len(jobs),
             "storage_result": result
         }
+
+    try:
+        # Identical concurrent calls share one SerpAPI run
+        return await coalesce("jobs:fetch", request.model_dump(), run)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch jobs: {str(e)}")
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except SerpAPIError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception:
+        # Exception text can carry upstream URLs and keys; don't echo it to callers
+        logger.exception("Job fetch failed")
+        raise HTTPException(status_code=500, detail="Failed to fetch jobs")
 
 
 @router.post("/fetch-batch")
-def fetch_jobs_batch_endpoint(request: BatchJobFetchRequest):
+async def fetch_jobs_batch_endpoint(request: BatchJobFetchRequest):
     """
     Fetch job listings for multiple queries in batch.
     """
-    try:
-        jobs = fetch_jobs_batch(
+    async def run():
+        jobs = await fetch_jobs_batch(
             queries=request.queries,
             location=request.location,
             num_per_query=request.num_per_query
         )
         
         # Store in database
-        result = store_jobs(jobs)
+        result = await store_jobs(jobs)
         
         return {
             "status": "success",
@@ -72,51 +87,86 @@ def fetch_jobs_batch_endpoint(request: BatchJobFetchRequest):
             "jobs_fetched": len(jobs),
             "storage_result": result
         }
+
+    try:
+        return await coalesce("jobs:fetch-batch", request.model_dump(), run)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch jobs: {str(e)}")
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except SerpAPIError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception:
+        # Exception text can carry upstream URLs and keys; don't echo it to callers
+        logger.exception("Job fetch failed")
+        raise HTTPException(status_code=500, detail="Failed to fetch jobs")
 
 
 @router.get("/stats")
-def get_stats():
+async def get_stats():
     """
     Get statistics about stored jobs.
     """
-    return get_job_stats()
+    return await get_job_stats()
 
 
-@router.post("/extract-skills/{job_id}")
-def extract_job_skills(job_id: str):
+@router.get("/roles")
+async def get_roles(
+    title: Optional[str] = Query(None, description="Job title to look up (normalized to its role)"),
+    q: Optional[str] = Query(None, description="Substring of the normalized role"),
+    limit: int = Query(50, ge=1, le=500)
+):
     """
-    Extract skills from a specific job's description.
+    Get job counts per normalized role (seniority removed, engineer/programmer -> developer).
+    Counts are maintained at ingest; canonical_job_count excludes near-duplicate postings.
     """
-    from supabase import create_client
-    from app.core.config import settings
+    try:
+        roles = await get_role_counts(title, q, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     
-    supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return {"roles": roles, "count": len(roles)}
+
+
+@router.get("/search")
+async def search_jobs(
+    skills: str = Query(..., description="Comma-separated skills, e.g. kubernetes,terraform"),
+    op: str = Query("and", pattern="^(and|or)$", description="and: every skill, or: any of them"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Find stored jobs mentioning the given skills, newest first.
+    Answered from the skill inverted index (SKILL_INDEX_DIR).
+    """
+    if not skill_index.enabled():
+        raise HTTPException(status_code=400, detail="Skill index is disabled (set SKILL_INDEX_DIR)")
     
+    try:
+        return await skill_index.search_jobs(skills, op, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.post("/extract-skills/{job_id}")
+async def extract_job_skills(job_id: str):
+    """
+    Extract skills from a specific job's description.
+    """
     # Get job
-    job = supabase.table("fetched_jobs").select("description").eq("id", job_id).single().execute()
+    job = await get_job(job_id, "description")
     
-    if not job.data:
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Extract skills
-    skills = extract_skills_from_text(job.data["description"])
+    skills = extract_skills_from_text(job["description"])
     
     # Store extracted skills
-    for skill in skills:
-        try:
-            supabase.table("job_extracted_skills").insert({
-                "job_id": job_id,
-                "skill_name": skill["skill_name"],
-                "skill_name_normalized": skill["skill_name_normalized"],
-                "mention_count": skill["mention_count"]
-            }).execute()
-        except Exception:
-            pass  # Ignore duplicates
+    await store_job_skills(job_id, skills)
     
     return {
         "job_id": job_id,
@@ -0,0 +1,118 @@
+"""
+Trends Router - Read endpoints for aggregated skill trends.
+"""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+
+from app.services.cooccurrence_service import get_cooccurrence
+from app.services.cube_service import get_cube
+from app.services.trend_read_service import (
+    current_version,
+    get_leaderboard,
+    get_trends,
+    is_not_modified,
+    trend_query,
+    validators,
+)
+from app.services.trend_service import LEADERBOARD_SIZE
+
+router = APIRouter()
+
+
+@router.get("")
+async def skill_trends(
+    skill: Optional[str] = Query(None, description="Skill name, or a comma-separated list"),
+    start_date: Optional[date] = Query(None, description="First snapshot date (ISO, inclusive)"),
+    end_date: Optional[date] = Query(None, description="Last snapshot date (ISO, inclusive)"),
+    top: Optional[int] = Query(None, ge=1, le=1000, description="Most-mentioned skills kept per snapshot"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    """
+    Get skill trend snapshots (the latest one unless a date range is given).
+    Responses carry ETag and Last-Modified; conditional requests get a 304
+    until a new snapshot is written.
+    """
+    params = trend_query(skill, start_date, end_date, top)
+    version = await current_version()
+    headers = validators(version, "trends", params)
+    if is_not_modified(headers, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        body = await get_trends(version, params)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/top")
+async def trending_skills(
+    board: str = Query("combined", pattern="^(job_mentions|discussion_mentions|combined|growth)$"),
+    limit: int = Query(20, ge=1, le=LEADERBOARD_SIZE),
+    snapshot_date: Optional[str] = Query(None, description="ISO date (default: latest snapshot)"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    """
+    Get a top-K trending skills leaderboard, ranked when the snapshot was written.
+    Cached and validated like /api/trends.
+    """
+    params = {"board": board, "limit": limit, "snapshot_date": snapshot_date}
+    version = await current_version()
+    headers = validators(version, "trends:top", params)
+    if is_not_modified(headers, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        body = await get_leaderboard(version, params)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/cooccurrence")
+async def skill_cooccurrence(
+    skill: Optional[str] = Query(None, description="Only pairs containing this skill"),
+    scope: str = Query("jobs", pattern="^(jobs|discussions)$"),
+    snapshot_date: Optional[str] = Query(None, description="ISO date (default: latest snapshot)"),
+    min_count: Optional[int] = Query(None, ge=1, description="Minimum documents the pair shares"),
+    sort: str = Query("lift", pattern="^(lift|pmi|pair_count)$"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """
+    Get skills that appear in the same jobs or discussions.
+    Pairs are ranked by lift (how much more often than chance they appear together) by default.
+    """
+    try:
+        return await get_cooccurrence(scope, snapshot_date, skill, min_count, sort, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/cube")
+async def skill_trend_cube(
+    scope: str = Query("jobs", pattern="^(jobs|discussions)$"),
+    dimension: Optional[str] = Query(
+        None,
+        description="search_query, role_key, location or source (jobs); search_query, subreddit or source (discussions)"
+    ),
+    value: Optional[str] = Query(None, description="Only this dimension value, e.g. a location or subreddit"),
+    skill: Optional[str] = Query(None, description="Only cells for this skill"),
+    snapshot_date: Optional[str] = Query(None, description="ISO date (default: latest snapshot)"),
+    sort: str = Query("mention_count", pattern="^(mention_count|document_count)$"),
+    limit: int = Query(100, ge=1, le=5000)
+):
+    """
+    Get skill counts broken down by dimension.
+    Any combination of dimension, value and skill slices the snapshot,
+    e.g. `?dimension=location&skill=python` or `?dimension=role_key&value=data developer`.
+    """
+    try:
+        return await get_cube(scope, dimension, value, skill, snapshot_date, sort, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
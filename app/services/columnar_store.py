@@ -0,0 +1,322 @@
+"""
+Columnar Store - Optional local Parquet copy of jobs, discussions and trends.
+
+When COLUMNAR_STORE_DIR is set, `fetched_jobs` and `fetched_discussions`
+are mirrored into Parquet files partitioned by fetch date and synced
+incrementally with the export keyset cursor, so each row's text crosses the
+network once. `skill_trends` is mirrored per snapshot date; the latest
+snapshot is re-read on every sync because a re-run on the same day
+rewrites it.
+
+Layout:
+    <dir>/jobs/fetch_date=YYYY-MM-DD/part-000001.parquet
+    <dir>/discussions/fetch_date=YYYY-MM-DD/part-000001.parquet
+    <dir>/skill_trends/snapshot=YYYY-MM-DD/part-0.parquet
+    <dir>/<dataset>/_state.json
+
+Each sync writes one file per fetch date it touches, numbered by the sync.
+The cursor only advances once every file is closed; files left behind by
+an interrupted sync are removed before the next one starts. The jobs and
+discussions tables are append-only, so rows changed in place after they
+were synced are not picked up.
+
+Reads are memory-mapped and skill extraction runs as vectorized Arrow regex
+kernels over whole columns. Needs the optional `pyarrow` package.
+"""
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.singleflight import coalesce
+from app.services.cooccurrence_service import SKILL_INDEX, build_skill_matrix
+from app.services.export_service import (
+    MAX_PAGE_SIZE,
+    arrow_schema,
+    arrow_table,
+    build_filters,
+    iter_pages,
+    resolve_fields,
+)
+from app.services.normalizer_service import KNOWN_SKILLS, normalize_skill_name
+from app.services.persistence_service import get_skill_trend_history
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pc = pq = None
+
+logger = get_logger(__name__)
+
+STATE_FILE = "_state.json"
+
+# Same word-boundary patterns as extract_skills_from_text, compiled for Arrow (RE2),
+# with the skill matrix column each one counts towards
+SKILL_PATTERNS = [
+    (SKILL_INDEX[normalize_skill_name(skill)], r"\b" + re.escape(skill) + r"\b")
+    for skill in KNOWN_SKILLS
+]
+
+
+def enabled() -> bool:
+    """Whether the local store is configured and pyarrow is installed."""
+    return bool(settings.COLUMNAR_STORE_DIR) and pq is not None
+
+
+def _dataset_dir(dataset: str) -> str:
+    return os.path.join(settings.COLUMNAR_STORE_DIR, dataset)
+
+
+def _read_state(root: str) -> dict:
+    try:
+        with open(os.path.join(root, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_state(root: str, state: dict):
+    path = os.path.join(root, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def _part_files(root: str) -> list[str]:
+    parts = []
+    for dirpath, _, filenames in os.walk(root):
+        parts.extend(os.path.join(dirpath, name) for name in filenames if name.startswith("part-"))
+    return sorted(parts)
+
+
+def _remove_unfinished(root: str, sync_number: int):
+    """Delete files written by a sync that never committed its cursor."""
+    for path in _part_files(root):
+        name = os.path.basename(path)
+        number = name[len("part-"):].split(".")[0]
+        if not number.isdigit() or int(number) >= sync_number or name.endswith(".tmp"):
+            os.remove(path)
+
+
+async def _sync_rows(dataset: str) -> dict:
+    root = _dataset_dir(dataset)
+    os.makedirs(root, exist_ok=True)
+    state = _read_state(root)
+    sync_number = state.get("syncs", 0) + 1
+    _remove_unfinished(root, sync_number)
+
+    fields = resolve_fields(dataset, None)
+    schema = arrow_schema(dataset, fields)
+    cursor = state.get("cursor")
+    writers = {}
+    synced = 0
+
+    try:
+        async for rows, cursor in iter_pages(dataset, fields, build_filters(since=cursor), MAX_PAGE_SIZE):
+            by_date = defaultdict(list)
+            for row in rows:
+                by_date[str(row["fetched_at"])[:10]].append(row)
+
+            for fetch_date, date_rows in by_date.items():
+                if fetch_date not in writers:
+                    partition = os.path.join(root, f"fetch_date={fetch_date}")
+                    os.makedirs(partition, exist_ok=True)
+                    writers[fetch_date] = pq.ParquetWriter(
+                        os.path.join(partition, f"part-{sync_number:06d}.parquet"),
+                        schema,
+                        compression="zstd"
+                    )
+                writers[fetch_date].write_table(arrow_table(dataset, fields, schema, date_rows))
+            synced += len(rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    if synced:
+        _write_state(root, {
+            "cursor": cursor,
+            "syncs": sync_number,
+            "rows": state.get("rows", 0) + synced,
+            "synced_at": datetime.now(timezone.utc).isoformat()
+        })
+
+    logger.info(f"Columnar store synced {synced} {dataset} rows")
+    return {"dataset": dataset, "rows_synced": synced, "rows_stored": state.get("rows", 0) + synced}
+
+
+TREND_SCHEMA_FIELDS = [
+    ("snapshot_date", "string"),
+    ("skill_name_normalized", "string"),
+    ("job_mention_count", "int64"),
+    ("discussion_mention_count", "int64"),
+]
+
+
+async def _sync_trends() -> dict:
+    root = _dataset_dir("skill_trends")
+    os.makedirs(root, exist_ok=True)
+    state = _read_state(root)
+    for path in _part_files(root):
+        if path.endswith(".tmp"):
+            os.remove(path)
+
+    rows = await get_skill_trend_history(state.get("last_snapshot"))
+    by_date = defaultdict(list)
+    for row in rows:
+        by_date[row["snapshot_date"]].append(row)
+
+    schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in TREND_SCHEMA_FIELDS])
+    for snapshot_date, date_rows in by_date.items():
+        partition = os.path.join(root, f"snapshot={snapshot_date}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, "part-0.parquet")
+        table = pa.Table.from_pylist(
+            [{name: row.get(name) for name, _ in TREND_SCHEMA_FIELDS} for row in date_rows],
+            schema=schema
+        )
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+
+    if by_date:
+        _write_state(root, {
+            "last_snapshot": max(by_date),
+            "synced_at": datetime.now(timezone.utc).isoformat()
+        })
+
+    return {"dataset": "skill_trends", "rows_synced": len(rows), "snapshots_synced": len(by_date)}
+
+
+async def sync(dataset: str) -> dict:
+    """
+    Pull rows stored since the last sync into the local store.
+
+    Concurrent syncs of the same dataset share one run.
+
+    Args:
+        dataset: "jobs", "discussions" or "skill_trends"
+
+    Returns:
+        Sync summary (rows_synced, ...)
+    """
+    run = _sync_trends if dataset == "skill_trends" else lambda: _sync_rows(dataset)
+    return await coalesce("columnar:sync", {"dataset": dataset}, run)
+
+
+def read_table(dataset: str, columns: list[str], filters: Optional[list] = None):
+    """
+    Read columns of a stored dataset (memory-mapped).
+
+    Args:
+        dataset: "jobs", "discussions" or "skill_trends"
+        columns: Columns to load
+        filters: Optional pyarrow DNF filters
+
+    Returns:
+        pyarrow.Table (empty if nothing has been synced)
+    """
+    root = _dataset_dir(dataset)
+    if not _part_files(root):
+        if dataset == "skill_trends":
+            types = dict(TREND_SCHEMA_FIELDS)
+            return pa.schema([(c, getattr(pa, types[c])()) for c in columns]).empty_table()
+        return arrow_schema(dataset, columns).empty_table()
+    if dataset == "skill_trends":
+        return pq.read_table(root, columns=columns, filters=filters, memory_map=True)
+    # Files synced before a column was added read it as nulls
+    schema = arrow_schema(dataset, resolve_fields(dataset, None))
+    return pq.read_table(root, columns=columns, filters=filters, schema=schema, memory_map=True)
+
+
+def load_skill_texts():
+    """
+    Get the texts aggregate-trends counts skills in.
+
+    Returns:
+        (job_texts, discussion_texts) as Arrow string arrays: descriptions
+        of canonical jobs, and "title body" of every discussion
+    """
+    jobs = read_table("jobs", ["description", "canonical_job_id"])
+    jobs = jobs.filter(pc.is_null(jobs["canonical_job_id"]))
+    job_texts = pc.fill_null(jobs["description"], "")
+
+    discussions = read_table("discussions", ["title", "body"])
+    discussion_texts = pc.binary_join_element_wise(
+        pc.fill_null(discussions["title"], ""),
+        pc.fill_null(discussions["body"], ""),
+        " "
+    )
+    return job_texts, discussion_texts
+
+
+def load_cube_dimensions(columns: dict[str, list[str]]) -> dict[str, dict[str, list]]:
+    """
+    Get trend cube dimension values for the same rows as load_skill_texts.
+
+    Args:
+        columns: Dimension columns per dataset (cube_service.CUBE_DIMENSIONS)
+
+    Returns:
+        {dataset: {column: values}}, in load_skill_texts row order
+    """
+    jobs = read_table("jobs", [*columns["jobs"], "canonical_job_id"])
+    jobs = jobs.filter(pc.is_null(jobs["canonical_job_id"]))
+    discussions = read_table("discussions", columns["discussions"])
+    return {
+        "jobs": {column: jobs[column].to_pylist() for column in columns["jobs"]},
+        "discussions": {column: discussions[column].to_pylist() for column in columns["discussions"]}
+    }
+
+
+def skill_matrix(texts):
+    """
+    Build the documents x skills mention-count matrix for a column of texts.
+
+    Gives the same matrix as cooccurrence_service.skill_matrix_from_texts,
+    except that `\\b` is ASCII-only in Arrow's regex engine.
+    """
+    lowered = pc.utf8_lower(texts)
+    rows, cols, counts = [], [], []
+    for column, pattern in SKILL_PATTERNS:
+        mentions = pc.count_substring_regex(lowered, pattern).to_numpy(zero_copy_only=False)
+        docs = np.flatnonzero(mentions)
+        rows.append(docs)
+        cols.append(np.full(len(docs), column))
+        counts.append(mentions[docs])
+    return build_skill_matrix(np.concatenate(rows), np.concatenate(cols), np.concatenate(counts), len(texts))
+
+
+async def trend_history(since: str = None) -> list[dict]:
+    """
+    Sync and read skill_trends snapshot rows, oldest first.
+
+    Same rows as persistence_service.get_skill_trend_history.
+    """
+    await sync("skill_trends")
+    filters = [("snapshot_date", ">=", since)] if since else None
+    table = read_table("skill_trends", [name for name, _ in TREND_SCHEMA_FIELDS], filters)
+    return table.sort_by("snapshot_date").to_pylist()
+
+
+def status() -> dict:
+    """Files, bytes and sync state per stored dataset."""
+    if not enabled():
+        return {"enabled": False}
+
+    datasets = {}
+    for dataset in ("jobs", "discussions", "skill_trends"):
+        root = _dataset_dir(dataset)
+        parts = _part_files(root)
+        datasets[dataset] = {
+            "files": len(parts),
+            "bytes": sum(os.path.getsize(p) for p in parts),
+            **{k: v for k, v in _read_state(root).items() if k != "cursor"}
+        }
+    return {"enabled": True, "dir": settings.COLUMNAR_STORE_DIR, "datasets": datasets}
@@ -0,0 +1,114 @@
+"""
+Comment Service - Optional comment ingestion for high-engagement Reddit posts.
+
+Most skill talk in career threads happens in the comments. When
+REDDIT_COMMENTS_ENABLED is set, run-discussions picks the posts with at
+least REDDIT_COMMENTS_MIN_COMMENTS comments and REDDIT_COMMENTS_MIN_UPVOTES
+upvotes, most-commented first, and fetches their comment trees.
+
+Comment requests go through the same Reddit client, and so the same rate
+controller, as the post searches. At most REDDIT_COMMENTS_CONCURRENCY of
+them are in flight. Once the Reddit circuit opens, fetches that haven't
+started yet are dropped rather than each failing on it. Each tree is
+flattened as it arrives, capped in depth and size, and comments are written
+in bulk as soon as a batch fills. Memory stays bounded by the batch and the
+in-flight trees, however many posts qualify.
+"""
+import asyncio
+from collections import Counter
+
+from app.collectors.reddit_collector import fetch_post_comments
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import FETCH_FAILURES
+from app.core.rate_limit import UpstreamUnavailable
+from app.services.persistence_service import COMMENT_BATCH_SIZE, store_comments
+
+logger = get_logger(__name__)
+
+
+def select_posts(posts: list[dict], limit: int = None) -> list[dict]:
+    """
+    Choose the posts whose comments are worth fetching.
+
+    Args:
+        posts: Normalized posts from the collectors
+        limit: Most posts chosen (default REDDIT_COMMENTS_MAX_POSTS)
+
+    Returns:
+        Posts with a Reddit id that meet both engagement thresholds, most comments first
+    """
+    limit = settings.REDDIT_COMMENTS_MAX_POSTS if limit is None else limit
+    chosen = {}
+    for post in posts:
+        if (
+            post.get("post_id")
+            and post.get("comments_count", 0) >= settings.REDDIT_COMMENTS_MIN_COMMENTS
+            and post.get("upvotes", 0) >= settings.REDDIT_COMMENTS_MIN_UPVOTES
+        ):
+            chosen.setdefault(post["post_hash"], post)
+    return sorted(chosen.values(), key=lambda post: -post.get("comments_count", 0))[:limit]
+
+
+async def ingest_comments(posts: list[dict]) -> dict:
+    """
+    Fetch and store comments of the high-engagement posts among `posts`.
+
+    Args:
+        posts: Normalized posts fetched this run (already stored)
+
+    Returns:
+        {posts_selected, posts_fetched, posts_failed, posts_skipped,
+        comments_fetched, comments_stored, errors}
+    """
+    selected = select_posts(posts)
+    semaphore = asyncio.Semaphore(settings.REDDIT_COMMENTS_CONCURRENCY)
+    totals = Counter()
+    pending = []
+    stopped = False
+
+    async def fetch(post: dict) -> list[dict]:
+        nonlocal stopped
+        async with semaphore:
+            if stopped:
+                totals["posts_skipped"] += 1
+                return []
+            try:
+                return await fetch_post_comments(post)
+            except UpstreamUnavailable as e:
+                # Circuit open: the remaining fetches would fail the same way
+                if stopped:
+                    totals["posts_skipped"] += 1
+                    return []
+                stopped = True
+                logger.error(f"Stopping comment fetch: {e}")
+            except Exception as e:
+                logger.error(f"Error fetching comments of {post['post_hash']}: {e}")
+            FETCH_FAILURES.inc(source="reddit_comments")
+            totals["posts_failed"] += 1
+            return []
+
+    async def flush():
+        result = await store_comments(pending)
+        totals["comments_stored"] += result["stored"]
+        totals["errors"] += result["errors"]
+        pending.clear()
+
+    for done in asyncio.as_completed([fetch(post) for post in selected]):
+        comments = await done
+        totals["posts_fetched"] += 1
+        totals["comments_fetched"] += len(comments)
+        pending.extend(comments)
+        if len(pending) >= COMMENT_BATCH_SIZE:
+            await flush()
+    if pending:
+        await flush()
+
+    totals["posts_fetched"] -= totals["posts_failed"] + totals["posts_skipped"]
+    return {
+        "posts_selected": len(selected),
+        **{
+            key: totals[key]
+            for key in ("posts_fetched", "posts_failed", "posts_skipped", "comments_fetched", "comments_stored", "errors")
+        }
+    }
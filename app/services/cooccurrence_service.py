@@ -0,0 +1,259 @@
+"""
+Co-occurrence Service - Skill pairs that appear in the same documents.
+
+Extraction results are collected into a sparse documents x skills matrix of
+mention counts (one column per normalized skill). The same matrix gives the
+per-skill totals for the trend snapshot (column sums) and, binarized, the
+skill x skill co-occurrence counts as one sparse product `B.T @ B`, so a
+snapshot over hundreds of thousands of documents is a single pass.
+With SKILL_AGGREGATION_MODE=database the pair and document counts come from
+the skill_cooccurrence_counts RPC instead, and are scored the same way.
+
+For each pair of skills a and b over N documents:
+    lift = N * n(a, b) / (n(a) * n(b))
+    pmi  = log2(lift)
+Lift above 1 means the skills appear together more often than chance.
+"""
+from collections import Counter
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.core import jsonio
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.services.normalizer_service import KNOWN_SKILLS, extract_skills_from_text, normalize_skill_name
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Matrix columns: every normalized skill, in a fixed order
+SKILL_COLUMNS = sorted({normalize_skill_name(skill) for skill in KNOWN_SKILLS})
+SKILL_INDEX = {skill: i for i, skill in enumerate(SKILL_COLUMNS)}
+
+SORT_COLUMNS = {"lift", "pmi", "pair_count"}
+
+
+def build_skill_matrix(rows: np.ndarray, cols: np.ndarray, counts: np.ndarray, num_documents: int) -> sparse.csr_matrix:
+    """
+    Assemble a documents x SKILL_COLUMNS mention-count matrix from COO triples.
+    Duplicate (row, col) entries, e.g. "reactjs" and "react" in one document, are summed.
+    """
+    return sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.int64), (np.asarray(rows), np.asarray(cols))),
+        shape=(num_documents, len(SKILL_COLUMNS))
+    )
+
+
+def skill_matrix_from_texts(texts: Iterable[str]) -> sparse.csr_matrix:
+    """Extract skills from each text into a documents x skills mention-count matrix."""
+    rows, cols, counts = [], [], []
+    num_documents = 0
+    for doc, text in enumerate(texts):
+        num_documents += 1
+        for skill in extract_skills_from_text(text):
+            rows.append(doc)
+            cols.append(SKILL_INDEX[skill["skill_name_normalized"]])
+            counts.append(skill["mention_count"])
+    return build_skill_matrix(rows, cols, counts, num_documents)
+
+
+def skill_counts(matrix: sparse.csr_matrix) -> Counter:
+    """Total mentions per skill (skills never mentioned are left out)."""
+    totals = np.asarray(matrix.sum(axis=0)).ravel()
+    return Counter({SKILL_COLUMNS[i]: int(totals[i]) for i in np.flatnonzero(totals)})
+
+
+def score_pairs(
+    skill_a: list[str],
+    skill_b: list[str],
+    together: np.ndarray,
+    count_a: np.ndarray,
+    count_b: np.ndarray,
+    num_documents: int
+) -> list[dict]:
+    """Build co-occurrence records with lift and PMI from pair and document counts."""
+    together = np.asarray(together, dtype=np.float64)
+    count_a = np.asarray(count_a, dtype=np.float64)
+    count_b = np.asarray(count_b, dtype=np.float64)
+    lift = num_documents * together / (count_a * count_b)
+    pmi = np.log2(lift)
+
+    return [
+        {
+            "skill_a": skill_a[i],
+            "skill_b": skill_b[i],
+            "pair_count": int(together[i]),
+            "skill_a_count": int(count_a[i]),
+            "skill_b_count": int(count_b[i]),
+            "document_count": int(num_documents),
+            "lift": round(float(lift[i]), 4),
+            "pmi": round(float(pmi[i]), 4)
+        }
+        for i in range(len(together))
+    ]
+
+
+def compute_cooccurrence(matrix: sparse.csr_matrix, min_count: int = None) -> list[dict]:
+    """
+    Co-occurrence, lift and PMI for every skill pair seen together.
+
+    Args:
+        matrix: documents x skills mention counts
+        min_count: Minimum documents a pair must share (default COOCCURRENCE_MIN_COUNT)
+
+    Returns:
+        Records with skill_a < skill_b, pair_count, skill_a_count,
+        skill_b_count, document_count, lift and pmi
+    """
+    min_count = settings.COOCCURRENCE_MIN_COUNT if min_count is None else min_count
+    num_documents = matrix.shape[0]
+    if num_documents == 0:
+        return []
+
+    present = (matrix > 0).astype(np.int32)
+    document_freq = np.asarray(present.sum(axis=0)).ravel()
+    pairs = sparse.triu(present.T @ present, k=1).tocoo()
+
+    keep = pairs.data >= max(min_count, 1)
+    a, b = pairs.row[keep], pairs.col[keep]
+    return score_pairs(
+        [SKILL_COLUMNS[i] for i in a],
+        [SKILL_COLUMNS[i] for i in b],
+        pairs.data[keep],
+        document_freq[a],
+        document_freq[b],
+        num_documents
+    )
+
+
+async def fetch_cooccurrence_counts(scope: str, min_count: int = None) -> list[dict]:
+    """
+    Co-occurrence computed in Postgres from the per-record skill rows
+    (skill_cooccurrence_counts RPC, SKILL_AGGREGATION_MODE=database).
+
+    Returns:
+        The same records as compute_cooccurrence
+    """
+    min_count = settings.COOCCURRENCE_MIN_COUNT if min_count is None else min_count
+    resp = await _http.post(
+        f"{SUPABASE_REST_URL}/rpc/skill_cooccurrence_counts",
+        headers=HEADERS,
+        json={"p_scope": scope, "p_min_count": max(min_count, 1)},
+        timeout=120
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"Co-occurrence RPC failed: {resp.status_code} - {resp.text[:200]}")
+
+    rows = jsonio.loads(resp.content)
+    if not rows:
+        return []
+    return score_pairs(
+        [row["skill_a"] for row in rows],
+        [row["skill_b"] for row in rows],
+        [row["pair_count"] for row in rows],
+        [row["skill_a_count"] for row in rows],
+        [row["skill_b_count"] for row in rows],
+        rows[0]["document_count"]
+    )
+
+
+async def store_cooccurrence(snapshot_date: str, scope: str, pairs: list[dict]) -> dict:
+    """
+    Replace the stored co-occurrence pairs of a snapshot and scope in one
+    transaction (replace_skill_cooccurrence RPC, migration 015). Readers see
+    the previous pairs until the new ones commit, and a failed write leaves
+    them in place.
+
+    Args:
+        snapshot_date: ISO date of the trend snapshot
+        scope: "jobs" or "discussions"
+        pairs: Records from compute_cooccurrence
+    """
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/rpc/replace_skill_cooccurrence",
+            headers=HEADERS,
+            json={"p_snapshot_date": snapshot_date, "p_scope": scope, "p_pairs": pairs},
+            timeout=120
+        )
+        if resp.status_code != 200:
+            logger.error(f"Co-occurrence replace error: {resp.status_code} - {resp.text[:200]}")
+            return {"inserted": 0, "errors": len(pairs)}
+    except Exception as e:
+        logger.error(f"Error storing co-occurrence pairs: {e}")
+        return {"inserted": 0, "errors": len(pairs)}
+
+    return {"inserted": jsonio.loads(resp.content), "errors": 0}
+
+
+async def get_latest_snapshot_date(scope: str) -> Optional[str]:
+    """Most recent snapshot with stored pairs for a scope, or None."""
+    url = (
+        f"{SUPABASE_REST_URL}/skill_cooccurrence"
+        f"?select=snapshot_date&scope=eq.{scope}&order=snapshot_date.desc&limit=1"
+    )
+    resp = await _http.get(url, headers=HEADERS, timeout=10)
+    rows = jsonio.loads(resp.content) if resp.status_code == 200 else []
+    return rows[0]["snapshot_date"] if rows else None
+
+
+async def get_cooccurrence(
+    scope: str = "jobs",
+    snapshot_date: str = None,
+    skill: str = None,
+    min_count: int = None,
+    sort: str = "lift",
+    limit: int = 50
+) -> dict:
+    """
+    Read stored co-occurrence pairs.
+
+    Args:
+        scope: "jobs" or "discussions"
+        snapshot_date: Snapshot to read (default: latest)
+        skill: Only pairs containing this skill
+        min_count: Only pairs sharing at least this many documents
+        sort: "lift", "pmi" or "pair_count" (descending)
+        limit: Maximum pairs returned
+
+    Returns:
+        {snapshot_date, scope, pairs}
+
+    Raises:
+        ValueError: If sort isn't supported
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of: {', '.join(sorted(SORT_COLUMNS))}")
+
+    snapshot_date = snapshot_date or await get_latest_snapshot_date(scope)
+    if not snapshot_date:
+        return {"snapshot_date": None, "scope": scope, "pairs": []}
+
+    params = [
+        ("select", "skill_a,skill_b,pair_count,skill_a_count,skill_b_count,document_count,lift,pmi"),
+        ("snapshot_date", f"eq.{snapshot_date}"),
+        ("scope", f"eq.{scope}"),
+        ("order", f"{sort}.desc,pair_count.desc"),
+        ("limit", str(limit)),
+    ]
+    if skill:
+        skill = normalize_skill_name(skill)
+        params.append(("or", f'(skill_a.eq."{skill}",skill_b.eq."{skill}")'))
+    if min_count:
+        params.append(("pair_count", f"gte.{min_count}"))
+
+    resp = await _http.get(f"{SUPABASE_REST_URL}/skill_cooccurrence", params=params, headers=HEADERS, timeout=30)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Co-occurrence read failed: {resp.status_code} - {resp.text[:200]}")
+
+    return {"snapshot_date": snapshot_date, "scope": scope, "pairs": jsonio.loads(resp.content)}
@@ -0,0 +1,203 @@
+"""
+Cube Service - Skill counts broken down by search query, role, location,
+subreddit and source.
+
+The cube is built from the same documents x skills matrix aggregate-trends
+already extracts, so adding dimensions costs no extra scan: each dimension's
+values are mapped to integer codes in one pass over the documents, and the
+per-value counts for every skill are one sparse product
+`indicator (values x documents) @ matrix`. Only non-zero cells are stored, one
+set per trend snapshot, and any slice (scope, dimension, value, skill) is a
+filtered read.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from app.core import jsonio
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.services.cooccurrence_service import SKILL_COLUMNS
+from app.services.normalizer_service import normalize_skill_name
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Columns each scope is broken down by
+CUBE_DIMENSIONS = {
+    "jobs": ["search_query", "role_key", "location", "source"],
+    "discussions": ["search_query", "subreddit", "source"],
+}
+
+SORT_COLUMNS = {"mention_count", "document_count"}
+
+
+def _factorize(values: Sequence) -> tuple[list[str], np.ndarray]:
+    """Map values to integer codes; blank values get -1."""
+    index = {}
+    codes = np.empty(len(values), dtype=np.int64)
+    for row, value in enumerate(values):
+        value = value.strip() if isinstance(value, str) else value
+        codes[row] = index.setdefault(value, len(index)) if value else -1
+    return list(index), codes
+
+
+def compute_cube(scope: str, matrix: sparse.csr_matrix, dimensions: dict[str, Sequence]) -> list[dict]:
+    """
+    Skill counts per dimension value.
+
+    Args:
+        scope: "jobs" or "discussions"
+        matrix: documents x skills mention counts
+        dimensions: Column name -> one value per matrix row
+
+    Returns:
+        Non-zero cells: scope, dimension, dimension_value, skill_name,
+        mention_count and document_count (documents mentioning the skill)
+    """
+    num_documents = matrix.shape[0]
+    present = (matrix > 0).astype(np.int64)
+    cells = []
+
+    for dimension, values in dimensions.items():
+        keys, codes = _factorize(values)
+        rows = np.flatnonzero(codes >= 0)
+        if not len(rows):
+            continue
+        indicator = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (codes[rows], rows)),
+            shape=(len(keys), num_documents)
+        )
+        # Mention counts are positive, so both products have the same non-zero cells
+        mentions = (indicator @ matrix).tocsr()
+        documents = (indicator @ present).tocsr()
+        mentions.sort_indices()
+        documents.sort_indices()
+        mentions = mentions.tocoo()
+
+        for value, skill, count, docs in zip(mentions.row, mentions.col, mentions.data, documents.data):
+            cells.append({
+                "scope": scope,
+                "dimension": dimension,
+                "dimension_value": keys[value],
+                "skill_name": SKILL_COLUMNS[skill],
+                "mention_count": int(count),
+                "document_count": int(docs)
+            })
+
+    return cells
+
+
+async def fetch_cube_counts() -> list[dict]:
+    """
+    Cube cells grouped in Postgres from the per-record skill rows
+    (skill_trend_cube_counts RPC, SKILL_AGGREGATION_MODE=database).
+
+    Returns:
+        The same cells as compute_cube, for both scopes
+    """
+    resp = await _http.post(f"{SUPABASE_REST_URL}/rpc/skill_trend_cube_counts", headers=HEADERS, json={}, timeout=120)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Trend cube RPC failed: {resp.status_code} - {resp.text[:200]}")
+    return jsonio.loads(resp.content) or []
+
+
+async def store_cube(snapshot_date: str, cells: list[dict]) -> dict:
+    """
+    Replace the stored cube of a snapshot in one transaction
+    (replace_skill_trend_cube RPC, migration 014). Readers see the previous
+    cells until the new ones commit, and a failed write leaves them in place.
+
+    Args:
+        snapshot_date: ISO date of the trend snapshot
+        cells: Records from compute_cube
+    """
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/rpc/replace_skill_trend_cube",
+            headers=HEADERS,
+            json={"p_snapshot_date": snapshot_date, "p_cells": cells},
+            timeout=120
+        )
+        if resp.status_code != 200:
+            logger.error(f"Trend cube replace error: {resp.status_code} - {resp.text[:200]}")
+            return {"inserted": 0, "errors": len(cells)}
+    except Exception as e:
+        logger.error(f"Error storing trend cube cells: {e}")
+        return {"inserted": 0, "errors": len(cells)}
+
+    return {"inserted": jsonio.loads(resp.content), "errors": 0}
+
+
+async def get_latest_snapshot_date() -> Optional[str]:
+    """Most recent snapshot with a stored cube, or None."""
+    url = f"{SUPABASE_REST_URL}/skill_trend_cube?select=snapshot_date&order=snapshot_date.desc&limit=1"
+    resp = await _http.get(url, headers=HEADERS, timeout=10)
+    rows = jsonio.loads(resp.content) if resp.status_code == 200 else []
+    return rows[0]["snapshot_date"] if rows else None
+
+
+async def get_cube(
+    scope: str = "jobs",
+    dimension: str = None,
+    value: str = None,
+    skill: str = None,
+    snapshot_date: str = None,
+    sort: str = "mention_count",
+    limit: int = 100
+) -> dict:
+    """
+    Read a slice of the stored cube.
+
+    Args:
+        scope: "jobs" or "discussions"
+        dimension: Only cells of this dimension (see CUBE_DIMENSIONS)
+        value: Only cells with this dimension value
+        skill: Only cells of this skill
+        snapshot_date: Snapshot to read (default: latest)
+        sort: "mention_count" or "document_count" (descending)
+        limit: Maximum cells returned
+
+    Returns:
+        {snapshot_date, scope, cells}
+
+    Raises:
+        ValueError: If the dimension doesn't exist for the scope or sort isn't supported
+    """
+    if dimension and dimension not in CUBE_DIMENSIONS[scope]:
+        raise ValueError(f"dimension for {scope} must be one of: {', '.join(CUBE_DIMENSIONS[scope])}")
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of: {', '.join(sorted(SORT_COLUMNS))}")
+
+    snapshot_date = snapshot_date or await get_latest_snapshot_date()
+    if not snapshot_date:
+        return {"snapshot_date": None, "scope": scope, "cells": []}
+
+    params = [
+        ("select", "dimension,dimension_value,skill_name,mention_count,document_count"),
+        ("snapshot_date", f"eq.{snapshot_date}"),
+        ("scope", f"eq.{scope}"),
+        ("order", f"{sort}.desc,skill_name.asc"),
+        ("limit", str(limit)),
+    ]
+    if dimension:
+        params.append(("dimension", f"eq.{dimension}"))
+    if value:
+        params.append(("dimension_value", f"eq.{value.strip()}"))
+    if skill:
+        params.append(("skill_name", f"eq.{normalize_skill_name(skill)}"))
+
+    resp = await _http.get(f"{SUPABASE_REST_URL}/skill_trend_cube", params=params, headers=HEADERS, timeout=30)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Trend cube read failed: {resp.status_code} - {resp.text[:200]}")
+
+    return {"snapshot_date": snapshot_date, "scope": scope, "cells": jsonio.loads(resp.content)}
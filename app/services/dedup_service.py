@@ -0,0 +1,265 @@
+"""
+Dedup Service - Near-duplicate detection for job postings.
+
+`generate_job_hash` only catches exact title|company|location matches. The
+same posting syndicated with a slightly different title or location is
+caught here with MinHash signatures over description shingles and a banded
+LSH index, so each new job is checked against stored jobs in sublinear time.
+
+Signatures of canonical jobs are persisted in `job_minhash_signatures` and
+loaded incrementally, so the in-memory index only pulls rows it has not
+seen yet.
+"""
+import base64
+import re
+import zlib
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+# MinHash parameters: 16 bands x 8 rows puts the LSH candidate threshold
+# around 0.7 Jaccard; candidates are then verified against SIMILARITY_THRESHOLD
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+SHINGLE_SIZE = 5
+SIMILARITY_THRESHOLD = 0.8
+
+# Universal hashing (a * x + b) mod p with a Mersenne prime keeps every
+# intermediate product inside uint64
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(20260104)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+PAGE_SIZE = 1000
+
+
+def shingle_text(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Hash word shingles of a text to stable 32-bit integers.
+
+    Returns:
+        Unique shingle hashes (empty if the text is shorter than one shingle)
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < size:
+        return np.array([], dtype=np.uint64)
+
+    hashes = {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode())
+        for i in range(len(tokens) - size + 1)
+    }
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def compute_signature(text: str) -> np.ndarray:
+    """
+    Compute the MinHash signature of a text.
+
+    Returns:
+        uint32 array of NUM_PERMUTATIONS values, or None for texts too short to shingle
+    """
+    shingles = shingle_text(text)
+    if not len(shingles):
+        return None
+
+    shingles %= _MERSENNE_PRIME
+    # (permutations x shingles) in one broadcast, min over shingles
+    hashed = (np.outer(_PERM_A, shingles) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+def encode_signature(signature: np.ndarray) -> str:
+    """Encode a signature compactly for storage."""
+    return base64.b64encode(signature.astype("<u4").tobytes()).decode()
+
+
+def decode_signature(encoded: str) -> np.ndarray:
+    """Decode a stored signature."""
+    return np.frombuffer(base64.b64decode(encoded), dtype="<u4").astype(np.uint32)
+
+
+class LSHIndex:
+    """Banded LSH index mapping signature bands to job ids."""
+
+    def __init__(self, num_bands: int = NUM_BANDS, rows_per_band: int = ROWS_PER_BAND):
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.buckets = [dict() for _ in range(num_bands)]
+        self.signatures = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(self.num_bands):
+            start = band * self.rows_per_band
+            yield band, signature[start:start + self.rows_per_band].tobytes()
+
+    def add(self, job_id: str, signature: np.ndarray):
+        """Add a job signature to the index."""
+        if job_id in self.signatures:
+            return
+        self.signatures[job_id] = signature
+        for band, key in self._bands(signature):
+            self.buckets[band].setdefault(key, []).append(job_id)
+
+    def query(self, signature: np.ndarray, threshold: float = SIMILARITY_THRESHOLD) -> tuple[str, float]:
+        """
+        Find the most similar indexed job above the threshold.
+
+        Returns:
+            (job_id, similarity) or (None, 0.0) if nothing matches
+        """
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best_id, best_score = None, 0.0
+        for job_id in candidates:
+            score = estimate_similarity(signature, self.signatures[job_id])
+            if score >= threshold and score > best_score:
+                best_id, best_score = job_id, score
+
+        return best_id, best_score
+
+
+# Process-wide index and the (created_at, job_id) of the last loaded signature
+_index = LSHIndex()
+_loaded_until: tuple[str, str] = None
+
+
+async def _sync_index():
+    """Load signatures persisted since the last sync into the in-memory index."""
+    global _loaded_until
+
+    while True:
+        params = [
+            ("select", "job_id,signature,created_at"),
+            ("order", "created_at.asc,job_id.asc"),
+            ("limit", str(PAGE_SIZE)),
+        ]
+        if _loaded_until:
+            # Keyset on (created_at, job_id): rows of one batch insert share created_at
+            created_at, job_id = _loaded_until
+            params.append((
+                "or",
+                f'(created_at.gt."{created_at}",and(created_at.eq."{created_at}",job_id.gt.{job_id}))'
+            ))
+
+        try:
+            resp = await _http.get(f"{SUPABASE_REST_URL}/job_minhash_signatures", params=params, headers=HEADERS, timeout=30)
+        except Exception as e:
+            logger.error(f"Error loading job signatures: {e}")
+            return
+
+        if resp.status_code != 200:
+            logger.error(f"Job signature load error: {resp.status_code} - {resp.text[:200]}")
+            return
+
+        rows = jsonio.loads(resp.content)
+        for row in rows:
+            _index.add(row["job_id"], decode_signature(row["signature"]))
+        if rows:
+            _loaded_until = (rows[-1]["created_at"], rows[-1]["job_id"])
+        if len(rows) < PAGE_SIZE:
+            return
+
+
+async def find_near_duplicate(text: str) -> tuple[str, np.ndarray]:
+    """
+    Check a job description against the stored canonical jobs.
+
+    Args:
+        text: Job description
+
+    Returns:
+        (canonical_job_id or None, signature or None)
+    """
+    signature = compute_signature(text)
+    if signature is None:
+        return None, None
+
+    await _sync_index()
+    canonical_id, _ = _index.query(signature)
+    return canonical_id, signature
+
+
+async def register_job_signature(job_id: str, job_hash: str, signature: np.ndarray):
+    """Persist a canonical job's signature and add it to the index."""
+    _index.add(job_id, signature)
+
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/job_minhash_signatures",
+            headers=HEADERS,
+            json={
+                "job_id": job_id,
+                "job_hash": job_hash,
+                "signature": encode_signature(signature)
+            },
+            timeout=10
+        )
+        if resp.status_code not in [200, 201]:
+            logger.error(f"Signature insert error: {resp.status_code} - {resp.text[:200]}")
+    except Exception as e:
+        logger.error(f"Error storing job signature: {e}")
+
+
+async def backfill_signatures(jobs: list[dict]) -> int:
+    """
+    Store signatures for canonical jobs saved before near-duplicate detection,
+    so re-posts of them are caught. Jobs that already have one are ignored.
+
+    Args:
+        jobs: Rows with id, job_hash and description
+
+    Returns:
+        Number of signatures sent
+    """
+    def sign() -> list[tuple[dict, np.ndarray]]:
+        signed = [(job, compute_signature(job.get("description") or "")) for job in jobs]
+        return [(job, signature) for job, signature in signed if signature is not None]
+
+    # Shingling and hashing are CPU-bound, keep them off the event loop
+    signed = await run_in_threadpool(sign)
+    rows = []
+    for job, signature in signed:
+        _index.add(job["id"], signature)
+        rows.append({"job_id": job["id"], "job_hash": job.get("job_hash") or "", "signature": encode_signature(signature)})
+
+    if not rows:
+        return 0
+
+    resp = await _http.post(
+        f"{SUPABASE_REST_URL}/job_minhash_signatures?on_conflict=job_id",
+        headers={**HEADERS, "Prefer": "return=minimal,resolution=ignore-duplicates"},
+        json=rows,
+        timeout=30
+    )
+    if resp.status_code not in [200, 201, 204]:
+        raise RuntimeError(f"Signature backfill failed: {resp.status_code} - {resp.text[:200]}")
+    return len(rows)
@@ -0,0 +1,376 @@
+"""
+Export Service - Incremental, paged reads of stored jobs and discussions.
+
+Rows are read in (ingested_at, id) keyset order, one PostgREST page at a
+time, so an export of any size holds a single page in memory and never
+uses OFFSET. The position after the last row is handed to consumers as an
+opaque cursor; passing it back returns only rows stored after it.
+
+ingested_at is assigned by the database when a row is inserted (migration
+013). A row can still commit a moment after a later-starting insert, so
+reads stop at rows EXPORT_SETTLE_SECONDS old; a cursor never passes a row
+that hasn't committed yet, and the newest rows arrive with the next read.
+
+Parquet output needs the optional `pyarrow` package.
+"""
+import base64
+import binascii
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from app.core import jsonio
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
+# Exportable columns per dataset and their Parquet types ("json" columns are
+# written to Parquet as JSON text)
+EXPORT_COLUMNS = {
+    "jobs": {
+        "id": "string",
+        "job_hash": "string",
+        "title": "string",
+        "company_name": "string",
+        "location": "string",
+        "description": "string",
+        "posted_date": "string",
+        "salary_text": "string",
+        "job_url": "string",
+        "apply_url": "string",
+        "source": "string",
+        "source_job_id": "string",
+        "work_type": "string",
+        "experience_level": "string",
+        "canonical_job_id": "string",
+        "role_key": "string",
+        "search_query": "string",
+        "salary_min": "float64",
+        "salary_max": "float64",
+        "salary_period": "string",
+        "posted_at": "timestamp",
+        "work_mode": "string",
+        "raw_data": "json",
+        "fetched_at": "timestamp",
+        "ingested_at": "timestamp",
+    },
+    "discussions": {
+        "id": "string",
+        "post_hash": "string",
+        "post_id": "string",
+        "title": "string",
+        "body": "string",
+        "subreddit": "string",
+        "author": "string",
+        "upvotes": "int64",
+        "comments_count": "int64",
+        "post_url": "string",
+        "created_utc": "string",
+        "source": "string",
+        "search_query": "string",
+        "raw_data": "json",
+        "fetched_at": "timestamp",
+        "ingested_at": "timestamp",
+    },
+}
+
+EXPORT_TABLES = {"jobs": "fetched_jobs", "discussions": "fetched_discussions"}
+
+# raw_data is large and rarely needed, so it is only exported when asked for
+DEFAULT_EXCLUDED = {"raw_data"}
+
+
+def encode_cursor(row: dict) -> str:
+    """Build the opaque cursor pointing just after `row`."""
+    payload = jsonio.dumps({"t": row["ingested_at"], "id": row["id"]})
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Decode a cursor into (ingested_at, id). Cursors come from clients, so
+    the id must be a UUID like every row id.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        payload = jsonio.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(payload["t"]), str(uuid.UUID(str(payload["id"])))
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid export cursor")
+
+
+def resolve_fields(dataset: str, fields: Optional[str]) -> list[str]:
+    """
+    Validate a comma-separated column projection.
+
+    Raises:
+        ValueError: If a column isn't exportable
+    """
+    columns = EXPORT_COLUMNS[dataset]
+    if not fields:
+        return [c for c in columns if c not in DEFAULT_EXCLUDED]
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in columns]
+    if unknown:
+        raise ValueError(f"Unknown {dataset} fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '\\"') + '"'
+
+
+def build_filters(
+    since: Optional[str] = None,
+    source: Optional[str] = None,
+    subreddits: Optional[list[str]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    conditions: Optional[list[str]] = None
+) -> list[tuple[str, str]]:
+    """
+    Translate export parameters into PostgREST query filters.
+    `conditions` (e.g. from job_field_conditions) are ANDed with the date range.
+    Values inside the or=(...) and and=(...) trees are quoted so they can't change
+    their shape.
+    """
+    filters = []
+    if since:
+        ingested_at, row_id = decode_cursor(since)
+        filters.append((
+            "or",
+            f"(ingested_at.gt.{_quote(ingested_at)},and(ingested_at.eq.{_quote(ingested_at)},id.gt.{_quote(row_id)}))"
+        ))
+    if source:
+        filters.append(("source", f"eq.{source}"))
+    if subreddits:
+        filters.append(("subreddit", f"in.({','.join(_quote(s) for s in subreddits)})"))
+
+    date_range = []
+    if start_date:
+        date_range.append(f"fetched_at.gte.{_quote(start_date.isoformat())}")
+    if end_date:
+        date_range.append(f"fetched_at.lt.{_quote(end_date.isoformat())}")
+    date_range.extend(conditions or [])
+    if date_range:
+        filters.append(("and", f"({','.join(date_range)})"))
+    return filters
+
+
+def job_field_conditions(
+    posted_after: Optional[datetime] = None,
+    posted_before: Optional[datetime] = None,
+    work_mode: Optional[str] = None,
+    salary_period: Optional[str] = None,
+    min_salary: Optional[float] = None,
+    max_salary: Optional[float] = None
+) -> list[str]:
+    """
+    Translate job field filters into conditions on the typed columns, for build_filters.
+
+    A salary filter matches postings whose range overlaps [min_salary, max_salary].
+    """
+    conditions = []
+    if posted_after:
+        conditions.append(f"posted_at.gte.{_quote(posted_after.isoformat())}")
+    if posted_before:
+        conditions.append(f"posted_at.lt.{_quote(posted_before.isoformat())}")
+    if work_mode:
+        conditions.append(f"work_mode.eq.{work_mode}")
+    if salary_period:
+        conditions.append(f"salary_period.eq.{salary_period}")
+    if min_salary is not None:
+        conditions.append(f"salary_max.gte.{min_salary}")
+    if max_salary is not None:
+        conditions.append(f"salary_min.lte.{max_salary}")
+    return conditions
+
+
+async def iter_pages(
+    dataset: str,
+    fields: list[str],
+    filters: list[tuple[str, str]],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    limit: Optional[int] = None
+) -> AsyncIterator[tuple[list[dict], str]]:
+    """
+    Read an export one keyset page at a time, up to rows EXPORT_SETTLE_SECONDS old.
+
+    Args:
+        dataset: "jobs" or "discussions"
+        fields: Columns to return
+        filters: PostgREST filters from build_filters
+        page_size: Rows per upstream request
+        limit: Stop after this many rows (None for all)
+
+    Yields:
+        (rows, cursor) where cursor points just after the page's last row
+    """
+    select = list(dict.fromkeys([*fields, "ingested_at", "id"]))
+    url = f"{SUPABASE_REST_URL}/{EXPORT_TABLES[dataset]}"
+    # Fixed for the whole read so pages line up
+    settled = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_SETTLE_SECONDS)
+    base_filters = [f for f in filters if f[0] != "or"] + [("ingested_at", f"lt.{settled.isoformat()}")]
+    cursor_filter = next((f for f in filters if f[0] == "or"), None)
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        params = [
+            ("select", ",".join(select)),
+            ("order", "ingested_at.asc,id.asc"),
+            ("limit", str(size)),
+            *base_filters,
+        ]
+        if cursor_filter:
+            params.append(cursor_filter)
+
+        resp = await _http.get(url, params=params, headers=HEADERS, timeout=60)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Export read failed: {resp.status_code} - {resp.text[:200]}")
+
+        rows = jsonio.loads(resp.content)
+        if not rows:
+            return
+
+        cursor = encode_cursor(rows[-1])
+        if set(select) != set(fields):
+            rows = [{f: row.get(f) for f in fields} for row in rows]
+        yield rows, cursor
+
+        if len(rows) < size:
+            return
+        if remaining is not None:
+            remaining -= len(rows)
+        cursor_filter = ("or", build_filters(since=cursor)[0][1])
+
+
+async def stream_ndjson(pages: AsyncIterator[tuple[list[dict], str]], cursor: Optional[str]) -> AsyncIterator[bytes]:
+    """
+    Encode pages as NDJSON, one chunk per page.
+
+    The last line is always `{"next_cursor": ...}` so consumers can resume
+    from there (it echoes the request cursor if nothing new was found).
+    """
+    async for rows, page_cursor in pages:
+        cursor = page_cursor
+        yield b"".join(jsonio.dumps(row) + b"\n" for row in rows)
+    yield jsonio.dumps({"next_cursor": cursor}) + b"\n"
+
+
+def arrow_schema(dataset: str, fields: list[str]):
+    """Arrow schema for a projection of an export dataset."""
+    types = {
+        "string": pa.string(),
+        "json": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(f, types[EXPORT_COLUMNS[dataset][f]]) for f in fields])
+
+
+def _utc_timestamp(value) -> Optional[datetime]:
+    """
+    Parse a stored timestamp for Parquet, reading values without an offset as UTC.
+    Unparseable values become null rather than failing the whole export.
+    """
+    if value is None:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc)
+        parsed = datetime.fromisoformat(str(value))
+    except (ValueError, OverflowError, OSError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def arrow_table(dataset: str, fields: list[str], schema, rows: list[dict]):
+    """Convert a page of PostgREST rows into an Arrow table."""
+    arrays = []
+    for field in fields:
+        kind = EXPORT_COLUMNS[dataset][field]
+        values = [row.get(field) for row in rows]
+        if kind == "json":
+            values = [None if v is None else jsonio.dumps(v).decode() for v in values]
+        if kind == "timestamp":
+            values = [_utc_timestamp(v) for v in values]
+        arrays.append(pa.array(values, schema.field(field).type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+async def stream_parquet(
+    dataset: str,
+    fields: list[str],
+    pages: AsyncIterator[tuple[list[dict], str]],
+    cursor: Optional[str]
+) -> AsyncIterator[bytes]:
+    """
+    Encode pages as a Parquet file, one row group per page.
+
+    The next cursor is stored in the file's key-value metadata under
+    `next_cursor`.
+    """
+    schema = arrow_schema(dataset, fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for rows, page_cursor in pages:
+            cursor = page_cursor
+            writer.write_table(arrow_table(dataset, fields, schema, rows))
+            yield sink.drain()
+        writer.add_key_value_metadata({"next_cursor": cursor or ""})
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    return pq is not None
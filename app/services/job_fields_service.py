@@ -0,0 +1,198 @@
+"""
+Job Fields Service - Parses free-text job fields into typed columns at ingest.
+
+Google Jobs reports salary, posting age and remote work as display text
+("$120K–$150K a year", "3 days ago", work_from_home: true). Each batch of
+jobs is parsed once into:
+
+- salary_min / salary_max (numbers) and salary_period (hour|day|week|month|year)
+- posted_at, an absolute timestamp anchored to the job's fetched_at
+- work_mode (remote|hybrid|onsite)
+
+so salary and time-window filters run as indexed range queries in the
+database instead of re-parsing strings. Patterns are compiled once and the
+same display strings repeat across postings, so parses are memoized.
+Migration 005 applies the same rules to rows stored before this stage.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+SALARY_PERIODS = {
+    "hour": "hour", "hr": "hour", "hourly": "hour",
+    "day": "day", "daily": "day",
+    "week": "week", "wk": "week", "weekly": "week",
+    "month": "month", "mo": "month", "monthly": "month",
+    "year": "year", "yr": "year", "annum": "year", "annually": "year", "yearly": "year",
+}
+
+WORK_MODES = ("remote", "hybrid", "onsite")
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_MULTIPLIER = r"[km](?![a-z])"
+_RANGE_SEP = r"\s*(?:-|–|—|to)\s*[^\d\s]*\s*"
+_PERIOD_UNITS = r"hourly|hour|hr|daily|day|weekly|week|wk|monthly|month|mo|yearly|year|yr|annum"
+_PERIOD_ADVERBS = r"hourly|daily|weekly|monthly|yearly|annually"
+_PERIOD = rf"(?:(?:an?|per)\s+|/\s*)(?:{_PERIOD_UNITS})\b|(?:{_PERIOD_ADVERBS})\b"
+_RANGE = rf"{_NUMBER}\s*(?:{_MULTIPLIER})?(?:{_RANGE_SEP}{_NUMBER}\s*(?:{_MULTIPLIER})?)?"
+
+# An amount (or range) only counts as a salary when it is anchored: a currency
+# before it, a k/m multiplier on it, or a pay period right after it. Bare
+# numbers ("3 weeks PTO") and 401(k) plans are skipped. Migration 005 uses the
+# same pattern.
+_SALARY_RE = re.compile(
+    r"(?<![\d.,])(?!401\s*\(?k\b)"
+    + r"(?:(?<=[$€£₹¥])|(?<=[$€£₹¥]\s)|(?<=\b(?:usd|eur|gbp|cad|aud|inr))|(?<=\b(?:usd|eur|gbp|cad|aud|inr)\s)"
+    + rf"|(?={_NUMBER}\s*{_MULTIPLIER}|{_NUMBER}{_RANGE_SEP}{_NUMBER}\s*{_MULTIPLIER})"
+    + rf"|(?={_RANGE}\s*(?:{_PERIOD})))"
+    + rf"({_NUMBER})\s*({_MULTIPLIER})?(?:{_RANGE_SEP}({_NUMBER})\s*({_MULTIPLIER})?)?",
+    re.IGNORECASE
+)
+_SALARY_PERIOD_RE = re.compile(
+    rf"\b(?:an?|per)\s+({_PERIOD_UNITS})\b|/\s*({_PERIOD_UNITS})\b|\b({_PERIOD_ADVERBS})\b",
+    re.IGNORECASE
+)
+
+_POSTED_RE = re.compile(
+    r"(\d+|an?|one)\+?\s*(minute|min|hour|hr|day|week|month|year)s?\s+ago",
+    re.IGNORECASE
+)
+_POSTED_NOW_RE = re.compile(r"\b(just posted|just now|today|now)\b", re.IGNORECASE)
+_POSTED_YESTERDAY_RE = re.compile(r"\byesterday\b", re.IGNORECASE)
+
+POSTED_UNIT_SECONDS = {
+    "minute": 60, "min": 60,
+    "hour": 3600, "hr": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+}
+
+_HYBRID_RE = re.compile(r"\bhybrid\b", re.IGNORECASE)
+_REMOTE_RE = re.compile(r"\b(remote|anywhere|work from home|wfh)\b", re.IGNORECASE)
+
+# Distinct display strings kept memoized
+PARSE_CACHE_SIZE = 4096
+
+
+def _amount(number: str, multiplier: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    if multiplier:
+        value *= 1_000 if multiplier.lower() == "k" else 1_000_000
+    return value
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_salary(text: str) -> tuple[Optional[float], Optional[float], Optional[str]]:
+    """
+    Parse a salary display string.
+
+    Examples:
+        "$120K–$150K a year"           -> (120000.0, 150000.0, "year")
+        "$50 an hour"                  -> (50.0, 50.0, "hour")
+        "Full-time, 3 weeks PTO, $90K" -> (90000.0, 90000.0, None)
+        "401k match"                   -> (None, None, None)
+
+    Returns:
+        (salary_min, salary_max, salary_period); all None if no anchored amount
+        is found. The period is None when the text doesn't state one.
+    """
+    if not text:
+        return None, None, None
+
+    match = _SALARY_RE.search(text)
+    if not match:
+        return None, None, None
+
+    low, low_mult, high, high_mult = match.groups()
+    # "$120–150K": the multiplier on the upper bound applies to both
+    if high and not low_mult:
+        low_mult = high_mult
+    salary_min = _amount(low, low_mult)
+    salary_max = _amount(high, high_mult) if high else salary_min
+    if salary_max < salary_min:
+        salary_min, salary_max = salary_max, salary_min
+
+    period = _SALARY_PERIOD_RE.search(text, match.end())
+    unit = next((g for g in period.groups() if g), "").lower() if period else ""
+    return salary_min, salary_max, SALARY_PERIODS.get(unit)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_posted_age(text: str) -> Optional[timedelta]:
+    """
+    Parse a relative posting age ("3 days ago", "an hour ago", "30+ days ago").
+
+    Returns:
+        Age at fetch time, or None if the text isn't a recognized age
+    """
+    if not text:
+        return None
+
+    match = _POSTED_RE.search(text)
+    if match:
+        count, unit = match.groups()
+        count = 1 if count.lower() in ("a", "an", "one") else int(count)
+        return timedelta(seconds=count * POSTED_UNIT_SECONDS[unit.lower()])
+    if _POSTED_NOW_RE.search(text):
+        return timedelta(0)
+    if _POSTED_YESTERDAY_RE.search(text):
+        return timedelta(days=1)
+    return None
+
+
+def parse_work_mode(work_type, location: str = "", title: str = "") -> str:
+    """
+    Normalize remote-work signals into remote, hybrid or onsite.
+
+    Args:
+        work_type: SerpAPI work_from_home flag (or its stored text, "True"/"onsite")
+        location: Job location ("Anywhere" means remote)
+        title: Job title (may say "Hybrid" or "Remote")
+    """
+    hint = f"{title or ''} {location or ''}"
+    if _HYBRID_RE.search(hint):
+        return "hybrid"
+    if work_type is True or str(work_type).lower() == "true" or _REMOTE_RE.search(hint):
+        return "remote"
+    return "onsite"
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def extract_job_fields(jobs: list[dict]) -> list[dict]:
+    """
+    Add salary_min, salary_max, salary_period, posted_at and work_mode to each job.
+
+    Args:
+        jobs: Normalized jobs with salary_text, posted_date, work_type,
+            location, title and fetched_at (defaults to now)
+
+    Returns:
+        The same jobs, updated in place
+    """
+    now = datetime.now(timezone.utc)
+    anchors = {}
+
+    for job in jobs:
+        job["salary_min"], job["salary_max"], job["salary_period"] = parse_salary(job.get("salary_text") or "")
+
+        age = parse_posted_age(job.get("posted_date") or "")
+        if age is None:
+            job["posted_at"] = None
+        else:
+            fetched_at = job.get("fetched_at")
+            if fetched_at not in anchors:
+                anchors[fetched_at] = _parse_timestamp(fetched_at) if fetched_at else now
+            job["posted_at"] = (anchors[fetched_at] - age).isoformat()
+
+        job["work_mode"] = parse_work_mode(job.get("work_type"), job.get("location"), job.get("title"))
+
+    return jobs
@@ -5,9 +5,14 @@ Only manages rate-limited API keys:
 - SERP_API_KEY (for Google Jobs fetching)
 - APIFY_API_TOKEN (for Reddit scraping)
 """
-import requests
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
 
 SUPABASE_URL = settings.SUPABASE_URL
 SUPABASE_KEY = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY
@@ -18,7 +23,7 @@ _cache_timestamp: datetime = None
 CACHE_DURATION = timedelta(minutes=5)
 
 
-def _fetch_all_keys() -> dict:
+async def _fetch_all_keys() -> dict:
     """Fetch all API keys from Supabase."""
     global _key_cache, _cache_timestamp
     
@@ -38,10 +43,10 @@ def _fetch_all_keys() -> dict:
             "is_active": "eq.true"
         }
         
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = await _http.get(url, headers=headers, params=params, timeout=10)
         
         if response.status_code == 200:
-            keys = response.json()
+            keys = jsonio.loads(response.content)
             _key_cache = {}
             for key in keys:
                 key_identifier = f"{key['service_name']}_{key['key_name']}"
@@ -49,26 +54,26 @@ def _fetch_all_keys() -> dict:
             _cache_timestamp = datetime.now()
             return _key_cache
     except Exception as e:
-        print(f"Error fetching API keys from database: {e}")
+        logger.error(f"Error fetching API keys from database: {e}")
     
     return _key_cache
 
 
-def get_api_key(service_name: str, key_name: str, fallback: str = None) -> str:
+async def get_api_key(service_name: str, key_name: str, fallback: str = None) -> str:
     """Get a specific API key from the database."""
-    keys = _fetch_all_keys()
+    keys = await _fetch_all_keys()
     key_identifier = f"{service_name}_{key_name}"
     return keys.get(key_identifier) or fallback or ""
 
 
-def get_serp_key(fallback: str = None) -> str:
+async def get_serp_key(fallback: str = None) -> str:
     """Get SERP API key (rate-limited, managed via Admin Portal)."""
-    return get_api_key("serp", "SERP_API_KEY", fallback)
+    return await get_api_key("serp", "SERP_API_KEY", fallback)
 
 
-def get_apify_key(fallback: str = None) -> str:
+async def get_apify_key(fallback: str = None) -> str:
     """Get Apify API token (rate-limited, managed via Admin Portal)."""
-    return get_api_key("apify", "APIFY_API_TOKEN", fallback)
+    return await get_api_key("apify", "APIFY_API_TOKEN", fallback)
 
 
 def clear_cache():
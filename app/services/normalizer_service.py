@@ -1,8 +1,13 @@
 """
 Normalizer Service - Handles data normalization and skill extraction.
 """
+import hashlib
 import re
 from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+from app.core.metrics import SKILL_EXTRACTION_SECONDS
 
 
 # Common tech skills to extract (can be expanded)
@@ -87,15 +92,16 @@ def extract_skills_from_text(text: str) -> list[dict]:
     if not text:
         return []
     
-    text_lower = text.lower()
-    found_skills = Counter()
-    
-    for skill in KNOWN_SKILLS:
-        # Use word boundary matching
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        matches = re.findall(pattern, text_lower)
-        if matches:
-            found_skills[skill] += len(matches)
+    with SKILL_EXTRACTION_SECONDS.time():
+        text_lower = text.lower()
+        found_skills = Counter()
+        
+        for skill in KNOWN_SKILLS:
+            # Use word boundary matching
+            pattern = r'\b' + re.escape(skill) + r'\b'
+            matches = re.findall(pattern, text_lower)
+            if matches:
+                found_skills[skill] += len(matches)
     
     results = []
     for skill, count in found_skills.items():
@@ -108,8 +114,16 @@ def extract_skills_from_text(text: str) -> list[dict]:
     return results
 
 
+# Distinct titles kept memoized; postings repeat the same few hundred titles
+JOB_TITLE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=JOB_TITLE_CACHE_SIZE)
 def normalize_job_title(title: str) -> str:
-    """Normalize job title for grouping."""
+    """
+    Normalize job title for grouping.
+    The result is stored as the job's role_key (migration 004 mirrors it in SQL).
+    """
     # Remove common prefixes/suffixes
     title = title.lower().strip()
     
@@ -119,4 +133,60 @@ def normalize_job_title(title: str) -> str:
     # Remove common suffixes
     title = re.sub(r'\b(engineer|developer|programmer)\b', 'developer', title)
     
+    # Collapse gaps left by removed words
+    title = re.sub(r'\s+', ' ', title)
+    
     return title.strip()
+
+
+# Base-36 id of a Reddit post, bare, as a t3_ fullname, or inside a permalink
+REDDIT_POST_ID_PATTERN = re.compile(r"^(?:t3_)?([a-z0-9]{1,13})$")
+REDDIT_PERMALINK_PATTERN = re.compile(r"/comments/([a-z0-9]{1,13})(?:/|$)")
+
+
+def reddit_post_id(post_id: str = None, url: str = None) -> Optional[str]:
+    """
+    Bare Reddit post id ("abc123") from a post id or fullname ("t3_abc123"),
+    falling back to the id in a /comments/<id>/ permalink. None if neither has one.
+    """
+    match = REDDIT_POST_ID_PATTERN.match(str(post_id or "").strip().lower())
+    if not match:
+        match = REDDIT_PERMALINK_PATTERN.search(str(url or "").lower())
+    return match.group(1) if match else None
+
+
+def _created_key(created) -> str:
+    """Creation time as unix seconds, whether given as a number or an ISO string."""
+    if isinstance(created, (int, float)):
+        return str(int(created))
+    value = str(created or "").strip()
+    try:
+        return str(int(float(value)))
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value.lower()
+    return str(int((parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()))
+
+
+def canonical_post_hash(post_id: Optional[str], title: str, subreddit: str, created) -> str:
+    """
+    Identity of a Reddit post, the same whichever collector fetched it.
+
+    Args:
+        post_id: Bare post id from reddit_post_id (None if unknown)
+        title, subreddit, created: Fallback when there is no id; created may be
+            unix seconds or an ISO timestamp
+
+    Returns:
+        "t3_<id>" when the id is known, else an md5 of title, subreddit
+        (without "r/") and creation time. Migration 011 applies the same rule
+        to stored rows.
+    """
+    if post_id:
+        return f"t3_{post_id}"
+    subreddit = (subreddit or "").strip().lower().removeprefix("r/")
+    key = f"{(title or '').strip().lower()}|{subreddit}|{_created_key(created)}"
+    return hashlib.md5(key.encode()).hexdigest()
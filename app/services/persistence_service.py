@@ -2,12 +2,23 @@
 Persistence Service - Handles database storage and deduplication.
 Uses direct REST API calls to bypass client library issues.
 """
-import requests
 from app.core.config import settings
+from app.core import jsonio
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.metrics import RECORDS_PROCESSED
+from app.services.dedup_service import find_near_duplicate, register_job_signature
+from app.services.normalizer_service import normalize_job_title, extract_skills_from_text
+from app.services import skill_index
+from collections import Counter
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timezone
 import traceback
 import json
 
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
 SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
 HEADERS = {
     "apikey": settings.SUPABASE_KEY,
@@ -15,17 +26,32 @@ HEADERS = {
     "Content-Type": "application/json",
     "Prefer": "return=representation"
 }
+# Extracted skill rows are written with the service role, as RLS blocks the anon key
+SERVICE_HEADERS = {
+    **HEADERS,
+    "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}"
+}
+
 
+# Typed columns filled by job_fields_service.extract_job_fields
+JOB_PARSED_FIELDS = ["salary_min", "salary_max", "salary_period", "posted_at", "work_mode"]
 
-def store_jobs(jobs: list[dict]) -> dict:
+
+async def store_jobs(jobs: list[dict]) -> dict:
     """
     Store fetched jobs in database with deduplication.
     Uses direct REST API calls.
     """
     inserted = 0
     skipped = 0
+    near_duplicates = 0
     errors = 0
     error_messages = []
+    role_jobs = Counter()
+    role_canonical_jobs = Counter()
+    new_by_query = Counter()
+    skill_records = []
     
     for job in jobs:
         try:
@@ -43,20 +69,29 @@ def store_jobs(jobs: list[dict]) -> dict:
                 "source": job.get("source", "serp_google_jobs"),
                 "source_job_id": job.get("source_job_id", ""),
                 "work_type": str(job.get("work_type", "")),
-                "experience_level": job.get("experience_level", "")
+                "experience_level": job.get("experience_level", ""),
+                "search_query": job.get("search_query", ""),
+                **{field: job.get(field) for field in JOB_PARSED_FIELDS}
             }
+            job_data["role_key"] = normalize_job_title(job_data["title"] or "") or None
             
             # Check if job already exists
             check_url = f"{SUPABASE_REST_URL}/fetched_jobs?job_hash=eq.{job_data['job_hash']}&select=id"
-            check_resp = requests.get(check_url, headers=HEADERS, timeout=10)
+            check_resp = await _http.get(check_url, headers=HEADERS, timeout=10)
             
-            if check_resp.status_code == 200 and check_resp.json():
+            if check_resp.status_code == 200 and jsonio.loads(check_resp.content):
                 skipped += 1
+                RECORDS_PROCESSED.inc(source=job_data["source"], outcome="skipped")
                 continue
             
+            # Link syndicated copies of an existing posting to the canonical job
+            canonical_id, signature = await find_near_duplicate(job_data["description"])
+            if canonical_id:
+                job_data["canonical_job_id"] = canonical_id
+            
             # Insert new job
             insert_url = f"{SUPABASE_REST_URL}/fetched_jobs"
-            insert_resp = requests.post(
+            insert_resp = await _http.post(
                 insert_url,
                 headers=HEADERS,
                 json=job_data,
@@ -65,28 +100,106 @@ def store_jobs(jobs: list[dict]) -> dict:
             
             if insert_resp.status_code in [200, 201]:
                 inserted += 1
-                print(f"Inserted job: {job_data.get('title', 'Unknown')[:50]}")
+                if job_data["role_key"]:
+                    role_jobs[job_data["role_key"]] += 1
+                    if not canonical_id:
+                        role_canonical_jobs[job_data["role_key"]] += 1
+                job_id = jsonio.loads(insert_resp.content)[0]["id"]
+                if canonical_id:
+                    near_duplicates += 1
+                    RECORDS_PROCESSED.inc(source=job_data["source"], outcome="near_duplicate")
+                else:
+                    skill_records.append((job_id, job_data["description"]))
+                    new_by_query[job_data["search_query"]] += 1
+                    if signature is not None:
+                        await register_job_signature(job_id, job_data["job_hash"], signature)
+                RECORDS_PROCESSED.inc(source=job_data["source"], outcome="inserted")
+                logger.debug("Inserted job", extra={"title": job_data["title"][:50]})
             else:
                 errors += 1
                 error_messages.append(f"HTTP {insert_resp.status_code}: {insert_resp.text[:100]}")
-                print(f"Insert error: {insert_resp.status_code} - {insert_resp.text[:200]}")
+                RECORDS_PROCESSED.inc(source=job_data["source"], outcome="error")
+                logger.error(f"Insert error: {insert_resp.status_code} - {insert_resp.text[:200]}")
             
         except Exception as e:
             error_msg = str(e)[:100]
-            print(f"Error storing job: {error_msg}")
+            logger.error(f"Error storing job: {error_msg}")
+            RECORDS_PROCESSED.inc(source=job.get("source", "serp_google_jobs"), outcome="error")
             errors += 1
             error_messages.append(error_msg)
     
+    await increment_role_counts(role_jobs, role_canonical_jobs)
+    if settings.SKILL_AGGREGATION_MODE == "database":
+        await store_record_skills("jobs", skill_records)
+    if skill_records and skill_index.enabled():
+        try:
+            # Reads the settled rows after the index cursor; the jobs just stored follow on a later sync
+            await skill_index.sync()
+        except Exception as e:
+            logger.error(f"Error updating skill index: {e}")
+    
     return {
         "inserted": inserted,
         "skipped": skipped,
+        "near_duplicates": near_duplicates,
         "errors": errors,
         "total": len(jobs),
+        "new_by_query": dict(new_by_query),
         "error_details": error_messages[:5] if error_messages else None
     }
 
 
-def store_discussions(discussions: list[dict]) -> dict:
+async def increment_role_counts(jobs: Counter, canonical_jobs: Counter):
+    """
+    Add newly stored jobs to the per-role counts in one RPC call.
+    Failures are logged; refresh_job_role_counts() in SQL recounts from fetched_jobs.
+    """
+    if not jobs:
+        return
+    
+    payload = [
+        {"role_key": role, "job_count": count, "canonical_job_count": canonical_jobs.get(role, 0)}
+        for role, count in jobs.items()
+    ]
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/rpc/increment_job_role_counts",
+            headers=HEADERS,
+            json={"p_counts": payload},
+            timeout=10
+        )
+        if resp.status_code not in [200, 204]:
+            logger.error(f"Role count update error: {resp.status_code} - {resp.text[:200]}")
+    except Exception as e:
+        logger.error(f"Error updating role counts: {e}")
+
+
+async def get_role_counts(title: str = None, search: str = None, limit: int = 50) -> list[dict]:
+    """
+    Get per-role job counts, most common roles first.
+    
+    Args:
+        title: Raw job title; returns only its role (normalized the same way as at ingest)
+        search: Substring of the role key
+        limit: Maximum roles returned
+    """
+    params = [
+        ("select", "role_key,job_count,canonical_job_count,last_seen_at"),
+        ("order", "job_count.desc,role_key.asc"),
+        ("limit", str(limit)),
+    ]
+    if title is not None:
+        params.append(("role_key", f"eq.{normalize_job_title(title)}"))
+    if search:
+        params.append(("role_key", f"ilike.*{search.lower()}*"))
+    
+    resp = await _http.get(f"{SUPABASE_REST_URL}/job_role_counts", params=params, headers=HEADERS, timeout=10)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Role counts read failed: {resp.status_code} - {resp.text[:200]}")
+    return jsonio.loads(resp.content)
+
+
+async def store_discussions(discussions: list[dict]) -> dict:
     """
     Store fetched discussions in database with deduplication.
     """
@@ -94,6 +207,7 @@ def store_discussions(discussions: list[dict]) -> dict:
     skipped = 0
     errors = 0
     error_messages = []
+    skill_records = []
     
     for post in discussions:
         try:
@@ -119,15 +233,16 @@ def store_discussions(discussions: list[dict]) -> dict:
             
             # Check if post already exists
             check_url = f"{SUPABASE_REST_URL}/fetched_discussions?post_hash=eq.{post_data['post_hash']}&select=id"
-            check_resp = requests.get(check_url, headers=HEADERS, timeout=10)
+            check_resp = await _http.get(check_url, headers=HEADERS, timeout=10)
             
-            if check_resp.status_code == 200 and check_resp.json():
+            if check_resp.status_code == 200 and jsonio.loads(check_resp.content):
                 skipped += 1
+                RECORDS_PROCESSED.inc(source=post_data["source"], outcome="skipped")
                 continue
             
             # Insert new post
             insert_url = f"{SUPABASE_REST_URL}/fetched_discussions"
-            insert_resp = requests.post(
+            insert_resp = await _http.post(
                 insert_url,
                 headers=HEADERS,
                 json=post_data,
@@ -136,17 +251,27 @@ def store_discussions(discussions: list[dict]) -> dict:
             
             if insert_resp.status_code in [200, 201]:
                 inserted += 1
-                print(f"Inserted discussion: {post_data.get('title', 'Unknown')[:50]}")
+                skill_records.append((
+                    jsonio.loads(insert_resp.content)[0]["id"],
+                    f"{post_data['title']} {post_data['body']}"
+                ))
+                RECORDS_PROCESSED.inc(source=post_data["source"], outcome="inserted")
+                logger.debug("Inserted discussion", extra={"title": post_data["title"][:50]})
             else:
                 errors += 1
                 error_messages.append(f"HTTP {insert_resp.status_code}: {insert_resp.text[:100]}")
+                RECORDS_PROCESSED.inc(source=post_data["source"], outcome="error")
                 
         except Exception as e:
             error_msg = str(e)[:100]
-            print(f"Error storing discussion: {error_msg}")
+            logger.error(f"Error storing discussion: {error_msg}")
+            RECORDS_PROCESSED.inc(source=post.get("source", "apify_reddit"), outcome="error")
             errors += 1
             error_messages.append(error_msg)
     
+    if settings.SKILL_AGGREGATION_MODE == "database":
+        await store_record_skills("discussions", skill_records)
+    
     return {
         "inserted": inserted,
         "skipped": skipped,
@@ -156,12 +281,12 @@ def store_discussions(discussions: list[dict]) -> dict:
     }
 
 
-def get_job_stats() -> dict:
+async def get_job_stats() -> dict:
     """Get statistics about stored jobs."""
     try:
         url = f"{SUPABASE_REST_URL}/fetched_jobs?select=id"
         headers_with_count = {**HEADERS, "Prefer": "count=exact"}
-        resp = requests.get(url, headers=headers_with_count, timeout=10)
+        resp = await _http.get(url, headers=headers_with_count, timeout=10)
         
         count = int(resp.headers.get("content-range", "0-0/0").split("/")[-1])
         
@@ -173,12 +298,131 @@ def get_job_stats() -> dict:
         return {"error": str(e)}
 
 
-def get_discussion_stats() -> dict:
+async def get_job(job_id: str, select: str = "*") -> dict:
+    """Get a single stored job, or None if it doesn't exist."""
+    url = f"{SUPABASE_REST_URL}/fetched_jobs?id=eq.{job_id}&select={select}"
+    resp = await _http.get(url, headers=HEADERS, timeout=10)
+    rows = jsonio.loads(resp.content) if resp.status_code == 200 else []
+    return rows[0] if rows else None
+
+
+# Per-record skill rows: table and the column referencing the record
+SKILL_ROW_TABLES = {
+    "jobs": ("job_extracted_skills", "job_id"),
+    "discussions": ("discussion_extracted_skills", "discussion_id"),
+}
+
+# Rows per bulk insert of extracted skills
+SKILL_ROW_BATCH_SIZE = 1000
+
+
+async def _insert_skill_rows(dataset: str, rows: list[dict]) -> int:
+    """Bulk insert extracted skill rows, ignoring ones that already exist."""
+    table, key = SKILL_ROW_TABLES[dataset]
+    headers = {**SERVICE_HEADERS, "Prefer": "return=minimal,resolution=ignore-duplicates"}
+    stored = 0
+    
+    for start in range(0, len(rows), SKILL_ROW_BATCH_SIZE):
+        batch = rows[start:start + SKILL_ROW_BATCH_SIZE]
+        try:
+            resp = await _http.post(
+                f"{SUPABASE_REST_URL}/{table}?on_conflict={key},skill_name",
+                headers=headers,
+                json=batch,
+                timeout=30
+            )
+            if resp.status_code not in [200, 201, 204]:
+                logger.error(f"Skill rows insert error ({table}): {resp.status_code} - {resp.text[:200]}")
+                continue
+            stored += len(batch)
+        except Exception as e:
+            logger.error(f"Error storing skill rows ({table}): {e}")
+    
+    return stored
+
+
+async def store_job_skills(job_id: str, skills: list[dict]) -> int:
+    """
+    Store skills extracted from a job in one bulk insert.
+    Rows that already exist are ignored.
+    """
+    if not skills:
+        return 0
+    
+    rows = [
+        {
+            "job_id": job_id,
+            "skill_name": skill["skill_name"],
+            "skill_name_normalized": skill["skill_name_normalized"],
+            "mention_count": skill["mention_count"]
+        }
+        for skill in skills
+    ]
+    return await _insert_skill_rows("jobs", rows)
+
+
+async def store_record_skills(dataset: str, records: list[tuple[str, str]]) -> int:
+    """
+    Extract skills from stored records and insert them as per-record skill rows,
+    which aggregate_skill_mentions() groups in the database.
+    
+    Args:
+        dataset: "jobs" or "discussions"
+        records: (record id, text) pairs
+    
+    Returns:
+        Number of skill rows stored
+    """
+    if not records:
+        return 0
+    
+    _, key = SKILL_ROW_TABLES[dataset]
+    
+    def extract() -> list[dict]:
+        return [
+            {
+                key: record_id,
+                "skill_name": skill["skill_name"],
+                "skill_name_normalized": skill["skill_name_normalized"],
+                "mention_count": skill["mention_count"]
+            }
+            for record_id, text in records
+            for skill in extract_skills_from_text(text)
+        ]
+    
+    # Regex extraction is CPU-bound, keep it off the event loop
+    rows = await run_in_threadpool(extract)
+    return await _insert_skill_rows(dataset, rows)
+
+
+async def get_skill_mention_counts() -> tuple[Counter, Counter]:
+    """
+    Get mention counts per normalized skill, grouped in the database
+    (aggregate_skill_mentions RPC over the per-record skill rows).
+    
+    Returns:
+        (job_skill_counts, discussion_skill_counts)
+    """
+    resp = await _http.post(f"{SUPABASE_REST_URL}/rpc/aggregate_skill_mentions", headers=HEADERS, json={}, timeout=120)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Skill aggregation RPC failed: {resp.status_code} - {resp.text[:200]}")
+    
+    job_counts = Counter()
+    discussion_counts = Counter()
+    for row in jsonio.loads(resp.content):
+        if row["job_mention_count"]:
+            job_counts[row["skill_name_normalized"]] = row["job_mention_count"]
+        if row["discussion_mention_count"]:
+            discussion_counts[row["skill_name_normalized"]] = row["discussion_mention_count"]
+    return job_counts, discussion_counts
+
+
+async def get_discussion_stats() -> dict:
     """Get statistics about stored discussions."""
     try:
         url = f"{SUPABASE_REST_URL}/fetched_discussions?select=id"
         headers_with_count = {**HEADERS, "Prefer": "count=exact"}
-        resp = requests.get(url, headers=headers_with_count, timeout=10)
+        resp = await _http.get(url, headers=headers_with_count, timeout=10)
         
         count = int(resp.headers.get("content-range", "0-0/0").split("/")[-1])
         
@@ -189,7 +433,53 @@ def get_discussion_stats() -> dict:
         return {"error": str(e)}
 
 
-def update_skill_trends(snapshot_date: str, skill_data: list[dict]) -> dict:
+# Momentum fields written alongside the mention counts when present
+TREND_MOMENTUM_FIELDS = ["week_over_week_delta", "rolling_avg", "growth_rate", "trend_slope"]
+
+# PostgREST caps rows per response, so large reads are paged
+PAGE_SIZE = 1000
+
+
+async def get_skill_trend_history(since: str = None) -> list[dict]:
+    """
+    Get skill trend snapshot rows, oldest first.
+    
+    Args:
+        since: Only include snapshots on or after this ISO date
+    """
+    rows = []
+    offset = 0
+    
+    while True:
+        url = (
+            f"{SUPABASE_REST_URL}/skill_trends"
+            "?select=snapshot_date,skill_name_normalized,job_mention_count,discussion_mention_count"
+            "&order=snapshot_date.asc,id.asc"
+            f"&limit={PAGE_SIZE}&offset={offset}"
+        )
+        if since:
+            url += f"&snapshot_date=gte.{since}"
+        
+        try:
+            resp = await _http.get(url, headers=HEADERS, timeout=30)
+        except Exception as e:
+            logger.error(f"Error loading skill trend history: {e}")
+            break
+        
+        if resp.status_code != 200:
+            logger.error(f"Skill trend history error: {resp.status_code} - {resp.text[:200]}")
+            break
+        
+        page = jsonio.loads(resp.content)
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    
+    return rows
+
+
+async def update_skill_trends(snapshot_date: str, skill_data: list[dict]) -> dict:
     """
     Update skill trends for a specific date.
     """
@@ -203,18 +493,19 @@ def update_skill_trends(snapshot_date: str, skill_data: list[dict]) -> dict:
         try:
             # Check if exists
             check_url = f"{SUPABASE_REST_URL}/skill_trends?snapshot_date=eq.{snapshot_date}&skill_name_normalized=eq.{skill_normalized}&select=id"
-            check_resp = requests.get(check_url, headers=HEADERS, timeout=10)
+            check_resp = await _http.get(check_url, headers=HEADERS, timeout=10)
             
-            if check_resp.status_code == 200 and check_resp.json():
+            if check_resp.status_code == 200 and jsonio.loads(check_resp.content):
                 # Update
-                record_id = check_resp.json()[0]["id"]
+                record_id = jsonio.loads(check_resp.content)[0]["id"]
                 update_url = f"{SUPABASE_REST_URL}/skill_trends?id=eq.{record_id}"
                 update_data = {
                     "job_mention_count": skill.get("job_count", 0),
                     "discussion_mention_count": skill.get("discussion_count", 0),
-                    "trend_direction": skill.get("trend_direction", "stable")
+                    "trend_direction": skill.get("trend_direction", "stable"),
+                    **{k: skill[k] for k in TREND_MOMENTUM_FIELDS if k in skill}
                 }
-                requests.patch(update_url, headers=HEADERS, json=update_data, timeout=10)
+                await _http.patch(update_url, headers=HEADERS, json=update_data, timeout=10)
                 updated += 1
             else:
                 # Insert
@@ -225,13 +516,14 @@ def update_skill_trends(snapshot_date: str, skill_data: list[dict]) -> dict:
                     "skill_name_normalized": skill_normalized,
                     "job_mention_count": skill.get("job_count", 0),
                     "discussion_mention_count": skill.get("discussion_count", 0),
-                    "trend_direction": skill.get("trend_direction", "stable")
+                    "trend_direction": skill.get("trend_direction", "stable"),
+                    **{k: skill[k] for k in TREND_MOMENTUM_FIELDS if k in skill}
                 }
-                requests.post(insert_url, headers=HEADERS, json=insert_data, timeout=10)
+                await _http.post(insert_url, headers=HEADERS, json=insert_data, timeout=10)
                 inserted += 1
                 
         except Exception as e:
-            print(f"Error updating skill trend: {e}")
+            logger.error(f"Error updating skill trend: {e}")
             errors += 1
     
     return {
@@ -239,3 +531,70 @@ def update_skill_trends(snapshot_date: str, skill_data: list[dict]) -> dict:
         "updated": updated,
         "errors": errors
     }
+
+
+async def store_leaderboards(snapshot_date: str, boards: dict[str, list[dict]]) -> dict:
+    """
+    Store the ranked leaderboards of a snapshot, replacing any from an earlier run that day.
+
+    Args:
+        snapshot_date: ISO date of the trend snapshot
+        boards: Board name -> ranked entries (trend_service.compute_leaderboards)
+    """
+    rows = [
+        {"snapshot_date": snapshot_date, "board": board, "entries": entries}
+        for board, entries in boards.items()
+    ]
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/trend_leaderboards?on_conflict=snapshot_date,board",
+            headers={**HEADERS, "Prefer": "return=minimal,resolution=merge-duplicates"},
+            json=rows,
+            timeout=10
+        )
+        if resp.status_code in [200, 201, 204]:
+            return {"stored": len(rows), "errors": 0}
+        logger.error(f"Leaderboard store error: {resp.status_code} - {resp.text[:200]}")
+    except Exception as e:
+        logger.error(f"Error storing leaderboards: {e}")
+    return {"stored": 0, "errors": len(rows)}
+
+
+# Rows per bulk insert of Reddit comments
+COMMENT_BATCH_SIZE = 500
+
+
+async def store_comments(comments: list[dict]) -> dict:
+    """
+    Bulk insert Reddit comments, ignoring ones already stored (same comment_id).
+    
+    Args:
+        comments: Records from reddit_collector.fetch_post_comments
+    
+    Returns:
+        {"stored": rows sent in successful inserts (duplicates included), "errors": rows in failed ones}
+    """
+    headers = {**HEADERS, "Prefer": "return=minimal,resolution=ignore-duplicates"}
+    stored = 0
+    errors = 0
+    
+    for start in range(0, len(comments), COMMENT_BATCH_SIZE):
+        batch = comments[start:start + COMMENT_BATCH_SIZE]
+        try:
+            resp = await _http.post(
+                f"{SUPABASE_REST_URL}/fetched_comments?on_conflict=comment_id",
+                headers=headers,
+                json=batch,
+                timeout=30
+            )
+            if resp.status_code in [200, 201, 204]:
+                stored += len(batch)
+                RECORDS_PROCESSED.inc(len(batch), source="reddit_comments", outcome="inserted")
+                continue
+            logger.error(f"Comment insert error: {resp.status_code} - {resp.text[:200]}")
+        except Exception as e:
+            logger.error(f"Error storing comments: {e}")
+        errors += len(batch)
+        RECORDS_PROCESSED.inc(len(batch), source="reddit_comments", outcome="error")
+    
+    return {"stored": stored, "errors": errors}
@@ -0,0 +1,205 @@
+"""
+Query Scheduler Service - Spends each run's search budget on the queries
+that keep finding new records.
+
+Collection queries live in the `collection_queries` table (one row per kind
+and query, toggled with is_active) instead of hardcoded lists. After every
+job collection run each query's yield, new canonical jobs inserted per
+search, is folded into an exponentially weighted estimate. The next run
+then spends SERP_QUERY_BUDGET searches as follows:
+
+- queries that have never run are searched first, so they get an estimate
+- about QUERY_EXPLORATION_RATE of what is left goes to randomly chosen
+  lower-ranked queries, so a query whose yield recovers is noticed
+- the rest goes to the highest-yield queries
+
+Jobs seen by several queries in one run are credited to the first query
+that returned them.
+"""
+import math
+import random
+from collections import Counter
+from typing import Optional
+
+from app.core import jsonio
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+QUERY_STAT_COLUMNS = "query,runs,searches,results_fetched,new_records,yield_estimate,last_run_at"
+
+
+def _default_rows(queries: list[str]) -> list[dict]:
+    return [
+        {"query": query, "runs": 0, "searches": 0, "results_fetched": 0, "new_records": 0,
+         "yield_estimate": None, "last_run_at": None}
+        for query in queries
+    ]
+
+
+async def load_queries(kind: str, defaults: list[str]) -> list[dict]:
+    """
+    Get the active collection queries of a kind with their yield stats.
+
+    Args:
+        kind: "jobs" or "discussions"
+        defaults: Queries used when the kind has no rows or the table can't be
+            read. Nothing is written here: migration 008 seeds the table, and
+            record_run adds the queries that were searched.
+
+    Returns:
+        Rows with query, runs, searches, results_fetched, new_records,
+        yield_estimate and last_run_at
+    """
+    params = [
+        ("select", f"{QUERY_STAT_COLUMNS},is_active"),
+        ("kind", f"eq.{kind}"),
+        ("order", "query.asc"),
+    ]
+    url = f"{SUPABASE_REST_URL}/collection_queries"
+    try:
+        resp = await _http.get(url, params=params, headers=HEADERS, timeout=10)
+        if resp.status_code == 200:
+            rows = jsonio.loads(resp.content)
+            if rows:
+                return [row for row in rows if row.pop("is_active")]
+            logger.info(f"No {kind} queries configured, using {len(defaults)} defaults")
+        else:
+            logger.error(f"Collection queries read error: {resp.status_code} - {resp.text[:200]}")
+    except Exception as e:
+        logger.error(f"Error loading collection queries: {e}")
+
+    return _default_rows(defaults)
+
+
+def plan_queries(
+    rows: list[dict],
+    budget: int = None,
+    exploration_rate: float = None,
+    rng: Optional[random.Random] = None
+) -> list[dict]:
+    """
+    Choose which queries to search this run.
+
+    Args:
+        rows: Queries with yield stats from load_queries
+        budget: Searches to spend (default SERP_QUERY_BUDGET)
+        exploration_rate: Share of the budget after new queries spent on
+            random lower-ranked queries (default QUERY_EXPLORATION_RATE)
+        rng: Random source for exploration
+
+    Returns:
+        [{query, selected_by, yield_estimate}], selected_by being "new",
+        "exploit" or "explore"
+    """
+    budget = settings.SERP_QUERY_BUDGET if budget is None else budget
+    exploration_rate = settings.QUERY_EXPLORATION_RATE if exploration_rate is None else exploration_rate
+    rng = rng or random.Random()
+
+    def pick(row: dict, selected_by: str) -> dict:
+        return {"query": row["query"], "selected_by": selected_by, "yield_estimate": row.get("yield_estimate")}
+
+    unexplored = [row for row in rows if not row.get("runs")]
+    plan = [pick(row, "new") for row in unexplored[:budget]]
+    remaining = budget - len(plan)
+
+    # Highest estimate first; among equals, the one searched longest ago
+    ranked = sorted(
+        (row for row in rows if row.get("runs")),
+        key=lambda row: (-(row.get("yield_estimate") or 0.0), row.get("last_run_at") or "")
+    )
+    if remaining <= 0 or not ranked:
+        return plan
+
+    explore = min(math.ceil(remaining * exploration_rate), max(len(ranked) - 1, 0)) if exploration_rate > 0 else 0
+    exploit = min(remaining - explore, len(ranked))
+    plan.extend(pick(row, "exploit") for row in ranked[:exploit])
+
+    rest = ranked[exploit:]
+    plan.extend(pick(row, "explore") for row in rng.sample(rest, min(explore, len(rest))))
+    return plan
+
+
+async def record_run(kind: str, plan: list[dict], results_by_query: dict[str, int], new_by_query: Counter) -> bool:
+    """
+    Fold one run's per-query yield into the stored estimates (record_query_yield RPC).
+
+    Args:
+        kind: "jobs" or "discussions"
+        plan: Queries from plan_queries
+        results_by_query: Results returned per query actually searched
+        new_by_query: New canonical records inserted per query
+
+    Returns:
+        True if the stats were recorded
+    """
+    results = [
+        {
+            "query": item["query"],
+            "searches": 1,
+            "results_fetched": results_by_query[item["query"]],
+            "new_records": new_by_query.get(item["query"], 0),
+            "selected_by": item["selected_by"]
+        }
+        for item in plan if item["query"] in results_by_query
+    ]
+    if not results:
+        return False
+
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/rpc/record_query_yield",
+            headers=HEADERS,
+            json={"p_kind": kind, "p_results": results, "p_alpha": settings.QUERY_YIELD_ALPHA},
+            timeout=10
+        )
+        if resp.status_code in [200, 204]:
+            return True
+        logger.error(f"Query yield record error: {resp.status_code} - {resp.text[:200]}")
+    except Exception as e:
+        logger.error(f"Error recording query yield: {e}")
+    return False
+
+
+async def get_yield_report(kind: str = "jobs") -> dict:
+    """
+    Get per-query yield, best first.
+
+    Returns:
+        {kind, queries, totals}; each query has its lifetime yield
+        (new_records / searches) and the weighted yield_estimate the scheduler ranks by
+    """
+    params = [
+        ("select", f"{QUERY_STAT_COLUMNS},is_active"),
+        ("kind", f"eq.{kind}"),
+        ("order", "yield_estimate.desc.nullslast,query.asc"),
+    ]
+    resp = await _http.get(f"{SUPABASE_REST_URL}/collection_queries", params=params, headers=HEADERS, timeout=10)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Query yield read failed: {resp.status_code} - {resp.text[:200]}")
+
+    rows = jsonio.loads(resp.content)
+    for row in rows:
+        row["lifetime_yield"] = round(row["new_records"] / row["searches"], 4) if row["searches"] else None
+
+    searches = sum(row["searches"] for row in rows)
+    new_records = sum(row["new_records"] for row in rows)
+    return {
+        "kind": kind,
+        "queries": rows,
+        "totals": {
+            "searches": searches,
+            "new_records": new_records,
+            "yield": round(new_records / searches, 4) if searches else None
+        }
+    }
@@ -0,0 +1,345 @@
+"""
+Skill Index - Inverted index from normalized skill to the jobs mentioning it.
+
+When SKILL_INDEX_DIR is set, canonical jobs are pulled with the export keyset
+cursor and each sync appends one immutable segment of postings lists:
+
+    <dir>/seg-000001/doc_ids.npy   job ids of the segment, in insert order
+    <dir>/seg-000001/skills.json   skill names, one per postings list
+    <dir>/seg-000001/offsets.npy   list i is postings[offsets[i]:offsets[i + 1]]
+    <dir>/seg-000001/postings.npy  positions into doc_ids, ascending per list
+    <dir>/_state.json              cursor and live segments
+
+A segment is the transposed (CSC) skill matrix of its jobs, so building one
+is a sparse conversion, and its files are memory-mapped on read. A query
+intersects (AND, smallest list first, binary search into the larger ones)
+or merges (OR) the postings of each segment, newest segment first, so its
+cost follows the postings it touches rather than the number of jobs. Once
+more than SEGMENT_MERGE_THRESHOLD segments exist they are merged into one.
+
+store_jobs syncs after inserting new canonical jobs. A sync only reads rows
+older than EXPORT_SETTLE_SECONDS, so jobs become searchable at the sync
+after they settle: the next store_jobs or POST /api/cron/sync-skill-index.
+Jobs are indexed once; near-duplicates linked to a canonical job are left
+out, as in aggregate-trends.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core import jsonio
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.singleflight import coalesce
+from app.services.cooccurrence_service import SKILL_COLUMNS, SKILL_INDEX, skill_matrix_from_texts
+from app.services.export_service import MAX_PAGE_SIZE, build_filters, iter_pages
+from app.services.normalizer_service import normalize_skill_name
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+STATE_FILE = "_state.json"
+
+# Segments kept before they are merged into one
+SEGMENT_MERGE_THRESHOLD = 8
+
+# Job columns returned with search results
+JOB_SUMMARY_COLUMNS = "id,title,company_name,location,role_key,work_mode,posted_date,job_url,fetched_at"
+
+# Segments opened in this process, reloaded when _state.json changes
+_opened: dict = {"mtime": None, "segments": []}
+
+
+def enabled() -> bool:
+    """Whether an index directory is configured."""
+    return bool(settings.SKILL_INDEX_DIR)
+
+
+def _read_state(root: str) -> dict:
+    try:
+        with open(os.path.join(root, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_state(root: str, state: dict):
+    path = os.path.join(root, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def _remove_unlisted(root: str, segments: list[str]):
+    """Delete segments a sync or merge wrote but never committed to the state."""
+    for name in os.listdir(root):
+        if name.startswith("seg-") and name not in segments:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _write_segment(root: str, name: str, doc_ids: np.ndarray, skills: list[str], offsets: np.ndarray, postings: np.ndarray):
+    path = os.path.join(root, name)
+    tmp = path + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "doc_ids.npy"), doc_ids)
+    np.save(os.path.join(tmp, "offsets.npy"), offsets.astype(np.int64))
+    np.save(os.path.join(tmp, "postings.npy"), postings.astype(np.uint32))
+    with open(os.path.join(tmp, "skills.json"), "w") as f:
+        json.dump(skills, f)
+    os.replace(tmp, path)
+
+
+def _build_segment(root: str, name: str, jobs: list[dict]):
+    """Extract skills from jobs and write their postings as a segment."""
+    matrix = skill_matrix_from_texts(job.get("description") or "" for job in jobs).tocsc()
+    matrix.sort_indices()
+    doc_ids = np.array([job["id"] for job in jobs], dtype="S")
+    _write_segment(root, name, doc_ids, SKILL_COLUMNS, matrix.indptr, matrix.indices)
+
+
+def _load_segment(root: str, name: str) -> dict:
+    path = os.path.join(root, name)
+    with open(os.path.join(path, "skills.json")) as f:
+        skills = json.load(f)
+    return {
+        "name": name,
+        "skills": {skill: i for i, skill in enumerate(skills)},
+        "doc_ids": np.load(os.path.join(path, "doc_ids.npy"), mmap_mode="r"),
+        "offsets": np.load(os.path.join(path, "offsets.npy"), mmap_mode="r"),
+        "postings": np.load(os.path.join(path, "postings.npy"), mmap_mode="r"),
+    }
+
+
+def _postings(segment: dict, skill: str) -> Optional[np.ndarray]:
+    i = segment["skills"].get(skill)
+    if i is None:
+        return None
+    return segment["postings"][segment["offsets"][i]:segment["offsets"][i + 1]]
+
+
+def _merge_segments(root: str, names: list[str], merged_name: str):
+    """Concatenate segments into one, shifting each one's positions past the previous ones."""
+    segments = [_load_segment(root, name) for name in names]
+    bases = np.cumsum([0] + [len(segment["doc_ids"]) for segment in segments[:-1]])
+    skills = sorted({skill for segment in segments for skill in segment["skills"]})
+
+    offsets = np.zeros(len(skills) + 1, dtype=np.int64)
+    parts = []
+    for i, skill in enumerate(skills):
+        size = 0
+        for segment, base in zip(segments, bases):
+            postings = _postings(segment, skill)
+            if postings is not None:
+                parts.append(postings.astype(np.int64) + base)
+                size += len(postings)
+        offsets[i + 1] = offsets[i] + size
+
+    postings = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    doc_ids = np.concatenate([segment["doc_ids"] for segment in segments])
+    _write_segment(root, merged_name, doc_ids, skills, offsets, postings)
+
+
+async def _sync() -> dict:
+    root = settings.SKILL_INDEX_DIR
+    os.makedirs(root, exist_ok=True)
+    state = _read_state(root)
+    segments = state.get("segments", [])
+    _remove_unlisted(root, segments)
+
+    written = state.get("segments_written", 0)
+    cursor = state.get("cursor")
+    documents = state.get("documents", 0)
+    indexed = 0
+
+    fields = ["id", "description", "canonical_job_id"]
+    async for rows, cursor in iter_pages("jobs", fields, build_filters(since=cursor), MAX_PAGE_SIZE):
+        jobs = [row for row in rows if not row["canonical_job_id"]]
+        if jobs:
+            written += 1
+            name = f"seg-{written:06d}"
+            # Regex extraction is CPU-bound, keep it off the event loop
+            await run_in_threadpool(_build_segment, root, name, jobs)
+            segments = [*segments, name]
+            documents += len(jobs)
+            indexed += len(jobs)
+        # Committed per page, so an interrupted first build resumes where it stopped
+        state = {
+            "cursor": cursor,
+            "segments": segments,
+            "segments_written": written,
+            "documents": documents,
+            "synced_at": datetime.now(timezone.utc).isoformat()
+        }
+        _write_state(root, state)
+
+    merged = False
+    if len(segments) > SEGMENT_MERGE_THRESHOLD:
+        written += 1
+        name = f"seg-{written:06d}"
+        await run_in_threadpool(_merge_segments, root, segments, name)
+        _write_state(root, {**state, "segments": [name], "segments_written": written})
+        _remove_unlisted(root, [name])
+        merged = True
+
+    logger.info(f"Skill index synced {indexed} jobs")
+    return {"jobs_indexed": indexed, "documents": documents, "merged": merged}
+
+
+async def sync() -> dict:
+    """
+    Index canonical jobs stored since the last sync.
+    Concurrent syncs share one run.
+
+    Returns:
+        {jobs_indexed, documents, merged}
+    """
+    return await coalesce("skill-index:sync", {}, _sync)
+
+
+def _open_segments() -> list[dict]:
+    root = settings.SKILL_INDEX_DIR
+    try:
+        mtime = os.stat(os.path.join(root, STATE_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if mtime != _opened["mtime"]:
+        names = _read_state(root).get("segments", [])
+        _opened.update(mtime=mtime, segments=[_load_segment(root, name) for name in names])
+    return _opened["segments"]
+
+
+def _intersect(lists: list[np.ndarray]) -> np.ndarray:
+    """Positions in every list; each smaller result is binary-searched in the next larger list."""
+    lists = sorted(lists, key=len)
+    result = np.asarray(lists[0])
+    for other in lists[1:]:
+        if not len(result):
+            break
+        # other is at least as long as result, so it isn't empty here
+        found = np.minimum(np.searchsorted(other, result), len(other) - 1)
+        result = result[other[found] == result]
+    return result
+
+
+def _union(lists: list[np.ndarray], num_documents: int) -> np.ndarray:
+    """Positions in any list, in order (a bitmap over the segment, no sort)."""
+    mask = np.zeros(num_documents, dtype=bool)
+    for postings in lists:
+        mask[postings] = True
+    return np.flatnonzero(mask)
+
+
+def lookup(skills: list[str], op: str = "and", offset: int = 0, limit: int = 50) -> dict:
+    """
+    Find indexed jobs mentioning all (op="and") or any (op="or") of the skills.
+
+    Args:
+        skills: Normalized skill names
+        op: "and" or "or"
+        offset: Matches to skip
+        limit: Maximum job ids returned
+
+    Returns:
+        {total, job_ids}, newest jobs first
+    """
+    matches = []
+    for segment in reversed(_open_segments()):
+        lists = [_postings(segment, skill) for skill in skills]
+        if op == "and":
+            if any(postings is None for postings in lists):
+                continue
+            positions = _intersect(lists)
+        else:
+            lists = [postings for postings in lists if postings is not None and len(postings)]
+            if not lists:
+                continue
+            positions = np.asarray(lists[0]) if len(lists) == 1 else _union(lists, len(segment["doc_ids"]))
+        if len(positions):
+            matches.append((segment, positions))
+
+    job_ids = []
+    skip = offset
+    for segment, positions in matches:
+        if len(job_ids) >= limit:
+            break
+        if skip >= len(positions):
+            skip -= len(positions)
+            continue
+        page = positions[::-1][skip:skip + limit - len(job_ids)]
+        skip = 0
+        job_ids.extend(doc_id.decode() for doc_id in segment["doc_ids"][page])
+
+    return {"total": sum(len(positions) for _, positions in matches), "job_ids": job_ids}
+
+
+async def search_jobs(skills: str, op: str = "and", offset: int = 0, limit: int = 50) -> dict:
+    """
+    Search stored jobs by the skills they mention.
+
+    Args:
+        skills: Comma-separated skill names (any spelling normalize_skill_name knows)
+        op: "and" (jobs mentioning every skill) or "or" (any of them)
+        offset: Matches to skip
+        limit: Maximum jobs returned
+
+    Returns:
+        {skills, op, total, offset, limit, jobs}, newest jobs first
+
+    Raises:
+        ValueError: If no skill is given or one isn't a known skill
+    """
+    names = list(dict.fromkeys(normalize_skill_name(s) for s in skills.split(",") if s.strip()))
+    if not names:
+        raise ValueError("skills must name at least one skill")
+    unknown = [name for name in names if name not in SKILL_INDEX]
+    if unknown:
+        raise ValueError(f"Unknown skills: {', '.join(unknown)}")
+
+    result = await run_in_threadpool(lookup, names, op, offset, limit)
+    jobs = []
+    if result["job_ids"]:
+        params = [
+            ("select", JOB_SUMMARY_COLUMNS),
+            ("id", f"in.({','.join(result['job_ids'])})"),
+        ]
+        resp = await _http.get(f"{SUPABASE_REST_URL}/fetched_jobs", params=params, headers=HEADERS, timeout=10)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Job read failed: {resp.status_code} - {resp.text[:200]}")
+        by_id = {row["id"]: row for row in jsonio.loads(resp.content)}
+        jobs = [by_id[job_id] for job_id in result["job_ids"] if job_id in by_id]
+
+    return {"skills": names, "op": op, "total": result["total"], "offset": offset, "limit": limit, "jobs": jobs}
+
+
+def status() -> dict:
+    """Segments, size on disk and sync state of the index."""
+    if not enabled():
+        return {"enabled": False}
+
+    root = settings.SKILL_INDEX_DIR
+    state = _read_state(root)
+    size = 0
+    for name in state.get("segments", []):
+        path = os.path.join(root, name)
+        size += sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return {
+        "enabled": True,
+        "dir": root,
+        "segments": len(state.get("segments", [])),
+        "documents": state.get("documents", 0),
+        "bytes": size,
+        "synced_at": state.get("synced_at")
+    }
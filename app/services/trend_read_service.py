@@ -0,0 +1,302 @@
+"""
+Trend Read Service - Cached reads of skill_trends and the trend leaderboards
+for GET /api/trends and /api/trends/top.
+
+Snapshots change once a week while dashboards poll far more often, so
+responses are cached in process and validated with ETag / Last-Modified.
+Every written snapshot is recorded in `trend_snapshots`. The written_at of
+the most recently written one is the Last-Modified of every response and
+part of every ETag, so a conditional request that still matches gets a 304
+without reading skill_trends.
+
+The process that writes a snapshot drops its cache at once. Other
+processes (separate Lambda containers) re-read the latest trend_snapshots
+row, one tiny request, at most every TRENDS_CACHE_TTL seconds and drop
+entries cached under an older version.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from app.core import jsonio
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.logger import get_logger
+from app.core.singleflight import SingleFlight, make_key
+
+logger = get_logger(__name__)
+_http = get_client("supabase")
+
+SUPABASE_REST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+HEADERS = {
+    "apikey": settings.SUPABASE_KEY,
+    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+TREND_COLUMNS = (
+    "snapshot_date,skill_name,skill_name_normalized,job_mention_count,discussion_mention_count,"
+    "trend_direction,week_over_week_delta,rolling_avg,growth_rate,trend_slope"
+)
+
+# Rows per skill_trends request
+PAGE_SIZE = 1000
+
+# Distinct parameter combinations kept
+CACHE_MAX_ENTRIES = 256
+
+# written_at of the latest snapshot, and when it was last checked
+_version: dict = {"written_at": None, "checked_at": None}
+_cache: "OrderedDict[str, tuple[Optional[str], bytes]]" = OrderedDict()
+_loads = SingleFlight()
+
+
+def invalidate():
+    """Drop every cached response and force the next read to re-check the version."""
+    _cache.clear()
+    _version["checked_at"] = None
+
+
+async def publish_snapshot(snapshot_date: str) -> Optional[str]:
+    """
+    Record that a snapshot was written and drop cached trends.
+
+    Args:
+        snapshot_date: ISO date of the snapshot just written
+
+    Returns:
+        The new version (written_at), or None if it couldn't be recorded
+    """
+    written_at = datetime.now(timezone.utc).isoformat()
+    invalidate()
+    try:
+        resp = await _http.post(
+            f"{SUPABASE_REST_URL}/trend_snapshots?on_conflict=snapshot_date",
+            headers={**HEADERS, "Prefer": "return=minimal,resolution=merge-duplicates"},
+            json={"snapshot_date": snapshot_date, "written_at": written_at},
+            timeout=10
+        )
+        if resp.status_code not in [200, 201, 204]:
+            logger.error(f"Trend snapshot record error: {resp.status_code} - {resp.text[:200]}")
+            return None
+    except Exception as e:
+        logger.error(f"Error recording trend snapshot: {e}")
+        return None
+
+    _version.update(written_at=written_at, checked_at=time.monotonic())
+    return written_at
+
+
+async def current_version() -> Optional[str]:
+    """
+    written_at of the most recently written snapshot (None before the first).
+    Re-read from trend_snapshots at most every TRENDS_CACHE_TTL seconds.
+    """
+    checked_at = _version["checked_at"]
+    if checked_at is not None and time.monotonic() - checked_at < settings.TRENDS_CACHE_TTL:
+        return _version["written_at"]
+
+    url = f"{SUPABASE_REST_URL}/trend_snapshots?select=written_at&order=written_at.desc&limit=1"
+    try:
+        resp = await _http.get(url, headers=HEADERS, timeout=10)
+        if resp.status_code == 200:
+            rows = jsonio.loads(resp.content)
+            _version.update(written_at=rows[0]["written_at"] if rows else None, checked_at=time.monotonic())
+        else:
+            logger.error(f"Trend snapshot version error: {resp.status_code} - {resp.text[:200]}")
+    except Exception as e:
+        # Keep serving the version we have rather than failing reads
+        logger.error(f"Error checking trend snapshot version: {e}")
+    return _version["written_at"]
+
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def trend_query(skill: str = None, start_date: date = None, end_date: date = None, top: int = None) -> dict:
+    """
+    Normalize GET /api/trends parameters; the result keys both the cache and the ETag.
+
+    Args:
+        skill: One skill or a comma-separated list
+        start_date, end_date: Parsed dates, kept as ISO strings so nothing else
+            reaches the PostgREST filter
+    """
+    skills = sorted({name.lower().strip() for name in (skill or "").split(",") if name.strip()})
+    return {
+        "skills": skills,
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "top": top,
+    }
+
+
+def validators(version: Optional[str], namespace: str, params: dict) -> dict:
+    """
+    ETag and Last-Modified headers for a response under a version.
+
+    Args:
+        version: Current version from current_version()
+        namespace: "trends" or "trends:top"
+        params: Normalized request parameters
+    """
+    digest = hashlib.sha1(f"{version}|{make_key(namespace, params)}".encode()).hexdigest()[:20]
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "no-cache"}
+    if version:
+        headers["Last-Modified"] = format_datetime(_parse_timestamp(version).astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(headers: dict, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """
+    Whether a conditional request can be answered with 304.
+    If-None-Match takes precedence over If-Modified-Since.
+    """
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or headers["ETag"] in tags
+
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            if since.tzinfo is None:
+                # HTTP dates are GMT; a zone-less one still means UTC
+                since = since.replace(tzinfo=timezone.utc)
+            return parsedate_to_datetime(headers["Last-Modified"]) <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _latest_snapshot_date() -> Optional[str]:
+    url = f"{SUPABASE_REST_URL}/skill_trends?select=snapshot_date&order=snapshot_date.desc&limit=1"
+    resp = await _http.get(url, headers=HEADERS, timeout=10)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Trends read failed: {resp.status_code} - {resp.text[:200]}")
+    rows = jsonio.loads(resp.content)
+    return rows[0]["snapshot_date"] if rows else None
+
+
+async def _load_trends(skills: list[str], start_date: str, end_date: str, top: Optional[int]) -> dict:
+    filters = []
+    if not start_date and not end_date:
+        latest = await _latest_snapshot_date()
+        if not latest:
+            return {"snapshots": []}
+        filters.append(("snapshot_date", f"eq.{latest}"))
+    date_range = [f"snapshot_date.{op}.{value}" for op, value in (("gte", start_date), ("lte", end_date)) if value]
+    if date_range:
+        filters.append(("and", f"({','.join(date_range)})"))
+    if skills:
+        filters.append(("skill_name_normalized", f"in.({','.join(jsonio.dumps(s).decode() for s in skills)})"))
+
+    rows = []
+    offset = 0
+    while True:
+        params = [
+            ("select", TREND_COLUMNS),
+            ("order", "snapshot_date.desc,id.asc"),
+            ("limit", str(PAGE_SIZE)),
+            ("offset", str(offset)),
+            *filters,
+        ]
+        resp = await _http.get(f"{SUPABASE_REST_URL}/skill_trends", params=params, headers=HEADERS, timeout=30)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Trends read failed: {resp.status_code} - {resp.text[:200]}")
+        page = jsonio.loads(resp.content)
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+
+    snapshots = {}
+    for row in rows:
+        row["total_mention_count"] = (row.get("job_mention_count") or 0) + (row.get("discussion_mention_count") or 0)
+        snapshots.setdefault(row.pop("snapshot_date"), []).append(row)
+
+    result = []
+    for snapshot_date, skill_rows in snapshots.items():
+        skill_rows.sort(key=lambda row: (-row["total_mention_count"], row["skill_name_normalized"]))
+        result.append({"snapshot_date": snapshot_date, "skills": skill_rows[:top] if top else skill_rows})
+    return {"snapshots": result}
+
+
+async def get_trends(version: Optional[str], params: dict) -> bytes:
+    """
+    Skill trend snapshots as a JSON body, served from the cache when possible.
+
+    Args:
+        version: Current version from current_version()
+        params: From trend_query: skills, start_date and end_date (inclusive;
+            with neither, the latest snapshot), top (N most-mentioned skills
+            of each snapshot)
+
+    Returns:
+        Encoded {"snapshots": [{snapshot_date, skills: [...]}], "last_modified"}
+    """
+    async def load() -> dict:
+        return await _load_trends(params["skills"], params["start_date"], params["end_date"], params["top"])
+
+    return await _cached(make_key("trends", params), version, load)
+
+
+async def _load_leaderboard(board: str, limit: int, snapshot_date: Optional[str]) -> dict:
+    params = [
+        ("select", "snapshot_date,board,entries"),
+        ("board", f"eq.{board}"),
+        ("order", "snapshot_date.desc"),
+        ("limit", "1"),
+    ]
+    if snapshot_date:
+        params.append(("snapshot_date", f"eq.{snapshot_date}"))
+
+    resp = await _http.get(f"{SUPABASE_REST_URL}/trend_leaderboards", params=params, headers=HEADERS, timeout=10)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Leaderboard read failed: {resp.status_code} - {resp.text[:200]}")
+
+    rows = jsonio.loads(resp.content)
+    if not rows:
+        return {"snapshot_date": snapshot_date, "board": board, "entries": []}
+    return {**rows[0], "entries": rows[0]["entries"][:limit]}
+
+
+async def get_leaderboard(version: Optional[str], params: dict) -> bytes:
+    """
+    A precomputed top-K leaderboard as a JSON body, served from the cache when possible.
+
+    Args:
+        version: Current version from current_version()
+        params: board (see trend_service.LEADERBOARDS), limit, and snapshot_date
+            (None for the latest)
+
+    Returns:
+        Encoded {snapshot_date, board, entries: [{rank, skill_name, value, ...}], last_modified}
+    """
+    async def load() -> dict:
+        return await _load_leaderboard(params["board"], params["limit"], params["snapshot_date"])
+
+    return await _cached(make_key("trends:top", params), version, load)
+
+
+async def _cached(key: str, version: Optional[str], load) -> bytes:
+    """Return the body cached for key under version, or load, encode and cache it (one load per key)."""
+    cached = _cache.get(key)
+    if cached and cached[0] == version:
+        _cache.move_to_end(key)
+        return cached[1]
+
+    async def load_body() -> bytes:
+        body = jsonio.dumps({**await load(), "last_modified": version})
+        _cache[key] = (version, body)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+        return body
+
+    body, _ = await _loads.do(f"{key}:{version}", load_body)
+    return body
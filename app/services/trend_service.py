@@ -0,0 +1,240 @@
+"""
+Trend Service - Computes trend direction and momentum from snapshot history.
+
+The `skill_trends` history is loaded as a skills x snapshot-dates matrix and
+every metric is computed with vectorized NumPy operations in a single pass,
+so cost grows with the size of the matrix rather than with Python loops.
+
+Each snapshot also gets small ranked leaderboards (top skills by job
+mentions, discussion mentions, combined share and growth), selected with a
+bounded heap when the snapshot is written so reads never rank skill_trends.
+"""
+import heapq
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services import columnar_store
+from app.services.persistence_service import get_skill_trend_history
+
+
+# Number of most recent snapshots used for rolling average and slope
+TREND_WINDOW = 4
+
+# History loaded per run (weeks)
+TREND_LOOKBACK_WEEKS = 26
+
+# Relative slope (per week, as a fraction of the rolling average)
+# above which a skill is considered rising or falling
+TREND_SLOPE_THRESHOLD = 0.05
+
+# Entries kept per leaderboard
+LEADERBOARD_SIZE = 50
+
+# Previous-snapshot mentions a skill needs to be ranked by growth, so a
+# skill going from 1 to 3 mentions doesn't top the board at +200%
+LEADERBOARD_MIN_BASE = 10
+
+LEADERBOARDS = ("job_mentions", "discussion_mentions", "combined", "growth")
+
+
+def build_trend_matrix(history: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pivot snapshot rows into a dense skills x dates matrix.
+
+    Args:
+        history: Rows with snapshot_date, skill_name_normalized and mention counts
+
+    Returns:
+        (skills, dates, matrix) where matrix[i, j] is the combined mention
+        count of skills[i] on dates[j]. Skills missing from a snapshot are 0.
+    """
+    if not history:
+        return np.array([], dtype=object), np.array([], dtype="datetime64[D]"), np.zeros((0, 0))
+
+    skill_keys = np.array([row["skill_name_normalized"] for row in history], dtype=object)
+    date_keys = np.array([row["snapshot_date"] for row in history], dtype="datetime64[D]")
+    counts = np.array(
+        [
+            (row.get("job_mention_count") or 0) + (row.get("discussion_mention_count") or 0)
+            for row in history
+        ],
+        dtype=np.float64
+    )
+
+    skills, skill_idx = np.unique(skill_keys, return_inverse=True)
+    dates, date_idx = np.unique(date_keys, return_inverse=True)
+
+    matrix = np.zeros((len(skills), len(dates)), dtype=np.float64)
+    matrix[skill_idx, date_idx] = counts
+
+    return skills, dates, matrix
+
+
+def compute_momentum(
+    matrix: np.ndarray,
+    dates: np.ndarray,
+    window: int = TREND_WINDOW,
+    threshold: float = TREND_SLOPE_THRESHOLD
+) -> dict:
+    """
+    Compute momentum metrics for the latest snapshot of every skill.
+
+    Args:
+        matrix: skills x dates matrix of mention counts (dates ascending)
+        dates: Snapshot dates matching the matrix columns
+        window: Number of trailing snapshots for rolling average and slope
+        threshold: Relative slope needed to call a trend up or down
+
+    Returns:
+        Dict of 1-D arrays (one entry per skill): week_over_week_delta,
+        rolling_avg, growth_rate, trend_slope and trend_direction
+    """
+    n_skills, n_dates = matrix.shape
+    current = matrix[:, -1] if n_dates else np.zeros(n_skills)
+    previous = matrix[:, -2] if n_dates > 1 else np.zeros(n_skills)
+
+    delta = current - previous
+    growth = np.divide(
+        delta,
+        previous,
+        out=np.where(current > 0, 1.0, 0.0) if n_dates > 1 else np.zeros(n_skills),
+        where=previous > 0
+    )
+
+    tail = matrix[:, -window:]
+    rolling_avg = tail.mean(axis=1) if n_dates else np.zeros(n_skills)
+
+    # Least-squares slope over the trailing window, x measured in weeks so
+    # irregular snapshot spacing is handled correctly
+    slope = np.zeros(n_skills)
+    if tail.shape[1] > 1:
+        x = (dates[-tail.shape[1]:] - dates[-tail.shape[1]]).astype(np.float64) / 7.0
+        x_centered = x - x.mean()
+        denom = np.dot(x_centered, x_centered)
+        if denom > 0:
+            slope = (tail - tail.mean(axis=1, keepdims=True)) @ x_centered / denom
+
+    relative_slope = slope / np.maximum(rolling_avg, 1.0)
+    direction = np.full(n_skills, "stable", dtype=object)
+    direction[relative_slope > threshold] = "up"
+    direction[relative_slope < -threshold] = "down"
+
+    return {
+        "week_over_week_delta": delta,
+        "rolling_avg": rolling_avg,
+        "growth_rate": growth,
+        "trend_slope": slope,
+        "trend_direction": direction
+    }
+
+
+async def apply_trend_momentum(
+    snapshot_date: str,
+    skill_data: list[dict],
+    lookback_weeks: int = TREND_LOOKBACK_WEEKS
+) -> list[dict]:
+    """
+    Fill trend_direction and momentum fields on a new snapshot.
+
+    The snapshot being written is merged into the loaded history as the
+    latest column (replacing any earlier run on the same date).
+
+    Args:
+        snapshot_date: ISO date of the snapshot being written
+        skill_data: Records with skill_name, job_count and discussion_count
+        lookback_weeks: How much history to load
+
+    Returns:
+        The same records with momentum fields added
+    """
+    if not skill_data:
+        return skill_data
+
+    since = (date.fromisoformat(snapshot_date) - timedelta(weeks=lookback_weeks)).isoformat()
+    if columnar_store.enabled():
+        history = await columnar_store.trend_history(since)
+    else:
+        history = await get_skill_trend_history(since)
+    history = [row for row in history if row.get("snapshot_date") != snapshot_date]
+
+    for skill in skill_data:
+        history.append({
+            "snapshot_date": snapshot_date,
+            "skill_name_normalized": skill["skill_name"].lower().strip(),
+            "job_mention_count": skill.get("job_count", 0),
+            "discussion_mention_count": skill.get("discussion_count", 0)
+        })
+
+    skills, dates, matrix = build_trend_matrix(history)
+    metrics = compute_momentum(matrix, dates)
+    row_of = {skill: i for i, skill in enumerate(skills)}
+
+    for skill in skill_data:
+        i = row_of[skill["skill_name"].lower().strip()]
+        skill["trend_direction"] = metrics["trend_direction"][i]
+        skill["week_over_week_delta"] = int(metrics["week_over_week_delta"][i])
+        skill["rolling_avg"] = round(float(metrics["rolling_avg"][i]), 4)
+        skill["growth_rate"] = round(float(metrics["growth_rate"][i]), 4)
+        skill["trend_slope"] = round(float(metrics["trend_slope"][i]), 4)
+
+    return skill_data
+
+
+def compute_leaderboards(skill_data: list[dict], k: int = LEADERBOARD_SIZE) -> dict[str, list[dict]]:
+    """
+    Select the top-k skills of a snapshot for each leaderboard.
+
+    Boards:
+        job_mentions: job_count
+        discussion_mentions: discussion_count
+        combined: mean of the skill's share of all job mentions and of all
+            discussion mentions (percent), so both sources weigh the same
+        growth: growth_rate, among skills with at least LEADERBOARD_MIN_BASE
+            mentions in the previous snapshot
+
+    Args:
+        skill_data: Records from apply_trend_momentum
+        k: Entries per board
+
+    Returns:
+        Board name -> [{rank, skill_name, value, job_count, discussion_count,
+        growth_rate, week_over_week_delta}]
+    """
+    # Sorted input makes ties rank alphabetically (nlargest is stable)
+    skills = sorted(skill_data, key=lambda skill: skill["skill_name"].lower())
+    total_jobs = sum(skill.get("job_count", 0) for skill in skills) or 1
+    total_discussions = sum(skill.get("discussion_count", 0) for skill in skills) or 1
+
+    def combined(skill: dict) -> float:
+        return 50.0 * (skill.get("job_count", 0) / total_jobs + skill.get("discussion_count", 0) / total_discussions)
+
+    def previous(skill: dict) -> int:
+        total = skill.get("job_count", 0) + skill.get("discussion_count", 0)
+        return total - skill.get("week_over_week_delta", 0)
+
+    growing = [skill for skill in skills if previous(skill) >= LEADERBOARD_MIN_BASE]
+    selections = {
+        "job_mentions": (skills, lambda skill: skill.get("job_count", 0)),
+        "discussion_mentions": (skills, lambda skill: skill.get("discussion_count", 0)),
+        "combined": (skills, combined),
+        "growth": (growing, lambda skill: skill.get("growth_rate", 0.0)),
+    }
+
+    boards = {}
+    for board, (candidates, value) in selections.items():
+        top = heapq.nlargest(k, candidates, key=lambda skill: (value(skill), skill.get("week_over_week_delta", 0)))
+        boards[board] = [
+            {
+                "rank": rank,
+                "skill_name": skill["skill_name"],
+                "value": round(value(skill), 4),
+                "job_count": skill.get("job_count", 0),
+                "discussion_count": skill.get("discussion_count", 0),
+                "growth_rate": skill.get("growth_rate", 0.0),
+                "week_over_week_delta": skill.get("week_over_week_delta", 0)
+            }
+            for rank, skill in enumerate(top, start=1)
+            if value(skill) > 0
+        ]
+    return boards
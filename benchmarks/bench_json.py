@@ -0,0 +1,161 @@
+"""
+JSON codec and compression benchmark for one cron run's payloads.
+
+Builds the JSON documents a weekly run moves, shaped by the fake upstream
+generators:
+
+- SerpAPI responses (decode)
+- Reddit listings (decode)
+- job and discussion inserts (encode)
+- the whole-table reads in aggregate-trends (decode)
+- the skill_trends snapshot writes (encode)
+
+For each payload it reports raw and gzip-compressed bytes, and CPU time
+with the stdlib `json` module and with the `app.core.jsonio` codec (orjson
+when installed). The totals estimate the bytes and CPU saved per cron run.
+
+Usage:
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --stored-jobs 20000 --json results.json
+"""
+import argparse
+import gzip
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmarks.fake_upstreams import make_serp_job, make_reddit_post, make_text, ROLES
+
+from app.core import jsonio
+
+
+def build_payloads(rng: random.Random, args) -> list[tuple[str, str, list]]:
+    """Return (name, direction, documents) for every payload in a cron run."""
+    serp = [
+        {"jobs_results": [make_serp_job(rng, rng.choice(ROLES)) for _ in range(args.jobs_per_query)]}
+        for _ in range(args.job_queries)
+    ]
+    reddit = [
+        {"kind": "Listing", "data": {"children": [make_reddit_post(rng) for _ in range(args.posts_per_request)]}}
+        for _ in range(args.reddit_requests)
+    ]
+    job_inserts = [
+        {**{k: v for k, v in job.items() if k in ("title", "company_name", "location", "description")}, "raw_data": job}
+        for response in serp for job in response["jobs_results"]
+    ]
+    discussion_inserts = [
+        {"title": child["data"]["title"], "body": child["data"]["selftext"], "subreddit": child["data"]["subreddit"]}
+        for listing in reddit for child in listing["data"]["children"]
+    ]
+    stored_jobs = [[{"description": make_text(rng, rng.randint(250, 900))} for _ in range(args.stored_jobs)]]
+    stored_discussions = [[
+        {"title": make_text(rng, 10), "body": make_text(rng, rng.randint(20, 600))}
+        for _ in range(args.stored_discussions)
+    ]]
+    trend_rows = [
+        {"snapshot_date": "2026-01-05", "skill_name": f"skill {i}", "job_mention_count": rng.randint(0, 900),
+         "discussion_mention_count": rng.randint(0, 300), "trend_direction": "up", "rolling_avg": 12.5}
+        for i in range(args.skills)
+    ]
+
+    return [
+        ("serpapi_responses", "decode", serp),
+        ("reddit_listings", "decode", reddit),
+        ("job_inserts", "encode", job_inserts),
+        ("discussion_inserts", "encode", discussion_inserts),
+        ("aggregate_jobs_read", "decode", stored_jobs),
+        ("aggregate_discussions_read", "decode", stored_discussions),
+        ("trend_snapshot_writes", "encode", trend_rows),
+    ]
+
+
+def _time(func, items: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(name: str, direction: str, documents: list, repeat: int) -> dict:
+    """Measure bytes and codec CPU time for one payload."""
+    encoded = [json.dumps(doc).encode() for doc in documents]
+    raw_bytes = sum(len(data) for data in encoded)
+    gzip_bytes = sum(len(gzip.compress(data, compresslevel=5)) for data in encoded)
+
+    if direction == "decode":
+        stdlib_s = _time(json.loads, encoded, repeat)
+        fast_s = _time(jsonio.loads, encoded, repeat)
+    else:
+        stdlib_s = _time(lambda doc: json.dumps(doc).encode(), documents, repeat)
+        fast_s = _time(jsonio.dumps, documents, repeat)
+
+    return {
+        "payload": name,
+        "direction": direction,
+        "documents": len(documents),
+        "raw_bytes": raw_bytes,
+        "gzip_bytes": gzip_bytes,
+        "stdlib_ms": round(stdlib_s * 1000, 2),
+        "fast_ms": round(fast_s * 1000, 2),
+    }
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--job-queries", type=int, default=15)
+    parser.add_argument("--jobs-per-query", type=int, default=10)
+    parser.add_argument("--reddit-requests", type=int, default=110)
+    parser.add_argument("--posts-per-request", type=int, default=5)
+    parser.add_argument("--stored-jobs", type=int, default=5000)
+    parser.add_argument("--stored-discussions", type=int, default=5000)
+    parser.add_argument("--skills", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (best is reported)")
+    parser.add_argument("--json", metavar="PATH", help="Write results to PATH")
+    args = parser.parse_args(argv)
+
+    results = [
+        measure(name, direction, documents, args.repeat)
+        for name, direction, documents in build_payloads(random.Random(42), args)
+    ]
+
+    print(f"codec: {'orjson' if jsonio.FAST_JSON else 'stdlib (orjson not installed)'}\n")
+    print(f"{'payload':<28} {'dir':<7} {'raw KB':>10} {'gzip KB':>10} {'stdlib ms':>10} {'fast ms':>10}")
+    for r in results:
+        print(
+            f"{r['payload']:<28} {r['direction']:<7} {r['raw_bytes'] / 1024:>10.1f} "
+            f"{r['gzip_bytes'] / 1024:>10.1f} {r['stdlib_ms']:>10} {r['fast_ms']:>10}"
+        )
+
+    totals = {
+        "raw_bytes": sum(r["raw_bytes"] for r in results),
+        "gzip_bytes": sum(r["gzip_bytes"] for r in results),
+        "stdlib_ms": round(sum(r["stdlib_ms"] for r in results), 2),
+        "fast_ms": round(sum(r["fast_ms"] for r in results), 2),
+    }
+    totals["bytes_saved"] = totals["raw_bytes"] - totals["gzip_bytes"]
+    totals["cpu_ms_saved"] = round(totals["stdlib_ms"] - totals["fast_ms"], 2)
+    print(
+        f"\nper cron run: {totals['raw_bytes'] / 1e6:.2f} MB raw -> {totals['gzip_bytes'] / 1e6:.2f} MB gzip "
+        f"({totals['bytes_saved'] / 1e6:.2f} MB saved), JSON CPU {totals['stdlib_ms']} ms -> "
+        f"{totals['fast_ms']} ms ({totals['cpu_ms_saved']} ms saved)"
+    )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "benchmark": "json_codec",
+                "python": platform.python_version(),
+                "fast_json": jsonio.FAST_JSON,
+                "results": results,
+                "totals": totals
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
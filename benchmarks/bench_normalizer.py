@@ -0,0 +1,211 @@
+"""
+Micro-benchmarks for normalizer_service hot paths.
+
+Measures docs/sec, per-call latency (p50/p99) and allocated bytes per call
+for `extract_skills_from_text`, `normalize_skill_name` and
+`normalize_job_title` over synthetic and recorded texts of varied sizes,
+and for skill extraction at several taxonomy sizes.
+
+Usage:
+    python -m benchmarks.bench_normalizer
+    python -m benchmarks.bench_normalizer --json results.json
+    python -m benchmarks.bench_normalizer --baseline benchmarks/data/normalizer_baseline.json
+    python -m benchmarks.bench_normalizer --save-baseline benchmarks/data/normalizer_baseline.json
+
+`benchmarks/data/normalizer_baseline.json` is the committed baseline for the
+bundled samples. Timings depend on the machine, so regenerate it with
+--save-baseline on the machine that runs the comparison, and commit it
+again when a change is meant to move the numbers.
+
+Recorded corpora are JSON files shaped like `benchmarks/data/normalizer_samples.json`
+or NDJSON exports of fetched_jobs/fetched_discussions rows.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fake_upstreams import make_text, ROLES, SENIORITY
+
+from app.services import normalizer_service
+from app.services.normalizer_service import (
+    extract_skills_from_text,
+    normalize_skill_name,
+    normalize_job_title,
+)
+
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "data", "normalizer_samples.json")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "data", "normalizer_baseline.json")
+
+TEXT_SIZES = [50, 250, 1000, 5000]
+TAXONOMY_SCALES = [1, 2, 4]
+
+
+def load_corpus(path: str) -> dict:
+    """Load recorded job descriptions and discussion bodies."""
+    corpus = {"jobs": [], "discussions": []}
+    with open(path) as f:
+        if path.endswith(".ndjson"):
+            for line in f:
+                row = json.loads(line)
+                if "description" in row:
+                    corpus["jobs"].append(row["description"] or "")
+                elif "body" in row or "title" in row:
+                    corpus["discussions"].append(f"{row.get('title', '')} {row.get('body', '')}")
+        else:
+            data = json.load(f)
+            corpus["jobs"].extend(data.get("jobs", []))
+            corpus["discussions"].extend(data.get("discussions", []))
+    return corpus
+
+
+def measure(name: str, case: str, func, inputs: list, min_time: float = 0.5) -> dict:
+    """
+    Time `func` over `inputs` and measure its allocations.
+
+    Latency is measured per call without tracing; allocations are measured
+    in a separate traced pass so tracemalloc overhead doesn't skew timings.
+    """
+    latencies = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < min_time or len(latencies) < len(inputs):
+        for item in inputs:
+            call_started = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - call_started)
+
+    tracemalloc.start()
+    allocated = 0
+    for item in inputs:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(item)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "function": name,
+        "case": case,
+        "calls": len(latencies),
+        "docs_per_sec": round(len(latencies) / total, 1) if total else 0.0,
+        "mean_us": round(total / len(latencies) * 1e6, 2),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 2),
+        "p99_us": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6, 2),
+        "alloc_bytes_per_call": int(allocated / len(inputs))
+    }
+
+
+def run(corpus: dict, min_time: float) -> list[dict]:
+    """Run every benchmark case."""
+    rng = random.Random(42)
+    results = []
+
+    for size in TEXT_SIZES:
+        docs = [make_text(rng, size) for _ in range(20)]
+        results.append(measure("extract_skills_from_text", f"synthetic_{size}w", extract_skills_from_text, docs, min_time))
+
+    for kind in ("jobs", "discussions"):
+        if corpus[kind]:
+            results.append(measure("extract_skills_from_text", f"recorded_{kind}", extract_skills_from_text, corpus[kind], min_time))
+
+    original_skills = normalizer_service.KNOWN_SKILLS
+    docs = [make_text(rng, 1000) for _ in range(10)]
+    try:
+        for scale in TAXONOMY_SCALES:
+            normalizer_service.KNOWN_SKILLS = original_skills + [
+                f"{skill}-v{i}" for i in range(1, scale) for skill in original_skills
+            ]
+            results.append(measure(
+                "extract_skills_from_text",
+                f"taxonomy_{len(normalizer_service.KNOWN_SKILLS)}",
+                extract_skills_from_text, docs, min_time
+            ))
+    finally:
+        normalizer_service.KNOWN_SKILLS = original_skills
+
+    skill_names = [rng.choice(original_skills).title() for _ in range(500)]
+    results.append(measure("normalize_skill_name", "known_skills", normalize_skill_name, skill_names, min_time))
+
+    titles = [f"{rng.choice(SENIORITY)}{rng.choice(ROLES)}" for _ in range(500)]
+    results.append(measure("normalize_job_title", "synthetic_titles", normalize_job_title, titles, min_time))
+    # The memoized path above mostly hits the cache; measure the regexes on their own too
+    results.append(measure("normalize_job_title", "synthetic_titles_uncached", normalize_job_title.__wrapped__, titles, min_time))
+
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Return a description of every case whose throughput regressed past tolerance."""
+    previous = {(r["function"], r["case"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result["function"], result["case"]))
+        if not base or not base["docs_per_sec"]:
+            continue
+        change = result["docs_per_sec"] / base["docs_per_sec"] - 1
+        result["change_vs_baseline"] = round(change, 4)
+        if change < -tolerance:
+            regressions.append(
+                f"{result['function']}[{result['case']}]: {base['docs_per_sec']} -> "
+                f"{result['docs_per_sec']} docs/sec ({change:+.1%})"
+            )
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=SAMPLES_PATH, help="Recorded texts (JSON or NDJSON)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per case")
+    parser.add_argument("--json", metavar="PATH", help="Write results to PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed docs/sec drop vs baseline")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline {args.baseline} not found (create it with --save-baseline)")
+
+    results = run(load_corpus(args.corpus), args.min_time)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+
+    print(f"{'function':<26} {'case':<22} {'docs/sec':>12} {'p50 us':>10} {'p99 us':>10} {'alloc B':>10}")
+    for r in results:
+        print(
+            f"{r['function']:<26} {r['case']:<22} {r['docs_per_sec']:>12} "
+            f"{r['p50_us']:>10} {r['p99_us']:>10} {r['alloc_bytes_per_call']:>10}"
+        )
+
+    report = {
+        "benchmark": "normalizer_service",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "regressions": regressions
+    }
+    for path in filter(None, [args.json, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print("\nRegressions vs baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,816 @@
+"""
+Fake Upstreams - Local stand-ins for SerpAPI, Reddit, Apify and PostgREST.
+
+Each upstream runs as a threaded HTTP server on 127.0.0.1 with configurable
+latency and 429 injection, and records request counts, status codes and
+server-side latency so the benchmark can report per-upstream numbers.
+"""
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+
+ROLES = [
+    "Software Developer", "Backend Developer", "Frontend Developer", "Full Stack Developer",
+    "Data Scientist", "Machine Learning Engineer", "DevOps Engineer", "Cloud Engineer",
+    "Data Engineer", "Mobile Developer", "Python Developer", "Java Developer"
+]
+SENIORITY = ["", "Senior ", "Junior ", "Lead ", "Staff "]
+COMPANIES = [f"Company {i}" for i in range(200)]
+LOCATIONS = ["New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA", "Remote", "Chicago, IL"]
+SKILL_WORDS = [
+    "python", "javascript", "typescript", "java", "go", "rust", "react", "vue", "angular",
+    "node.js", "django", "fastapi", "flask", "spring boot", "postgres", "mysql", "mongodb",
+    "redis", "kafka", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "git",
+    "machine learning", "pytorch", "tensorflow", "pandas", "microservices", "ci/cd", "graphql"
+]
+FILLER = (
+    "we are looking for a motivated engineer to join our team and help build reliable "
+    "products for customers across the world you will collaborate with designers and "
+    "product managers on features from idea to launch and own the quality of your work"
+).split()
+SUBREDDITS = [
+    "programming", "learnprogramming", "cscareerquestions", "webdev", "javascript", "python",
+    "java", "devops", "machinelearning", "datascience", "aws", "docker", "kubernetes"
+]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    """Generate filler text with a realistic density of skill mentions."""
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(SKILL_WORDS) if rng.random() < 0.08 else rng.choice(FILLER))
+    return " ".join(out)
+
+
+def make_serp_job(rng: random.Random, query: str) -> dict:
+    """Generate a Google Jobs result shaped like SerpAPI's `jobs_results` items."""
+    extensions = {"posted_at": f"{rng.randint(1, 30)} days ago", "schedule_type": "Full-time"}
+    if rng.random() < 0.5:
+        low = rng.randint(80, 160)
+        extensions["salary"] = f"{low}K–{low + rng.randint(10, 60)}K a year"
+    if rng.random() < 0.3:
+        extensions["work_from_home"] = True
+
+    return {
+        "title": rng.choice(SENIORITY) + (query if rng.random() < 0.6 else rng.choice(ROLES)),
+        "company_name": rng.choice(COMPANIES),
+        "location": rng.choice(LOCATIONS),
+        "via": "LinkedIn",
+        "description": make_text(rng, rng.randint(250, 900)),
+        "detected_extensions": extensions,
+        "extensions": list(map(str, extensions.values())),
+        "job_highlights": [{"title": "Qualifications", "items": [make_text(rng, 12) for _ in range(5)]}],
+        "share_link": f"https://www.google.com/search?ibp=htl;jobs&q={uuid.UUID(int=rng.getrandbits(128))}",
+        "apply_options": [{"title": "LinkedIn", "link": "https://www.linkedin.com/jobs/view/1"}],
+        "job_id": uuid.UUID(int=rng.getrandbits(128)).hex
+    }
+
+
+def make_reddit_post(rng: random.Random, subreddit: str = None) -> dict:
+    """Generate a Reddit listing child (`t3`) with the fields the collector reads."""
+    post_id = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=7))
+    subreddit = subreddit or rng.choice(SUBREDDITS)
+    return {
+        "kind": "t3",
+        "data": {
+            "id": post_id,
+            "name": f"t3_{post_id}",
+            "title": make_text(rng, rng.randint(6, 16)),
+            "selftext": make_text(rng, rng.randint(20, 600)),
+            "subreddit": subreddit,
+            "author": f"user_{rng.randint(1, 5000)}",
+            "score": rng.randint(0, 3000),
+            "num_comments": rng.randint(0, 400),
+            "permalink": f"/r/{subreddit}/comments/{post_id}/post/",
+            "created_utc": float(rng.randint(1_600_000_000, 1_790_000_000))
+        }
+    }
+
+
+def make_reddit_comments(rng: random.Random, post_id: str, subreddit: str, limit: int, depth: int) -> list[dict]:
+    """Generate a comment tree (`t1` children with nested `replies` listings), as /comments/{id}.json returns it."""
+    def make(parent: str, level: int) -> dict:
+        comment_id = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=7))
+        replies = [make(f"t1_{comment_id}", level + 1) for _ in range(rng.randint(0, 3))] if level + 1 < depth else []
+        return {
+            "kind": "t1",
+            "data": {
+                "id": comment_id,
+                "name": f"t1_{comment_id}",
+                "parent_id": parent,
+                "subreddit": subreddit,
+                "author": f"user_{rng.randint(1, 5000)}",
+                "body": "[deleted]" if rng.random() < 0.05 else make_text(rng, rng.randint(5, 120)),
+                "score": rng.randint(-5, 500),
+                "created_utc": float(rng.randint(1_600_000_000, 1_790_000_000)),
+                "replies": {"kind": "Listing", "data": {"children": replies}} if replies else ""
+            }
+        }
+
+    children = [make(f"t3_{post_id}", 0) for _ in range(rng.randint(limit // 4, limit))]
+    children.append({"kind": "more", "data": {"count": rng.randint(1, 200), "children": []}})
+    return children
+
+
+def make_apify_item(rng: random.Random) -> dict:
+    """Generate an Apify Reddit Scraper dataset item."""
+    data = make_reddit_post(rng)["data"]
+    return {
+        "id": data["name"],
+        "parsedId": data["id"],
+        "title": data["title"],
+        "body": data["selftext"],
+        "communityName": f"r/{data['subreddit']}",
+        "username": data["author"],
+        "upVotes": data["score"],
+        "numberOfComments": data["num_comments"],
+        "url": f"https://www.reddit.com{data['permalink']}",
+        "createdAt": datetime.fromtimestamp(data["created_utc"], tz=timezone.utc).isoformat(),
+        "dataType": "post"
+    }
+
+
+class UpstreamStats:
+    """Thread-safe request counters and latency samples for one upstream."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.status_counts = {}
+            self.latencies = []
+
+    def record(self, status: int, seconds: float):
+        with self.lock:
+            self.requests += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "status_counts": dict(self.status_counts),
+                "latencies": list(self.latencies)
+            }
+
+
+class FakeUpstream:
+    """
+    Base class for a fake upstream server.
+
+    Subclasses implement `handle(method, path, query, headers, body)` and
+    return (status, headers, payload).
+    """
+
+    name = "upstream"
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = UpstreamStats()
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeUpstream":
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                upstream.serve(self)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def throttled_response(self) -> tuple[int, dict, object]:
+        return 429, {"Retry-After": "1"}, {"error": "Too Many Requests"}
+
+    def serve(self, request: BaseHTTPRequestHandler):
+        started = time.perf_counter()
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        if request.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        split = urlsplit(request.path)
+        query = dict(parse_qsl(split.query, keep_blank_values=True))
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0 * (0.5 + self.rng.random()))
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            status, headers, payload = self.throttled_response()
+        else:
+            try:
+                status, headers, payload = self.handle(
+                    request.command, unquote(split.path), query, request.headers, body
+                )
+            except Exception as e:
+                status, headers, payload = 500, {}, {"error": str(e)}
+
+        data = b"" if payload is None else json.dumps(payload).encode()
+        gzipped = len(data) >= 1024 and "gzip" in (request.headers.get("Accept-Encoding") or "")
+        if gzipped:
+            data = gzip.compress(data, compresslevel=5)
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        if gzipped:
+            request.send_header("Content-Encoding", "gzip")
+        request.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            request.send_header(key, value)
+        request.end_headers()
+        request.wfile.write(data)
+
+        self.stats.record(status, time.perf_counter() - started)
+
+    def handle(self, method, path, query, headers, body):
+        raise NotImplementedError
+
+
+class FakeSerpApi(FakeUpstream):
+    """SerpAPI `engine=google_jobs` search."""
+
+    name = "serpapi"
+
+    def handle(self, method, path, query, headers, body):
+        if path != "/search.json":
+            return 404, {}, {"error": "Not found"}
+        num = min(int(query.get("num", 10)), 100)
+        with self.rng_lock:
+            jobs = [make_serp_job(self.rng, query.get("q", "")) for _ in range(num)]
+        return 200, {}, {"search_metadata": {"status": "Success"}, "jobs_results": jobs}
+
+
+class FakeReddit(FakeUpstream):
+    """Reddit public JSON listings: subreddit/global search, hot posts and comment trees."""
+
+    name = "reddit"
+
+    # Requests allowed per rate-limit window, reported in X-Ratelimit-* headers
+    RATE_LIMIT = 600
+    RATE_WINDOW = 60.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.remaining = float(self.RATE_LIMIT)
+        self.window_started = time.monotonic()
+
+    def throttled_response(self):
+        return 429, {
+            "Retry-After": "1",
+            "X-Ratelimit-Remaining": "0",
+            "X-Ratelimit-Reset": "1",
+            "X-Ratelimit-Used": "100"
+        }, {"message": "Too Many Requests", "error": 429}
+
+    def handle(self, method, path, query, headers, body):
+        comments = re.fullmatch(r"/comments/([a-z0-9]+)\.json", path)
+        if comments:
+            return self.handle_comments(comments.group(1), query)
+
+        match = re.fullmatch(r"(?:/r/([^/]+))?/(search|hot)\.json", path)
+        if not match:
+            return 404, {}, {"message": "Not Found", "error": 404}
+
+        subreddits = match.group(1).split("+") if match.group(1) else [None]
+        limit = min(int(query.get("limit", 25)), 100)
+        with self.rng_lock:
+            children = [make_reddit_post(self.rng, self.rng.choice(subreddits)) for _ in range(limit)]
+            after = f"t3_{self.rng.getrandbits(32):x}" if self.rng.random() < 0.7 else None
+            elapsed = time.monotonic() - self.window_started
+            if elapsed >= self.RATE_WINDOW:
+                self.window_started, elapsed = time.monotonic(), 0.0
+                self.remaining = float(self.RATE_LIMIT)
+            self.remaining = max(0.0, self.remaining - 1)
+
+        return 200, {
+            "X-Ratelimit-Remaining": f"{self.remaining:.1f}",
+            "X-Ratelimit-Reset": str(int(self.RATE_WINDOW - elapsed)),
+            "X-Ratelimit-Used": str(int(self.RATE_LIMIT - self.remaining))
+        }, {"kind": "Listing", "data": {"after": after, "dist": len(children), "children": children}}
+
+    def handle_comments(self, post_id: str, query: dict):
+        limit = min(int(query.get("limit", 200)), 500)
+        depth = int(query.get("depth", 10))
+        with self.rng_lock:
+            post = make_reddit_post(self.rng)
+            children = make_reddit_comments(self.rng, post_id, post["data"]["subreddit"], limit, depth)
+        return 200, {}, [
+            {"kind": "Listing", "data": {"children": [post]}},
+            {"kind": "Listing", "data": {"children": children}}
+        ]
+
+
+class FakeApify(FakeUpstream):
+    """
+    Apify actor `run-sync-get-dataset-items` and the runs API.
+
+    Runs started with POST /v2/acts/{actor}/runs finish after RUN_SECONDS,
+    or SLOW_RUN_SECONDS for a SLOW_RUN_RATE fraction of runs, and support
+    `waitForFinish` long-polling, abort and dataset items.
+    """
+
+    name = "apify"
+
+    RUN_SECONDS = 1.5
+    SLOW_RUN_SECONDS = 30.0
+    SLOW_RUN_RATE = 0.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.runs = {}
+        self.runs_lock = threading.Lock()
+
+    def _items(self, body: bytes) -> list:
+        actor_input = json.loads(body or b"{}")
+        count = int(actor_input.get("maxItems") or actor_input.get("maxRequestsPerCrawl") or 10)
+        with self.rng_lock:
+            return [make_apify_item(self.rng) for _ in range(count)]
+
+    def _run_data(self, run: dict) -> dict:
+        status = run["status"]
+        if status == "RUNNING" and time.monotonic() >= run["finish_at"]:
+            status = run["status"] = "SUCCEEDED"
+        return {"id": run["id"], "actId": run["actor"], "status": status, "defaultDatasetId": run["dataset"]}
+
+    def handle(self, method, path, query, headers, body):
+        if re.fullmatch(r"/v2/acts/[^/]+/run-sync-get-dataset-items", path):
+            return 200, {}, self._items(body)
+
+        match = re.fullmatch(r"/v2/acts/([^/]+)/runs", path)
+        if match and method == "POST":
+            with self.rng_lock:
+                slow = self.rng.random() < self.SLOW_RUN_RATE
+                run_id = f"run{self.rng.getrandbits(40):x}"
+            run = {
+                "id": run_id,
+                "actor": match.group(1),
+                "dataset": f"ds{run_id}",
+                "status": "RUNNING",
+                "finish_at": time.monotonic() + (self.SLOW_RUN_SECONDS if slow else self.RUN_SECONDS),
+                "items": self._items(body)
+            }
+            with self.runs_lock:
+                self.runs[run_id] = run
+            return 201, {}, {"data": self._run_data(run)}
+
+        match = re.fullmatch(r"/v2/actor-runs/([^/]+)(/abort)?", path)
+        if match:
+            run = self.runs.get(match.group(1))
+            if run is None:
+                return 404, {}, {"error": {"type": "record-not-found"}}
+            if match.group(2):
+                if run["status"] == "RUNNING":
+                    run["status"] = "ABORTED"
+                return 200, {}, {"data": self._run_data(run)}
+            wait = float(query.get("waitForFinish") or 0)
+            deadline = time.monotonic() + wait
+            while run["status"] == "RUNNING" and time.monotonic() < min(deadline, run["finish_at"]):
+                time.sleep(0.02)
+            return 200, {}, {"data": self._run_data(run)}
+
+        match = re.fullmatch(r"/v2/datasets/ds([^/]+)/items", path)
+        if match and match.group(1) in self.runs:
+            return 200, {}, self.runs[match.group(1)]["items"]
+
+        return 404, {}, {"error": {"type": "page-not-found"}}
+
+
+_FILTER_RE = re.compile(r"^(eq|neq|gt|gte|lt|lte|is|in|like|ilike)\.(.*)$", re.S)
+
+
+def _text(value) -> str:
+    """Render a stored value the way PostgREST compares it in filters."""
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def _coerce(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _matches(row: dict, column: str, expr: str) -> bool:
+    match = _FILTER_RE.match(expr)
+    if not match:
+        return True
+    op, value = match.groups()
+    current = row.get(column)
+
+    if op == "is":
+        return current is None if value == "null" else _text(current) == value
+    if op == "in":
+        return _text(current) in {v.strip('"') for v in value.strip("()").split(",")}
+    if current is None:
+        return False
+    if op == "eq":
+        return _text(current) == value
+    if op == "neq":
+        return _text(current) != value
+    if op in ("like", "ilike"):
+        pattern = "^" + ".*".join(re.escape(part) for part in value.split("*")) + "$"
+        return re.match(pattern, _text(current), re.S | (re.I if op == "ilike" else 0)) is not None
+
+    left, right = _coerce(current), _coerce(value)
+    if type(left) is not type(right):
+        left, right = str(current), value
+    return {
+        "gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right
+    }[op]
+
+
+def _split_top_level(expr: str) -> list[str]:
+    """Split a logic tree body on commas outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in expr:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    return parts + [current] if current else parts
+
+
+def _matches_logic(row: dict, op: str, expr: str) -> bool:
+    """Evaluate an `and=(...)` / `or=(...)` logic tree."""
+    results = []
+    for part in _split_top_level(expr.strip()[1:-1]):
+        nested = re.match(r"^(and|or)(\(.*\))$", part, re.S)
+        if nested:
+            results.append(_matches_logic(row, *nested.groups()))
+        else:
+            column, _, condition = part.partition(".")
+            operator, _, value = condition.partition(".")
+            value = value.strip('"')
+            results.append(_matches(row, column, f"{operator}.{value}"))
+    return all(results) if op == "and" else any(results)
+
+
+class FakePostgrest(FakeUpstream):
+    """
+    In-memory PostgREST with the subset of semantics this service uses:
+    eq/neq/gt/gte/lt/lte/is/in/like/ilike filters, and/or logic trees, select projection, order,
+    limit/offset, deletes, `Prefer: count=exact`, `return=representation`, and the
+    RPC functions defined as `rpc_<name>` methods.
+    """
+
+    name = "postgrest"
+
+    RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+    # Column defaults from the migrations, for tables inserted into without them
+    COLUMN_DEFAULTS = {
+        "collection_queries": {
+            "is_active": True, "runs": 0, "searches": 0, "results_fetched": 0, "new_records": 0,
+            "yield_estimate": None, "last_run_at": None
+        },
+    }
+
+    # Rows inserted by the migrations themselves
+    MIGRATION_ROWS = {
+        "collection_queries": [
+            {"kind": "jobs", "query": query} for query in [
+                "Software Developer", "Backend Developer", "Frontend Developer", "Full Stack Developer",
+                "Data Scientist", "Machine Learning Engineer", "DevOps Engineer", "Cloud Engineer",
+                "Data Engineer", "Mobile Developer", "Python Developer", "Java Developer",
+                "JavaScript Developer", "React Developer", "Node.js Developer"
+            ]
+        ] + [
+            {"kind": "discussions", "query": query} for query in [
+                "programming skills 2026", "software developer skills", "backend developer technologies",
+                "frontend framework comparison", "cloud certification worth it", "machine learning career",
+                "kubernetes docker devops", "react angular vue comparison", "python vs javascript",
+                "AI developer jobs"
+            ]
+        ],
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tables = {}
+        self.tables_lock = threading.Lock()
+        for table, rows in self.MIGRATION_ROWS.items():
+            self.insert_rows(table, rows)
+
+    def insert_rows(self, table: str, rows: list[dict]) -> list[dict]:
+        stored = []
+        now = datetime.now(timezone.utc).isoformat()
+        with self.tables_lock:
+            target = self.tables.setdefault(table, [])
+            for row in rows:
+                row = {**self.COLUMN_DEFAULTS.get(table, {}), **row}
+                row.setdefault("id", str(uuid.uuid4()))
+                row.setdefault("created_at", now)
+                row.setdefault("fetched_at", now)
+                row.setdefault("ingested_at", now)
+                target.append(row)
+                stored.append(row)
+        return stored
+
+    def _select(self, table: str, query: dict) -> list[dict]:
+        filters = {k: v for k, v in query.items() if k not in self.RESERVED}
+        with self.tables_lock:
+            rows = [
+                row for row in self.tables.get(table, [])
+                if all(
+                    _matches_logic(row, col, expr) if col in ("and", "or") else _matches(row, col, expr)
+                    for col, expr in filters.items()
+                )
+            ]
+
+        for clause in reversed([c for c in query.get("order", "").split(",") if c]):
+            column, _, direction = clause.partition(".")
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) or ""), reverse=direction.startswith("desc"))
+        return rows
+
+    def handle(self, method, path, query, headers, body):
+        match = re.fullmatch(r"/rest/v1/(rpc/)?([A-Za-z0-9_]+)", path)
+        if not match:
+            return 404, {}, {"message": "Not found"}
+        if match.group(1):
+            function = getattr(self, f"rpc_{match.group(2)}", None)
+            if method != "POST" or function is None:
+                return 404, {}, {"code": "PGRST202", "message": f"Could not find the function {match.group(2)}"}
+            return 200, {}, function(**json.loads(body or b"{}"))
+
+        table = match.group(2)
+        prefer = headers.get("Prefer", "")
+
+        if method == "GET":
+            rows = self._select(table, query)
+            total = len(rows)
+            offset = int(query.get("offset", 0))
+            limit = int(query.get("limit", 1000))
+            page = rows[offset:offset + limit]
+
+            select = query.get("select", "*")
+            if select != "*":
+                columns = [c.strip() for c in select.split(",")]
+                page = [{c: row.get(c) for c in columns} for row in page]
+
+            response_headers = {}
+            if "count=exact" in prefer:
+                end = offset + len(page) - 1 if page else 0
+                response_headers["Content-Range"] = f"{offset}-{end}/{total}"
+            return 200, response_headers, page
+
+        if method == "POST":
+            payload = json.loads(body or b"[]")
+            stored = self.insert_rows(table, payload if isinstance(payload, list) else [payload])
+            if "return=representation" in prefer:
+                return 201, {}, stored
+            return 201, {}, None
+
+        if method == "PATCH":
+            changes = json.loads(body or b"{}")
+            updated = []
+            for row in self._select(table, query):
+                with self.tables_lock:
+                    row.update(changes)
+                updated.append(row)
+            return (200, {}, updated) if "return=representation" in prefer else (204, {}, None)
+
+        if method == "DELETE":
+            deleted = self._select(table, query)
+            with self.tables_lock:
+                removed = {id(row) for row in deleted}
+                self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in removed]
+            return (200, {}, deleted) if "return=representation" in prefer else (204, {}, None)
+
+        return 405, {}, {"message": "Method not allowed"}
+
+    def rpc_increment_job_role_counts(self, p_counts: list):
+        now = datetime.now(timezone.utc).isoformat()
+        with self.tables_lock:
+            table = self.tables.setdefault("job_role_counts", [])
+            by_role = {row["role_key"]: row for row in table}
+            for item in p_counts:
+                row = by_role.get(item["role_key"])
+                if row is None:
+                    row = by_role[item["role_key"]] = {"role_key": item["role_key"], "job_count": 0, "canonical_job_count": 0}
+                    table.append(row)
+                row["job_count"] += item["job_count"]
+                row["canonical_job_count"] += item["canonical_job_count"]
+                row["last_seen_at"] = now
+        return None
+
+    def rpc_record_query_yield(self, p_kind: str, p_results: list, p_alpha: float = 0.3):
+        now = datetime.now(timezone.utc).isoformat()
+        with self.tables_lock:
+            log = self.tables.setdefault("query_yield_log", [])
+            table = self.tables.setdefault("collection_queries", [])
+            by_query = {row["query"]: row for row in table if row["kind"] == p_kind}
+            for item in p_results:
+                log.append({"run_at": now, "kind": p_kind, **item})
+                if not item["searches"]:
+                    continue
+                run_yield = item["new_records"] / item["searches"]
+                row = by_query.get(item["query"])
+                if row is None:
+                    row = by_query[item["query"]] = {
+                        **self.COLUMN_DEFAULTS["collection_queries"], "kind": p_kind, "query": item["query"]
+                    }
+                    table.append(row)
+                row["runs"] += 1
+                for column in ("searches", "results_fetched", "new_records"):
+                    row[column] += item[column]
+                previous = row["yield_estimate"]
+                row["yield_estimate"] = run_yield if previous is None else p_alpha * run_yield + (1 - p_alpha) * previous
+                row["last_run_at"] = now
+        return None
+
+    def _skill_rows(self, scope: str) -> list[dict]:
+        """Per-record skill rows in scope, keyed by "doc" (canonical jobs only)."""
+        with self.tables_lock:
+            if scope == "jobs":
+                canonical = {row["id"] for row in self.tables.get("fetched_jobs", []) if not row.get("canonical_job_id")}
+                return [
+                    {**row, "doc": row["job_id"]}
+                    for row in self.tables.get("job_extracted_skills", []) if row["job_id"] in canonical
+                ]
+            return [{**row, "doc": row["discussion_id"]} for row in self.tables.get("discussion_extracted_skills", [])]
+
+    def rpc_aggregate_skill_mentions(self):
+        counts = {}
+        for column, scope in (("job_mention_count", "jobs"), ("discussion_mention_count", "discussions")):
+            for row in self._skill_rows(scope):
+                entry = counts.setdefault(row["skill_name_normalized"], {
+                    "skill_name_normalized": row["skill_name_normalized"],
+                    "job_mention_count": 0,
+                    "discussion_mention_count": 0
+                })
+                entry[column] += row["mention_count"]
+        return list(counts.values())
+
+    def rpc_skill_cooccurrence_counts(self, p_scope: str, p_min_count: int = 1):
+        documents = {}
+        for row in self._skill_rows(p_scope):
+            documents.setdefault(row["doc"], set()).add(row["skill_name_normalized"])
+        with self.tables_lock:
+            if p_scope == "jobs":
+                total = sum(1 for row in self.tables.get("fetched_jobs", []) if not row.get("canonical_job_id"))
+            else:
+                total = len(self.tables.get("fetched_discussions", []))
+
+        frequency, pairs = {}, {}
+        for skills in documents.values():
+            ordered = sorted(skills)
+            for i, a in enumerate(ordered):
+                frequency[a] = frequency.get(a, 0) + 1
+                for b in ordered[i + 1:]:
+                    pairs[(a, b)] = pairs.get((a, b), 0) + 1
+        return [
+            {
+                "skill_a": a,
+                "skill_b": b,
+                "pair_count": count,
+                "skill_a_count": frequency[a],
+                "skill_b_count": frequency[b],
+                "document_count": total
+            }
+            for (a, b), count in pairs.items() if count >= p_min_count
+        ]
+
+    def rpc_replace_skill_cooccurrence(self, p_snapshot_date: str, p_scope: str, p_pairs: list):
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {"id": str(uuid.uuid4()), "snapshot_date": p_snapshot_date, "scope": p_scope, **pair, "created_at": now}
+            for pair in p_pairs
+        ]
+        with self.tables_lock:
+            table = self.tables.setdefault("skill_cooccurrence", [])
+            table[:] = [
+                row for row in table
+                if (row["snapshot_date"], row["scope"]) != (p_snapshot_date, p_scope)
+            ] + rows
+        return len(rows)
+
+    def rpc_replace_skill_trend_cube(self, p_snapshot_date: str, p_cells: list):
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {"id": str(uuid.uuid4()), "snapshot_date": p_snapshot_date, **cell, "created_at": now}
+            for cell in p_cells
+        ]
+        with self.tables_lock:
+            table = self.tables.setdefault("skill_trend_cube", [])
+            table[:] = [row for row in table if row["snapshot_date"] != p_snapshot_date] + rows
+        return len(rows)
+
+    def rpc_skill_trend_cube_counts(self):
+        dimensions = {
+            "jobs": ("fetched_jobs", ["search_query", "role_key", "location", "source"]),
+            "discussions": ("fetched_discussions", ["search_query", "subreddit", "source"]),
+        }
+        cells = {}
+        for scope, (table, columns) in dimensions.items():
+            with self.tables_lock:
+                records = {row["id"]: row for row in self.tables.get(table, [])}
+            for row in self._skill_rows(scope):
+                record = records[row["doc"]]
+                for column in columns:
+                    value = (record.get(column) or "").strip()
+                    if not value:
+                        continue
+                    cell = cells.setdefault((scope, column, value, row["skill_name_normalized"]), {
+                        "scope": scope,
+                        "dimension": column,
+                        "dimension_value": value,
+                        "skill_name": row["skill_name_normalized"],
+                        "mention_count": 0,
+                        "documents": set()
+                    })
+                    cell["mention_count"] += row["mention_count"]
+                    cell["documents"].add(row["doc"])
+        return [
+            {**{k: v for k, v in cell.items() if k != "documents"}, "document_count": len(cell["documents"])}
+            for cell in cells.values()
+        ]
+
+    def seed(self, jobs: int = 0, discussions: int = 0, trend_weeks: int = 0):
+        """Pre-populate tables so read-heavy endpoints have realistic volume."""
+        rng = random.Random(7)
+        self.insert_rows("admin_api_keys", [
+            {"service_name": "serp", "key_name": "SERP_API_KEY", "key_value": "bench-serp-key", "is_active": True},
+            {"service_name": "apify", "key_name": "APIFY_API_TOKEN", "key_value": "bench-apify-token", "is_active": True}
+        ])
+
+        job_rows = []
+        for i in range(jobs):
+            query = rng.choice(ROLES)
+            job = make_serp_job(rng, query)
+            job_rows.append({
+                "job_hash": f"seed-{i}",
+                "title": job["title"],
+                "company_name": job["company_name"],
+                "location": job["location"],
+                "description": job["description"],
+                "source": "serp_google_jobs",
+                "search_query": query
+            })
+        self.insert_rows("fetched_jobs", job_rows)
+
+        discussion_rows = []
+        for i in range(discussions):
+            post = make_reddit_post(rng)["data"]
+            discussion_rows.append({
+                "post_hash": f"seed-{i}",
+                "post_id": post["id"],
+                "title": post["title"],
+                "body": post["selftext"],
+                "subreddit": post["subreddit"],
+                "source": "reddit_api"
+            })
+        self.insert_rows("fetched_discussions", discussion_rows)
+
+        today = datetime.now(timezone.utc).date()
+        trend_rows = []
+        for week in range(trend_weeks, 0, -1):
+            snapshot = (today - timedelta(weeks=week)).isoformat()
+            for skill in SKILL_WORDS:
+                trend_rows.append({
+                    "snapshot_date": snapshot,
+                    "skill_name": skill,
+                    "skill_name_normalized": skill,
+                    "job_mention_count": rng.randint(0, 500),
+                    "discussion_mention_count": rng.randint(0, 200),
+                    "trend_direction": "stable"
+                })
+        self.insert_rows("skill_trends", trend_rows)
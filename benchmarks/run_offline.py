@@ -0,0 +1,201 @@
+"""
+Offline benchmark harness.
+
+Starts local fake SerpAPI, Reddit, Apify and PostgREST servers, points the
+service at them, runs the app under uvicorn and drives the collection
+endpoints. Reports wall time, endpoint p50/p99 latency, request counts and
+latency per upstream, and peak traced memory for each scenario.
+
+Usage:
+    python -m benchmarks.run_offline
+    python -m benchmarks.run_offline --scenario jobs_fetch --iterations 5
+    python -m benchmarks.run_offline --latency serpapi=800 --error-rate reddit=0.1 --json out.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+from benchmarks.fake_upstreams import FakeSerpApi, FakeReddit, FakeApify, FakePostgrest
+
+
+DEFAULT_LATENCY_MS = {"serpapi": 600.0, "reddit": 120.0, "apify": 100.0, "postgrest": 15.0}
+
+SCENARIOS = {
+    "jobs_fetch": ("POST", "/api/jobs/fetch", {"query": "Backend Developer", "num_results": 20}),
+    "jobs_fetch_batch": ("POST", "/api/jobs/fetch-batch", {
+        "queries": ["Backend Developer", "Data Engineer", "DevOps Engineer"], "num_per_query": 10
+    }),
+    "discussions_fetch": ("POST", "/api/discussions/fetch", {"query": "python vs javascript", "max_items": 50}),
+    "aggregate_trends": ("POST", "/api/cron/aggregate-trends", None),
+    "cron_run_full": ("POST", "/api/cron/run-full", None),
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def parse_overrides(values: list[str], cast=float) -> dict:
+    """Parse repeated NAME=VALUE options."""
+    overrides = {}
+    for value in values or []:
+        name, _, raw = value.partition("=")
+        overrides[name.strip()] = cast(raw)
+    return overrides
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_upstreams(latency: dict, error_rate: dict) -> dict:
+    """Start every fake upstream and return them by name."""
+    upstreams = {}
+    for cls in (FakeSerpApi, FakeReddit, FakeApify, FakePostgrest):
+        upstreams[cls.name] = cls(
+            latency_ms=latency.get(cls.name, DEFAULT_LATENCY_MS[cls.name]),
+            error_rate=error_rate.get(cls.name, 0.0),
+            seed=len(upstreams)
+        ).start()
+    return upstreams
+
+
+def configure_environment(upstreams: dict):
+    """Point the service settings at the fakes. Must run before importing `app`."""
+    os.environ.update({
+        "SUPABASE_URL": upstreams["postgrest"].base_url,
+        "SUPABASE_KEY": "bench-anon-key",
+        "SUPABASE_SERVICE_ROLE_KEY": "bench-service-key",
+        "SERP_API_BASE_URL": upstreams["serpapi"].base_url,
+        "REDDIT_BASE_URL": upstreams["reddit"].base_url,
+        "APIFY_BASE_URL": upstreams["apify"].base_url,
+        # The fake commits each insert at once, so exports needn't wait for rows to settle
+        "EXPORT_SETTLE_SECONDS": "0",
+    })
+
+
+def start_service() -> str:
+    """Run the FastAPI app under uvicorn in a background thread."""
+    import uvicorn
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def run_scenario(base_url: str, name: str, iterations: int, upstreams: dict) -> dict:
+    """Run one scenario and collect timing, upstream and memory numbers."""
+    import requests
+
+    method, path, payload = SCENARIOS[name]
+    for upstream in upstreams.values():
+        upstream.stats.reset()
+
+    tracemalloc.reset_peak()
+    latencies = []
+    statuses = {}
+    started = time.perf_counter()
+
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        resp = requests.request(method, f"{base_url}{path}", json=payload, timeout=3600)
+        latencies.append(time.perf_counter() - call_started)
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+
+    upstream_report = {}
+    for upstream_name, upstream in upstreams.items():
+        stats = upstream.stats.snapshot()
+        upstream_report[upstream_name] = {
+            "requests": stats["requests"],
+            "status_counts": stats["status_counts"],
+            "p50_ms": round(percentile(stats["latencies"], 50) * 1000, 2),
+            "p99_ms": round(percentile(stats["latencies"], 99) * 1000, 2)
+        }
+
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "wall_time_s": round(wall, 3),
+        "endpoint_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "endpoint_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "endpoint_mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "status_counts": statuses,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+        "upstreams": upstream_report
+    }
+
+
+def print_report(results: list[dict]):
+    """Print a human-readable summary."""
+    for result in results:
+        print(f"\n== {result['scenario']} ({result['iterations']} iterations)")
+        print(
+            f"  wall {result['wall_time_s']}s  p50 {result['endpoint_p50_ms']}ms  "
+            f"p99 {result['endpoint_p99_ms']}ms  peak mem {result['peak_memory_mb']}MB  "
+            f"status {result['status_counts']}"
+        )
+        for name, stats in result["upstreams"].items():
+            if stats["requests"]:
+                print(
+                    f"  {name:<10} {stats['requests']:>6} req  p50 {stats['p50_ms']}ms  "
+                    f"p99 {stats['p99_ms']}ms  {stats['status_counts']}"
+                )
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--latency", action="append", metavar="UPSTREAM=MS", help="Mean injected latency per upstream")
+    parser.add_argument("--error-rate", action="append", metavar="UPSTREAM=RATE", help="Fraction of requests answered with 429")
+    parser.add_argument("--seed-jobs", type=int, default=2000)
+    parser.add_argument("--seed-discussions", type=int, default=2000)
+    parser.add_argument("--seed-trend-weeks", type=int, default=12)
+    parser.add_argument("--json", metavar="PATH", help="Write machine-readable results to PATH")
+    args = parser.parse_args(argv)
+
+    upstreams = start_upstreams(parse_overrides(args.latency), parse_overrides(args.error_rate))
+    upstreams["postgrest"].seed(args.seed_jobs, args.seed_discussions, args.seed_trend_weeks)
+    configure_environment(upstreams)
+
+    tracemalloc.start()
+    base_url = start_service()
+
+    results = []
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            results.append(run_scenario(base_url, name, args.iterations, upstreams))
+    finally:
+        for upstream in upstreams.values():
+            upstream.stop()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "argv": sys.argv[1:]}, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+-- Momentum fields computed by trend_service from snapshot history
+ALTER TABLE skill_trends
+    ADD COLUMN IF NOT EXISTS week_over_week_delta INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rolling_avg NUMERIC DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS growth_rate NUMERIC DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS trend_slope NUMERIC DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_skill_trends_snapshot_date
+    ON skill_trends (snapshot_date);
@@ -0,0 +1,17 @@
+-- Near-duplicate jobs point at the canonical posting they were syndicated from
+ALTER TABLE fetched_jobs
+    ADD COLUMN IF NOT EXISTS canonical_job_id UUID REFERENCES fetched_jobs (id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_canonical_job_id
+    ON fetched_jobs (canonical_job_id);
+
+-- MinHash signatures of canonical jobs, loaded incrementally by dedup_service
+CREATE TABLE IF NOT EXISTS job_minhash_signatures (
+    job_id UUID PRIMARY KEY REFERENCES fetched_jobs (id) ON DELETE CASCADE,
+    job_hash TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_minhash_signatures_created_at
+    ON job_minhash_signatures (created_at);
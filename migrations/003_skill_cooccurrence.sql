@@ -0,0 +1,23 @@
+-- Skill pairs mentioned in the same documents, one set per trend snapshot.
+-- Written by aggregate-trends (skill_a < skill_b) and served by /api/trends/cooccurrence
+CREATE TABLE IF NOT EXISTS skill_cooccurrence (
+    id BIGSERIAL PRIMARY KEY,
+    snapshot_date DATE NOT NULL,
+    scope TEXT NOT NULL CHECK (scope IN ('jobs', 'discussions')),
+    skill_a TEXT NOT NULL,
+    skill_b TEXT NOT NULL,
+    pair_count INTEGER NOT NULL,
+    skill_a_count INTEGER NOT NULL,
+    skill_b_count INTEGER NOT NULL,
+    document_count INTEGER NOT NULL,
+    lift DOUBLE PRECISION NOT NULL,
+    pmi DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (snapshot_date, scope, skill_a, skill_b)
+);
+
+CREATE INDEX IF NOT EXISTS idx_skill_cooccurrence_snapshot_lift
+    ON skill_cooccurrence (snapshot_date, scope, lift DESC);
+
+CREATE INDEX IF NOT EXISTS idx_skill_cooccurrence_skill_b
+    ON skill_cooccurrence (snapshot_date, scope, skill_b);
@@ -0,0 +1,64 @@
+-- Normalized role key of each job (normalizer_service.normalize_job_title), set at ingest
+ALTER TABLE fetched_jobs
+    ADD COLUMN IF NOT EXISTS role_key TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_role_key
+    ON fetched_jobs (role_key);
+
+-- Backfill existing rows with the same rules as normalize_job_title
+UPDATE fetched_jobs
+SET role_key = NULLIF(btrim(regexp_replace(
+    regexp_replace(
+        regexp_replace(
+            lower(btrim(title)),
+            '\m(senior|junior|mid-level|lead|principal|staff|entry-level)\M', '', 'g'
+        ),
+        '\m(engineer|developer|programmer)\M', 'developer', 'g'
+    ),
+    '\s+', ' ', 'g'
+)), '')
+WHERE role_key IS NULL AND title IS NOT NULL;
+
+-- Per-role job counts, incremented by store_jobs and served by /api/jobs/roles
+CREATE TABLE IF NOT EXISTS job_role_counts (
+    role_key TEXT PRIMARY KEY,
+    job_count INTEGER NOT NULL DEFAULT 0,
+    canonical_job_count INTEGER NOT NULL DEFAULT 0,
+    last_seen_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_role_counts_job_count
+    ON job_role_counts (job_count DESC);
+
+-- Add a batch of per-role increments: [{"role_key", "job_count", "canonical_job_count"}, ...]
+CREATE OR REPLACE FUNCTION increment_job_role_counts(p_counts JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO job_role_counts AS c (role_key, job_count, canonical_job_count, last_seen_at)
+    SELECT r.role_key, r.job_count, r.canonical_job_count, now()
+    FROM jsonb_to_recordset(p_counts) AS r (role_key TEXT, job_count INTEGER, canonical_job_count INTEGER)
+    ON CONFLICT (role_key) DO UPDATE SET
+        job_count = c.job_count + EXCLUDED.job_count,
+        canonical_job_count = c.canonical_job_count + EXCLUDED.canonical_job_count,
+        last_seen_at = now();
+$$;
+
+-- Recount every role from fetched_jobs (initial load, or repair after failed increments)
+CREATE OR REPLACE FUNCTION refresh_job_role_counts()
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM job_role_counts;
+    INSERT INTO job_role_counts (role_key, job_count, canonical_job_count, last_seen_at)
+    SELECT
+        role_key,
+        count(*),
+        count(*) FILTER (WHERE canonical_job_id IS NULL),
+        max(fetched_at)
+    FROM fetched_jobs
+    WHERE role_key IS NOT NULL
+    GROUP BY role_key;
+$$;
+
+SELECT refresh_job_role_counts();
@@ -0,0 +1,112 @@
+-- Typed salary, posting time and work mode parsed at ingest (job_fields_service)
+DO $$
+BEGIN
+    CREATE TYPE job_work_mode AS ENUM ('remote', 'hybrid', 'onsite');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TABLE fetched_jobs
+    ADD COLUMN IF NOT EXISTS salary_min NUMERIC,
+    ADD COLUMN IF NOT EXISTS salary_max NUMERIC,
+    ADD COLUMN IF NOT EXISTS salary_period TEXT
+        CHECK (salary_period IN ('hour', 'day', 'week', 'month', 'year')),
+    ADD COLUMN IF NOT EXISTS posted_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS work_mode job_work_mode;
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_posted_at
+    ON fetched_jobs (posted_at);
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_salary_min
+    ON fetched_jobs (salary_period, salary_min);
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_salary_max
+    ON fetched_jobs (salary_period, salary_max);
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_work_mode
+    ON fetched_jobs (work_mode);
+
+-- Backfill existing rows with the same rules as job_fields_service. An amount only
+-- counts when a currency precedes it, it carries a k/m multiplier, or a pay period
+-- follows it (so "3 weeks PTO" and "401k match" aren't salaries). amount[5] is the
+-- text after the amount, where the pay period is looked for. Salaries are re-parsed
+-- on every run, so re-running this migration corrects rows parsed by looser rules.
+WITH parsed AS (
+    SELECT
+        id,
+        regexp_match(
+            salary_text,
+            '(?<![\d.,])(?!401\s*\(?k\y)'
+            '(?:(?<=[$€£₹¥]\s?)|(?<=\y(?:usd|eur|gbp|cad|aud|inr)\s?)'
+            '|(?=\d[\d,]*(?:\.\d+)?\s*[km](?![a-z])|\d[\d,]*(?:\.\d+)?\s*(?:-|–|—|to)\s*[^\d\s]*\s*\d[\d,]*(?:\.\d+)?\s*[km](?![a-z]))'
+            '|(?=\d[\d,]*(?:\.\d+)?\s*(?:[km](?![a-z]))?(?:\s*(?:-|–|—|to)\s*[^\d\s]*\s*\d[\d,]*(?:\.\d+)?\s*(?:[km](?![a-z]))?)?'
+            '\s*(?:(?:(?:an?|per)\s+|/\s*)(?:hourly|hour|hr|daily|day|weekly|week|wk|monthly|month|mo|yearly|year|yr|annum)\y|(?:hourly|daily|weekly|monthly|yearly|annually)\y)))'
+            '(\d[\d,]*(?:\.\d+)?)\s*([km](?![a-z]))?(?:\s*(?:-|–|—|to)\s*[^\d\s]*\s*(\d[\d,]*(?:\.\d+)?)\s*([km](?![a-z]))?)?(.*)$',
+            'i'
+        ) AS amount
+    FROM fetched_jobs
+    WHERE salary_text IS NOT NULL
+),
+amounts AS (
+    SELECT
+        id,
+        regexp_match(
+            lower(amount[5]),
+            '\m(?:an?|per)\s+(hourly|hour|hr|daily|day|weekly|week|wk|monthly|month|mo|yearly|year|yr|annum)\M|/\s*(hourly|hour|hr|daily|day|weekly|week|wk|monthly|month|mo|yearly|year|yr|annum)\M|\m(hourly|daily|weekly|monthly|yearly|annually)\M'
+        ) AS period,
+        replace(amount[1], ',', '')::NUMERIC * CASE lower(coalesce(amount[2], CASE WHEN amount[3] IS NOT NULL THEN amount[4] END))
+            WHEN 'k' THEN 1000 WHEN 'm' THEN 1000000 ELSE 1 END AS low,
+        replace(amount[3], ',', '')::NUMERIC * CASE lower(amount[4])
+            WHEN 'k' THEN 1000 WHEN 'm' THEN 1000000 ELSE 1 END AS high
+    FROM parsed
+)
+UPDATE fetched_jobs AS j
+SET
+    salary_min = least(a.low, coalesce(a.high, a.low)),
+    salary_max = greatest(a.low, coalesce(a.high, a.low)),
+    salary_period = CASE
+        WHEN a.low IS NULL THEN NULL
+        WHEN coalesce(a.period[1], a.period[2], a.period[3]) IN ('hour', 'hr', 'hourly') THEN 'hour'
+        WHEN coalesce(a.period[1], a.period[2], a.period[3]) IN ('day', 'daily') THEN 'day'
+        WHEN coalesce(a.period[1], a.period[2], a.period[3]) IN ('week', 'wk', 'weekly') THEN 'week'
+        WHEN coalesce(a.period[1], a.period[2], a.period[3]) IN ('month', 'mo', 'monthly') THEN 'month'
+        WHEN coalesce(a.period[1], a.period[2], a.period[3]) IN ('year', 'yr', 'annum', 'yearly', 'annually') THEN 'year'
+    END
+FROM amounts AS a
+WHERE j.id = a.id;
+
+WITH parsed AS (
+    SELECT
+        id,
+        regexp_match(
+            lower(posted_date),
+            '(\d+|an?|one)\+?\s*(minute|min|hour|hr|day|week|month|year)s?\s+ago'
+        ) AS age
+    FROM fetched_jobs
+    WHERE work_mode IS NULL
+)
+UPDATE fetched_jobs AS j
+SET
+    posted_at = CASE
+        WHEN a.age IS NOT NULL THEN j.fetched_at
+            - (CASE WHEN a.age[1] IN ('a', 'an', 'one') THEN 1 ELSE a.age[1]::INTEGER END)
+            * CASE a.age[2]
+                WHEN 'minute' THEN INTERVAL '1 minute' WHEN 'min' THEN INTERVAL '1 minute'
+                WHEN 'hour' THEN INTERVAL '1 hour' WHEN 'hr' THEN INTERVAL '1 hour'
+                WHEN 'day' THEN INTERVAL '1 day'
+                WHEN 'week' THEN INTERVAL '7 days'
+                WHEN 'month' THEN INTERVAL '30 days'
+                WHEN 'year' THEN INTERVAL '365 days'
+            END
+        WHEN j.posted_date ~* '\m(just posted|just now|today|now)\M' THEN j.fetched_at
+        WHEN j.posted_date ~* '\myesterday\M' THEN j.fetched_at - INTERVAL '1 day'
+    END,
+    work_mode = CASE
+        WHEN (coalesce(j.title, '') || ' ' || coalesce(j.location, '')) ~* '\mhybrid\M' THEN 'hybrid'
+        WHEN lower(j.work_type) = 'true'
+            OR (coalesce(j.title, '') || ' ' || coalesce(j.location, '')) ~* '\m(remote|anywhere|work from home|wfh)\M'
+            THEN 'remote'
+        ELSE 'onsite'
+    END::job_work_mode
+FROM parsed AS a
+WHERE j.id = a.id;
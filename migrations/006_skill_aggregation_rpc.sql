@@ -0,0 +1,102 @@
+-- Server-side skill aggregation (SKILL_AGGREGATION_MODE=database).
+-- Skills are extracted once per record at ingest into *_extracted_skills rows,
+-- and aggregate-trends asks Postgres for the grouped counts instead of
+-- downloading every description and discussion body.
+
+CREATE TABLE IF NOT EXISTS discussion_extracted_skills (
+    id BIGSERIAL PRIMARY KEY,
+    discussion_id UUID NOT NULL REFERENCES fetched_discussions (id) ON DELETE CASCADE,
+    skill_name TEXT NOT NULL,
+    skill_name_normalized TEXT NOT NULL,
+    mention_count INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (discussion_id, skill_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_discussion_extracted_skills_skill
+    ON discussion_extracted_skills (skill_name_normalized);
+
+-- Bulk inserts upsert on (job_id, skill_name); drop duplicates left by earlier inserts first
+DELETE FROM job_extracted_skills a
+    USING job_extracted_skills b
+    WHERE a.ctid < b.ctid AND a.job_id = b.job_id AND a.skill_name = b.skill_name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_job_extracted_skills_job_skill
+    ON job_extracted_skills (job_id, skill_name);
+
+CREATE INDEX IF NOT EXISTS idx_job_extracted_skills_skill
+    ON job_extracted_skills (skill_name_normalized);
+
+-- Mention counts per normalized skill: canonical jobs and all discussions
+CREATE OR REPLACE FUNCTION aggregate_skill_mentions()
+RETURNS TABLE (skill_name_normalized TEXT, job_mention_count BIGINT, discussion_mention_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH job_counts AS (
+        SELECT s.skill_name_normalized AS skill, sum(s.mention_count) AS mentions
+        FROM job_extracted_skills s
+        JOIN fetched_jobs j ON j.id = s.job_id
+        WHERE j.canonical_job_id IS NULL
+        GROUP BY s.skill_name_normalized
+    ),
+    discussion_counts AS (
+        SELECT s.skill_name_normalized AS skill, sum(s.mention_count) AS mentions
+        FROM discussion_extracted_skills s
+        GROUP BY s.skill_name_normalized
+    )
+    SELECT
+        coalesce(j.skill, d.skill),
+        coalesce(j.mentions, 0)::BIGINT,
+        coalesce(d.mentions, 0)::BIGINT
+    FROM job_counts j
+    FULL OUTER JOIN discussion_counts d ON d.skill = j.skill;
+$$;
+
+-- Skill pairs mentioned in the same record ('jobs' or 'discussions'), with
+-- per-skill document frequencies and the number of records in scope.
+-- Lift and PMI are derived from these by cooccurrence_service.
+CREATE OR REPLACE FUNCTION skill_cooccurrence_counts(p_scope TEXT, p_min_count INTEGER DEFAULT 1)
+RETURNS TABLE (
+    skill_a TEXT,
+    skill_b TEXT,
+    pair_count BIGINT,
+    skill_a_count BIGINT,
+    skill_b_count BIGINT,
+    document_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH present AS (
+        SELECT DISTINCT s.job_id::TEXT AS doc, s.skill_name_normalized AS skill
+        FROM job_extracted_skills s
+        JOIN fetched_jobs j ON j.id = s.job_id
+        WHERE p_scope = 'jobs' AND j.canonical_job_id IS NULL
+        UNION ALL
+        SELECT DISTINCT s.discussion_id::TEXT, s.skill_name_normalized
+        FROM discussion_extracted_skills s
+        WHERE p_scope = 'discussions'
+    ),
+    frequency AS (
+        SELECT skill, count(*) AS documents FROM present GROUP BY skill
+    ),
+    pairs AS (
+        SELECT a.skill AS skill_a, b.skill AS skill_b, count(*) AS pair_count
+        FROM present a
+        JOIN present b ON b.doc = a.doc AND b.skill > a.skill
+        GROUP BY a.skill, b.skill
+        HAVING count(*) >= p_min_count
+    ),
+    total AS (
+        SELECT CASE p_scope
+            WHEN 'jobs' THEN (SELECT count(*) FROM fetched_jobs WHERE canonical_job_id IS NULL)
+            ELSE (SELECT count(*) FROM fetched_discussions)
+        END AS documents
+    )
+    SELECT p.skill_a, p.skill_b, p.pair_count, fa.documents, fb.documents, total.documents
+    FROM pairs p
+    JOIN frequency fa ON fa.skill = p.skill_a
+    JOIN frequency fb ON fb.skill = p.skill_b
+    CROSS JOIN total;
+$$;
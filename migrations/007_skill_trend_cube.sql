@@ -0,0 +1,62 @@
+-- Search query each job was collected for (discussions already store theirs)
+ALTER TABLE fetched_jobs
+    ADD COLUMN IF NOT EXISTS search_query TEXT;
+
+-- Skill counts per dimension value, one set per trend snapshot.
+-- Written by aggregate-trends (non-zero cells only) and served by /api/trends/cube
+CREATE TABLE IF NOT EXISTS skill_trend_cube (
+    id BIGSERIAL PRIMARY KEY,
+    snapshot_date DATE NOT NULL,
+    scope TEXT NOT NULL CHECK (scope IN ('jobs', 'discussions')),
+    dimension TEXT NOT NULL,
+    dimension_value TEXT NOT NULL,
+    skill_name TEXT NOT NULL,
+    mention_count INTEGER NOT NULL,
+    document_count INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (snapshot_date, scope, dimension, dimension_value, skill_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_skill_trend_cube_skill
+    ON skill_trend_cube (snapshot_date, scope, skill_name, dimension);
+
+CREATE INDEX IF NOT EXISTS idx_skill_trend_cube_mentions
+    ON skill_trend_cube (snapshot_date, scope, dimension, mention_count DESC);
+
+-- Cube cells from the per-record skill rows (SKILL_AGGREGATION_MODE=database),
+-- one scan per scope with every dimension unpivoted alongside each skill row
+CREATE OR REPLACE FUNCTION skill_trend_cube_counts()
+RETURNS TABLE (
+    scope TEXT,
+    dimension TEXT,
+    dimension_value TEXT,
+    skill_name TEXT,
+    mention_count BIGINT,
+    document_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'jobs', d.dimension, btrim(d.value), s.skill_name_normalized, sum(s.mention_count), count(DISTINCT s.job_id)
+    FROM job_extracted_skills s
+    JOIN fetched_jobs j ON j.id = s.job_id
+    CROSS JOIN LATERAL (VALUES
+        ('search_query', j.search_query),
+        ('role_key', j.role_key),
+        ('location', j.location),
+        ('source', j.source)
+    ) AS d (dimension, value)
+    WHERE j.canonical_job_id IS NULL AND btrim(d.value) <> ''
+    GROUP BY d.dimension, btrim(d.value), s.skill_name_normalized
+    UNION ALL
+    SELECT 'discussions', d.dimension, btrim(d.value), s.skill_name_normalized, sum(s.mention_count), count(DISTINCT s.discussion_id)
+    FROM discussion_extracted_skills s
+    JOIN fetched_discussions p ON p.id = s.discussion_id
+    CROSS JOIN LATERAL (VALUES
+        ('search_query', p.search_query),
+        ('subreddit', p.subreddit),
+        ('source', p.source)
+    ) AS d (dimension, value)
+    WHERE btrim(d.value) <> ''
+    GROUP BY d.dimension, btrim(d.value), s.skill_name_normalized;
+$$;
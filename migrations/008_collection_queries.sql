@@ -0,0 +1,82 @@
+-- Search queries run by the weekly collection crons, with per-query yield
+-- (new canonical records per search) used by query_scheduler_service
+CREATE TABLE IF NOT EXISTS collection_queries (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('jobs', 'discussions')),
+    query TEXT NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    runs INTEGER NOT NULL DEFAULT 0,
+    searches INTEGER NOT NULL DEFAULT 0,
+    results_fetched INTEGER NOT NULL DEFAULT 0,
+    new_records INTEGER NOT NULL DEFAULT 0,
+    yield_estimate DOUBLE PRECISION,
+    last_run_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (kind, query)
+);
+
+CREATE INDEX IF NOT EXISTS idx_collection_queries_active
+    ON collection_queries (kind, is_active);
+
+-- One row per query per run
+CREATE TABLE IF NOT EXISTS query_yield_log (
+    id BIGSERIAL PRIMARY KEY,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    kind TEXT NOT NULL,
+    query TEXT NOT NULL,
+    searches INTEGER NOT NULL,
+    results_fetched INTEGER NOT NULL,
+    new_records INTEGER NOT NULL,
+    selected_by TEXT CHECK (selected_by IN ('new', 'exploit', 'explore'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_yield_log_query
+    ON query_yield_log (kind, query, run_at DESC);
+
+-- The queries previously hardcoded in app/routers/cron.py
+INSERT INTO collection_queries (kind, query)
+SELECT 'jobs', q FROM unnest(ARRAY[
+    'Software Developer', 'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Scientist', 'Machine Learning Engineer', 'DevOps Engineer', 'Cloud Engineer',
+    'Data Engineer', 'Mobile Developer', 'Python Developer', 'Java Developer',
+    'JavaScript Developer', 'React Developer', 'Node.js Developer'
+]) AS q
+ON CONFLICT (kind, query) DO NOTHING;
+
+INSERT INTO collection_queries (kind, query)
+SELECT 'discussions', q FROM unnest(ARRAY[
+    'programming skills 2026', 'software developer skills', 'backend developer technologies',
+    'frontend framework comparison', 'cloud certification worth it', 'machine learning career',
+    'kubernetes docker devops', 'react angular vue comparison', 'python vs javascript', 'AI developer jobs'
+]) AS q
+ON CONFLICT (kind, query) DO NOTHING;
+
+-- Log a run and fold each query's yield into its estimate:
+-- yield_estimate = p_alpha * (new_records / searches) + (1 - p_alpha) * yield_estimate
+-- p_results: [{"query", "searches", "results_fetched", "new_records", "selected_by"}, ...]
+CREATE OR REPLACE FUNCTION record_query_yield(p_kind TEXT, p_results JSONB, p_alpha DOUBLE PRECISION DEFAULT 0.3)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO query_yield_log (kind, query, searches, results_fetched, new_records, selected_by)
+    SELECT p_kind, r.query, r.searches, r.results_fetched, r.new_records, r.selected_by
+    FROM jsonb_to_recordset(p_results)
+        AS r (query TEXT, searches INTEGER, results_fetched INTEGER, new_records INTEGER, selected_by TEXT);
+
+    INSERT INTO collection_queries AS q (kind, query, runs, searches, results_fetched, new_records, yield_estimate, last_run_at)
+    SELECT p_kind, r.query, 1, r.searches, r.results_fetched, r.new_records,
+        r.new_records::DOUBLE PRECISION / r.searches, now()
+    FROM jsonb_to_recordset(p_results)
+        AS r (query TEXT, searches INTEGER, results_fetched INTEGER, new_records INTEGER)
+    WHERE r.searches > 0
+    ON CONFLICT (kind, query) DO UPDATE SET
+        runs = q.runs + 1,
+        searches = q.searches + EXCLUDED.searches,
+        results_fetched = q.results_fetched + EXCLUDED.results_fetched,
+        new_records = q.new_records + EXCLUDED.new_records,
+        yield_estimate = CASE
+            WHEN q.yield_estimate IS NULL THEN EXCLUDED.yield_estimate
+            ELSE p_alpha * EXCLUDED.yield_estimate + (1 - p_alpha) * q.yield_estimate
+        END,
+        last_run_at = now();
+$$;
@@ -0,0 +1,18 @@
+-- One row per written skill_trends snapshot. written_at of the latest row is the
+-- Last-Modified / ETag version of GET /api/trends (trend_read_service)
+CREATE TABLE IF NOT EXISTS trend_snapshots (
+    snapshot_date DATE PRIMARY KEY,
+    written_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_trend_snapshots_written_at
+    ON trend_snapshots (written_at DESC);
+
+-- Snapshots written before this table existed
+INSERT INTO trend_snapshots (snapshot_date, written_at)
+SELECT DISTINCT snapshot_date, snapshot_date::TIMESTAMPTZ
+FROM skill_trends
+ON CONFLICT (snapshot_date) DO NOTHING;
+
+CREATE INDEX IF NOT EXISTS idx_skill_trends_skill_snapshot
+    ON skill_trends (skill_name_normalized, snapshot_date);
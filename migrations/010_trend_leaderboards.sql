@@ -0,0 +1,15 @@
+-- Top-K skills of each trend snapshot, ranked when the snapshot is written
+-- (trend_service.compute_leaderboards) and served by GET /api/trends/top.
+-- One row per snapshot and board; entries is the ranked list:
+-- [{rank, skill_name, value, job_count, discussion_count, growth_rate, week_over_week_delta}]
+CREATE TABLE IF NOT EXISTS trend_leaderboards (
+    snapshot_date DATE NOT NULL,
+    board TEXT NOT NULL CHECK (board IN ('job_mentions', 'discussion_mentions', 'combined', 'growth')),
+    entries JSONB NOT NULL DEFAULT '[]'::jsonb,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (snapshot_date, board)
+);
+
+-- Latest snapshot of a board
+CREATE INDEX IF NOT EXISTS idx_trend_leaderboards_board_snapshot
+    ON trend_leaderboards (board, snapshot_date DESC);
@@ -0,0 +1,40 @@
+-- Canonical Reddit post identity (normalizer_service.canonical_post_hash).
+-- post_hash is the post's t3_ fullname whenever its id is known, from post_id or
+-- the /comments/<id>/ permalink, so a post fetched by both the Reddit API and the
+-- Apify collectors is stored once. Posts without an id keep their hash.
+
+CREATE OR REPLACE FUNCTION reddit_post_id(p_post_id TEXT, p_url TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(
+        substring(lower(trim(p_post_id)) FROM '^(?:t3_)?([a-z0-9]{1,13})$'),
+        substring(lower(p_url) FROM '/comments/([a-z0-9]{1,13})(?:/|$)')
+    )
+$$;
+
+-- Keep the first stored copy of each post. Later copies are deleted, and so are
+-- their discussion_extracted_skills rows (ON DELETE CASCADE).
+WITH copies AS (
+    SELECT
+        id,
+        row_number() OVER (
+            PARTITION BY COALESCE('t3_' || reddit_post_id(post_id, post_url), post_hash)
+            ORDER BY fetched_at, id
+        ) AS copy_number
+    FROM fetched_discussions
+)
+DELETE FROM fetched_discussions d
+USING copies c
+WHERE d.id = c.id AND c.copy_number > 1;
+
+-- Re-key the remaining rows
+UPDATE fetched_discussions
+SET post_hash = 't3_' || reddit_post_id(post_id, post_url),
+    post_id = reddit_post_id(post_id, post_url)
+WHERE reddit_post_id(post_id, post_url) IS NOT NULL
+  AND post_hash IS DISTINCT FROM 't3_' || reddit_post_id(post_id, post_url);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_fetched_discussions_post_hash
+    ON fetched_discussions (post_hash);
@@ -0,0 +1,24 @@
+-- Reddit comments of high-engagement posts (comment_service, REDDIT_COMMENTS_ENABLED).
+-- comment_id is the t1_ fullname and the dedup key of bulk inserts. post_hash is the
+-- parent post's canonical identity (migration 011). It isn't a foreign key: comments
+-- are written in bulk and one unstored post mustn't fail the whole batch.
+CREATE TABLE IF NOT EXISTS fetched_comments (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    comment_id TEXT NOT NULL UNIQUE,
+    post_hash TEXT NOT NULL,
+    parent_id TEXT,
+    subreddit TEXT,
+    author TEXT,
+    body TEXT NOT NULL,
+    upvotes INTEGER NOT NULL DEFAULT 0,
+    depth SMALLINT NOT NULL DEFAULT 0,
+    created_utc TIMESTAMPTZ,
+    source TEXT NOT NULL DEFAULT 'reddit_api',
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_fetched_comments_post_hash
+    ON fetched_comments (post_hash);
+
+CREATE INDEX IF NOT EXISTS idx_fetched_comments_fetched_at
+    ON fetched_comments (fetched_at, id);
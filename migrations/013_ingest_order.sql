@@ -0,0 +1,44 @@
+-- Database-assigned ingest time for the export keyset cursor (export_service).
+-- fetched_at is set by the collector before the insert, and inserts run concurrently,
+-- so a row can commit after a cursor has moved past its fetched_at and never be read.
+-- ingested_at is the inserting transaction's now(), set by a trigger so clients can't
+-- supply it, and readers only take rows older than EXPORT_SETTLE_SECONDS, by which
+-- time every transaction that started before then has committed.
+-- Existing rows take their fetched_at, so cursors issued before this keep their place.
+
+ALTER TABLE fetched_jobs ADD COLUMN IF NOT EXISTS ingested_at TIMESTAMPTZ;
+UPDATE fetched_jobs SET ingested_at = fetched_at WHERE ingested_at IS NULL;
+ALTER TABLE fetched_jobs
+    ALTER COLUMN ingested_at SET DEFAULT now(),
+    ALTER COLUMN ingested_at SET NOT NULL;
+
+ALTER TABLE fetched_discussions ADD COLUMN IF NOT EXISTS ingested_at TIMESTAMPTZ;
+UPDATE fetched_discussions SET ingested_at = fetched_at WHERE ingested_at IS NULL;
+ALTER TABLE fetched_discussions
+    ALTER COLUMN ingested_at SET DEFAULT now(),
+    ALTER COLUMN ingested_at SET NOT NULL;
+
+CREATE OR REPLACE FUNCTION set_ingested_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.ingested_at := now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_fetched_jobs_ingested_at ON fetched_jobs;
+CREATE TRIGGER trg_fetched_jobs_ingested_at
+    BEFORE INSERT ON fetched_jobs
+    FOR EACH ROW EXECUTE FUNCTION set_ingested_at();
+
+DROP TRIGGER IF EXISTS trg_fetched_discussions_ingested_at ON fetched_discussions;
+CREATE TRIGGER trg_fetched_discussions_ingested_at
+    BEFORE INSERT ON fetched_discussions
+    FOR EACH ROW EXECUTE FUNCTION set_ingested_at();
+
+CREATE INDEX IF NOT EXISTS idx_fetched_jobs_ingested_at
+    ON fetched_jobs (ingested_at, id);
+CREATE INDEX IF NOT EXISTS idx_fetched_discussions_ingested_at
+    ON fetched_discussions (ingested_at, id);
@@ -0,0 +1,32 @@
+-- Replace a snapshot's cube cells in one transaction (cube_service.store_cube).
+-- /api/trends/cube keeps serving the previous cells until the new ones commit, and a
+-- failed write rolls back and leaves them in place. Writers for the same snapshot take
+-- turns on an advisory lock, so the second one replaces the first one's cells instead
+-- of failing on the unique key.
+CREATE OR REPLACE FUNCTION replace_skill_trend_cube(p_snapshot_date DATE, p_cells JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('skill_trend_cube:' || p_snapshot_date));
+
+    DELETE FROM skill_trend_cube WHERE snapshot_date = p_snapshot_date;
+
+    INSERT INTO skill_trend_cube
+        (snapshot_date, scope, dimension, dimension_value, skill_name, mention_count, document_count)
+    SELECT p_snapshot_date, c.scope, c.dimension, c.dimension_value, c.skill_name, c.mention_count, c.document_count
+    FROM jsonb_to_recordset(p_cells) AS c (
+        scope TEXT,
+        dimension TEXT,
+        dimension_value TEXT,
+        skill_name TEXT,
+        mention_count INTEGER,
+        document_count INTEGER
+    );
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
@@ -0,0 +1,36 @@
+-- Replace a snapshot's co-occurrence pairs for one scope in one transaction
+-- (cooccurrence_service.store_cooccurrence), like replace_skill_trend_cube (014).
+-- /api/trends/cooccurrence keeps serving the previous pairs until the new ones commit,
+-- and a failed write rolls back and leaves them in place. Writers for the same snapshot
+-- and scope take turns on an advisory lock instead of failing on the unique key.
+CREATE OR REPLACE FUNCTION replace_skill_cooccurrence(p_snapshot_date DATE, p_scope TEXT, p_pairs JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('skill_cooccurrence:' || p_snapshot_date || ':' || p_scope));
+
+    DELETE FROM skill_cooccurrence WHERE snapshot_date = p_snapshot_date AND scope = p_scope;
+
+    INSERT INTO skill_cooccurrence
+        (snapshot_date, scope, skill_a, skill_b, pair_count, skill_a_count, skill_b_count,
+         document_count, lift, pmi)
+    SELECT p_snapshot_date, p_scope, p.skill_a, p.skill_b, p.pair_count, p.skill_a_count, p.skill_b_count,
+           p.document_count, p.lift, p.pmi
+    FROM jsonb_to_recordset(p_pairs) AS p (
+        skill_a TEXT,
+        skill_b TEXT,
+        pair_count INTEGER,
+        skill_a_count INTEGER,
+        skill_b_count INTEGER,
+        document_count INTEGER,
+        lift DOUBLE PRECISION,
+        pmi DOUBLE PRECISION
+    );
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;